@@ -1,15 +1,24 @@
 import pvcompare.main as main
 import pvcompare.constants as constants
+import pvcompare.check_inputs as check_inputs
+import pvcompare.heat_pump_and_chiller as heat_pump_and_chiller
+import pvcompare.scenario_workspace as scenario_workspace
+import pvcompare.loop_runner as loop_runner
+import pvcompare.cache as cache
+import pvcompare.loop_results as loop_results
 import os
 import pandas as pd
 import numpy as np
 import shutil
 import glob
+import concurrent.futures
 import matplotlib.pyplot as plt
 import logging
 
 
-def create_loop_output_structure(outputs_directory, scenario_name, variable_name):
+def create_loop_output_structure(
+    outputs_directory, scenario_name, variable_name, exist_ok=False
+):
     """
     Defines the path of the loop_output_directory.
 
@@ -23,6 +32,9 @@ def create_loop_output_structure(outputs_directory, scenario_name, variable_name
         "Scenario_A1", "Scenario_A2", "Scenario_B1" etc.
     variable_name: str
         name of the variable that is atapted in each loop.
+    exist_ok: bool
+        If False, an error is raised if the loop_output_directory already exists.
+        Default: False.
 
     Returns
     -------
@@ -44,6 +56,8 @@ def create_loop_output_structure(outputs_directory, scenario_name, variable_name
 
     # checks if loop_output_directory already exists, otherwise create it
     if os.path.isdir(loop_output_directory):
+        if exist_ok:
+            return loop_output_directory
         raise NameError(
             f"The loop output directory {loop_output_directory} "
             f"already exists. Please "
@@ -59,6 +73,36 @@ def create_loop_output_structure(outputs_directory, scenario_name, variable_name
     return loop_output_directory
 
 
+def get_workspace_directory(outputs_directory, scenario_name, loop_type, year, step):
+    """
+    Defines the path of the scenario workspace of one step of a loop.
+
+    Parameters
+    ----------
+    outputs_directory: str
+        Path to output directory.
+    scenario_name: str
+        Name of the Scenario.
+    loop_type: str
+        Name of the loop type or of the variable that is adapted in each loop.
+    year: int
+        Year of the step.
+    step: str or int
+        Gradation of the loop variable.
+
+    Returns
+    -------
+    str
+        Path of the workspace, see
+        :py:func:`~.scenario_workspace.create_scenario_workspace`.
+    """
+    return os.path.join(
+        outputs_directory,
+        scenario_name,
+        "inputs_loop_" + str(loop_type) + "_" + str(year) + "_" + str(step),
+    )
+
+
 def loop_pvcompare(
     scenario_name,
     latitude,
@@ -72,6 +116,11 @@ def loop_pvcompare(
     user_inputs_mvs_directory=None,
     outputs_directory=None,
     user_inputs_pvcompare_directory=None,
+    max_workers=1,
+    retries=0,
+    min_available_memory=None,
+    resume=False,
+    export_excel=True,
 ):
     """
     Starts multiple *pvcompare* simulations with a range of values for a
@@ -80,6 +129,26 @@ def loop_pvcompare(
     The loop type corresponds to a variable or a set of
     variables that is/are changed in each loop.The
     results, stored in two excel sheets, are copied into `loop_output_directory`.
+    If pyarrow is installed, the results of all steps are also stored in the
+    loop results store, see :py:mod:`~.loop_results`, and the excel sheets are
+    only saved if `export_excel` is True.
+    For the loop types 'technology' and 'hp_temp' the inputs are changed in a
+    scenario workspace for each step, see
+    :py:func:`~.scenario_workspace.create_scenario_workspace`, so that the
+    files in `user_inputs_pvcompare_directory` are not modified.
+
+    The steps of all years are run with :py:func:`~.loop_runner.run_loop_steps`,
+    in parallel processes if `max_workers` is not 1. In this case each step is run
+    in its own scenario workspace. `postprocessing_kpi` is applied after all steps
+    have finished.
+
+    The status of the steps is recorded in the ledger 'loop_ledger.json' in
+    `loop_output_directory`. If the loop is started again with `resume`, the
+    steps that have finished with the same parameters, the same files in
+    `user_inputs_pvcompare_directory` and the same files in 'csv_elements' and
+    'time_series' of `user_inputs_mvs_directory` are skipped. With `resume`, each
+    step is run in its own scenario workspace, so that the steps do not modify the
+    inputs of the user they are compared by.
 
     Parameters
     ----------
@@ -114,6 +183,21 @@ def loop_pvcompare(
     user_inputs_pvcompare_directory: str or None
         If None, `constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY` is used
         as user_input_directory. Default: None.
+    max_workers: int or None
+        Maximum number of steps that are run at the same time. If None, the
+        number of processors of the machine is used. Default: 1.
+    retries: int
+        Number of times a failed step is retried. Default: 0.
+    min_available_memory: float or None
+        Available memory in MB that is required for starting another step while
+        other steps are running. If None, `loop_runner.MIN_AVAILABLE_MEMORY` is
+        used. Default: None.
+    resume: bool
+        If True, an existing `loop_output_directory` is used and the finished
+        steps of a previous run are skipped. Default: False.
+    export_excel: bool
+        If False, the results are not saved as excel sheets but only in the loop
+        results store, which requires pyarrow. Default: True.
 
     Returns
     -------
@@ -128,13 +212,22 @@ def loop_pvcompare(
         user_inputs_pvcompare_directory = (
             constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY
         )
+    if not export_excel:
+        loop_results.check_available()
 
     loop_output_directory = create_loop_output_structure(
         outputs_directory=outputs_directory,
         scenario_name=scenario_name,
         variable_name=loop_type,
+        exist_ok=resume,
     )
 
+    steps = []
+    # workspaces that are needed by other steps and removed at the end
+    kept_workspace_directories = []
+    # steps that are run one after another modify the inputs of the user, unless
+    # they are resumed
+    use_workspace = max_workers != 1 or resume
     for year in years:
         if loop_type is "location":
             for key in loop_dict:
@@ -142,21 +235,24 @@ def loop_pvcompare(
                 latitude = loop_dict[key][1]
                 longitude = loop_dict[key][2]
 
-                single_loop_pvcompare(
-                    scenario_name=scenario_name,
-                    storeys=storeys,
-                    country=country,
-                    latitude=latitude,
-                    longitude=longitude,
-                    year=year,
-                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-                    user_inputs_mvs_directory=user_inputs_mvs_directory,
-                    outputs_directory=outputs_directory,
-                    plot=False,
-                    pv_setup=pv_setup,
-                    loop_output_directory=loop_output_directory,
-                    step=str(latitude) + "_" + str(longitude),
-                    loop_type=loop_type,
+                steps.append(
+                    _get_loop_pvcompare_step(
+                        scenario_name=scenario_name,
+                        storeys=storeys,
+                        country=country,
+                        latitude=latitude,
+                        longitude=longitude,
+                        year=year,
+                        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                        user_inputs_mvs_directory=user_inputs_mvs_directory,
+                        outputs_directory=outputs_directory,
+                        pv_setup=pv_setup,
+                        loop_output_directory=loop_output_directory,
+                        export_excel=export_excel,
+                        step=str(latitude) + "_" + str(longitude),
+                        loop_type=loop_type,
+                        use_workspace=use_workspace,
+                    )
                 )
 
         elif loop_type is "year":
@@ -164,21 +260,24 @@ def loop_pvcompare(
             year = loop_dict["start"]
             while year <= loop_dict["stop"]:
 
-                single_loop_pvcompare(
-                    scenario_name=scenario_name,
-                    storeys=storeys,
-                    country=country,
-                    latitude=latitude,
-                    longitude=longitude,
-                    year=year,
-                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-                    user_inputs_mvs_directory=user_inputs_mvs_directory,
-                    outputs_directory=outputs_directory,
-                    plot=False,
-                    pv_setup=pv_setup,
-                    loop_output_directory=loop_output_directory,
-                    step=year,
-                    loop_type=loop_type,
+                steps.append(
+                    _get_loop_pvcompare_step(
+                        scenario_name=scenario_name,
+                        storeys=storeys,
+                        country=country,
+                        latitude=latitude,
+                        longitude=longitude,
+                        year=year,
+                        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                        user_inputs_mvs_directory=user_inputs_mvs_directory,
+                        outputs_directory=outputs_directory,
+                        pv_setup=pv_setup,
+                        loop_output_directory=loop_output_directory,
+                        export_excel=export_excel,
+                        step=year,
+                        loop_type=loop_type,
+                        use_workspace=use_workspace,
+                    )
                 )
                 year = year + loop_dict["step"]
 
@@ -187,21 +286,24 @@ def loop_pvcompare(
             number_of_storeys = loop_dict["start"]
             while number_of_storeys <= loop_dict["stop"]:
 
-                single_loop_pvcompare(
-                    scenario_name=scenario_name,
-                    storeys=number_of_storeys,
-                    country=country,
-                    latitude=latitude,
-                    longitude=longitude,
-                    year=year,
-                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-                    user_inputs_mvs_directory=user_inputs_mvs_directory,
-                    outputs_directory=outputs_directory,
-                    plot=False,
-                    pv_setup=pv_setup,
-                    loop_output_directory=loop_output_directory,
-                    step=number_of_storeys,
-                    loop_type=loop_type,
+                steps.append(
+                    _get_loop_pvcompare_step(
+                        scenario_name=scenario_name,
+                        storeys=number_of_storeys,
+                        country=country,
+                        latitude=latitude,
+                        longitude=longitude,
+                        year=year,
+                        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                        user_inputs_mvs_directory=user_inputs_mvs_directory,
+                        outputs_directory=outputs_directory,
+                        pv_setup=pv_setup,
+                        loop_output_directory=loop_output_directory,
+                        export_excel=export_excel,
+                        step=number_of_storeys,
+                        loop_type=loop_type,
+                        use_workspace=use_workspace,
+                    )
                 )
 
                 number_of_storeys = number_of_storeys + loop_dict["step"]
@@ -211,70 +313,350 @@ def loop_pvcompare(
             for key in loop_dict:
                 technology = loop_dict[key]
 
-                data_path = os.path.join(
-                    user_inputs_pvcompare_directory, "pv_setup.csv"
-                )
-                # load input parameters from pv_setup.csv
-                pv_setup = pd.read_csv(data_path)
-                for i, row in pv_setup.iterrows():
-                    pv_setup.at[i, "technology"] = technology
-                pv_setup.to_csv(data_path, index=False)
-
-                single_loop_pvcompare(
-                    scenario_name=scenario_name,
-                    storeys=storeys,
-                    country=country,
-                    latitude=latitude,
-                    longitude=longitude,
-                    year=year,
-                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-                    user_inputs_mvs_directory=user_inputs_mvs_directory,
-                    outputs_directory=outputs_directory,
-                    plot=False,
-                    pv_setup=None,
-                    loop_output_directory=loop_output_directory,
-                    step=technology,
-                    loop_type=loop_type,
+                # the technology is changed in a copy of the inputs
+                steps.append(
+                    _get_loop_pvcompare_step(
+                        scenario_name=scenario_name,
+                        storeys=storeys,
+                        country=country,
+                        latitude=latitude,
+                        longitude=longitude,
+                        year=year,
+                        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                        user_inputs_mvs_directory=user_inputs_mvs_directory,
+                        outputs_directory=outputs_directory,
+                        pv_setup=None,
+                        loop_output_directory=loop_output_directory,
+                        export_excel=export_excel,
+                        step=technology,
+                        loop_type=loop_type,
+                        use_workspace=True,
+                        technology=technology,
+                    )
                 )
 
         elif loop_type is "hp_temp":
+            temperatures_high = []
             temp_high = loop_dict["start"]
-
-            data_path = os.path.join(
-                user_inputs_pvcompare_directory, "heat_pumps_and_chillers.csv"
-            )
             while temp_high <= loop_dict["stop"]:
-                # load input parameters from pv_setup.csv
-                hp_file = pd.read_csv(data_path, index_col=0)
-                hp_file.at["heat_pump", "temp_high"] = temp_high
-                hp_file.to_csv(data_path)
+                temperatures_high.append(temp_high)
+                temp_high = temp_high + loop_dict["step"]
 
-                single_loop_pvcompare(
+            # the high temperature is changed in a copy of the inputs, all steps
+            # after the first one start from the inputs of the first step
+            first_step = _get_loop_pvcompare_step(
+                scenario_name=scenario_name,
+                storeys=storeys,
+                country=country,
+                latitude=latitude,
+                longitude=longitude,
+                year=year,
+                user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                user_inputs_mvs_directory=user_inputs_mvs_directory,
+                outputs_directory=outputs_directory,
+                pv_setup=pv_setup,
+                loop_output_directory=loop_output_directory,
+                export_excel=export_excel,
+                step=temperatures_high[0],
+                loop_type=loop_type,
+                use_workspace=True,
+                temp_high=temperatures_high[0],
+                # calculate the COPs of all high temperatures at once
+                temperatures_high=temperatures_high,
+            )
+            first_workspace_directory = first_step["kwargs"]["workspace_directory"]
+            kept_workspace_directories.append(first_workspace_directory)
+            steps.append(first_step)
+            for temp_high in temperatures_high[1:]:
+                step = _get_loop_pvcompare_step(
                     scenario_name=scenario_name,
                     storeys=storeys,
                     country=country,
                     latitude=latitude,
                     longitude=longitude,
                     year=year,
-                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                    user_inputs_pvcompare_directory=os.path.join(
+                        first_workspace_directory, "pvcompare_inputs"
+                    ),
+                    user_inputs_mvs_directory=os.path.join(
+                        first_workspace_directory, "mvs_inputs"
+                    ),
                     outputs_directory=outputs_directory,
-                    plot=False,
                     pv_setup=pv_setup,
                     loop_output_directory=loop_output_directory,
+                    export_excel=export_excel,
                     step=temp_high,
                     loop_type=loop_type,
+                    use_workspace=True,
+                    temp_high=temp_high,
+                    # only the COPs change with the high temperature, all other
+                    # inputs are calculated in the first step
+                    sector_coupling_only=True,
                 )
-                temp_high = temp_high + loop_dict["step"]
+                step["depends_on"] = first_step["name"]
+                steps.append(step)
+
+    # the steps are repeated if the inputs of the user changed
+    inputs_fingerprint = _get_inputs_fingerprint(
+        user_inputs_pvcompare_directory,
+        os.path.join(user_inputs_mvs_directory, "csv_elements"),
+        os.path.join(user_inputs_mvs_directory, "time_series"),
+    )
+    for step in steps:
+        step["fingerprint"] = cache.get_fingerprint(
+            loop_runner.get_step_fingerprint(step), inputs_fingerprint
+        )
+
+    try:
+        loop_runner.run_loop_steps(
+            steps=steps,
+            max_workers=max_workers,
+            retries=retries,
+            min_available_memory=min_available_memory,
+            ledger_directory=loop_output_directory,
+        )
+    finally:
+        for workspace_directory in kept_workspace_directories:
+            if os.path.isdir(workspace_directory):
+                shutil.rmtree(workspace_directory)
 
     logging.info("starting postprocessing KPI")
     postprocessing_kpi(
         scenario_name=scenario_name,
         variable_name=loop_type,
         outputs_directory=outputs_directory,
+        max_workers=max_workers,
     )
 
 
+def _get_inputs_fingerprint(*directories):
+    """
+    Returns a fingerprint of the csv files in `directories`.
+
+    Parameters
+    ----------
+    directories: str
+        Input directories, e.g. `user_inputs_pvcompare_directory` or
+        'csv_elements' and 'time_series' of `user_inputs_mvs_directory`.
+
+    Returns
+    -------
+    str
+        Fingerprint of the names and contents of the csv files of each
+        directory, see :py:func:`~.cache.get_fingerprint`.
+    """
+    contents = []
+    for directory in directories:
+        directory_contents = {}
+        for filename in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+            with open(filename, "rb") as file:
+                directory_contents[os.path.basename(filename)] = file.read()
+        contents.append(directory_contents)
+    return cache.get_fingerprint(contents)
+
+
+def _get_loop_pvcompare_step(
+    use_workspace,
+    technology=None,
+    temp_high=None,
+    temperatures_high=None,
+    sector_coupling_only=False,
+    **kwargs,
+):
+    """
+    Describes one step of :py:func:`~.loop_pvcompare` for
+    :py:func:`~.loop_runner.run_loop_steps`.
+
+    Parameters
+    ----------
+    use_workspace: bool
+        If True, the step is run in a scenario workspace.
+    technology: str or None
+        See :py:func:`~.single_loop_pvcompare_in_workspace`.
+    temp_high: float or None
+        See :py:func:`~.single_loop_pvcompare_in_workspace`.
+    temperatures_high: list or None
+        See :py:func:`~.single_loop_pvcompare_in_workspace`.
+    sector_coupling_only: bool
+        See :py:func:`~.single_loop_pvcompare`.
+    kwargs:
+        Parameters of :py:func:`~.single_loop_pvcompare` except for `plot`.
+
+    Returns
+    -------
+    dict
+        Step as described in :py:mod:`~.loop_runner`.
+    """
+    name = str(kwargs["year"]) + "_" + str(kwargs["step"])
+    output_directories = [
+        _get_mvs_output_directory(
+            kwargs["outputs_directory"],
+            kwargs["scenario_name"],
+            kwargs["loop_type"],
+            kwargs["year"],
+            kwargs["step"],
+        )
+    ]
+    if use_workspace:
+        workspace_directory = get_workspace_directory(
+            kwargs["outputs_directory"],
+            kwargs["scenario_name"],
+            kwargs["loop_type"],
+            kwargs["year"],
+            kwargs["step"],
+        )
+        output_directories.append(workspace_directory)
+    else:
+        workspace_directory = None
+    return {
+        "name": name,
+        "function": single_loop_pvcompare_in_workspace,
+        "kwargs": dict(
+            kwargs,
+            workspace_directory=workspace_directory,
+            technology=technology,
+            temp_high=temp_high,
+            temperatures_high=temperatures_high,
+            # the workspace of the first step of a loop over the high
+            # temperature is used by the other steps
+            keep_workspace=temperatures_high is not None,
+            plot=False,
+            sector_coupling_only=sector_coupling_only,
+        ),
+        "output_directories": output_directories,
+    }
+
+
+def _get_mvs_output_directory(outputs_directory, scenario_name, loop_type, year, step):
+    """
+    Defines the path of the MVS outputs of one step of a loop.
+
+    Parameters
+    ----------
+    outputs_directory: str
+        Path to output directory.
+    scenario_name: str
+        Name of the Scenario.
+    loop_type: str
+        Name of the loop type or of the variable that is adapted in each loop.
+    year: int
+        Year of the step.
+    step: str or int
+        Gradation of the loop variable.
+
+    Returns
+    -------
+    str
+        Path of the MVS outputs.
+    """
+    return os.path.join(
+        outputs_directory,
+        scenario_name,
+        "mvs_outputs_loop_" + str(loop_type) + "_" + str(year) + "_" + str(step),
+    )
+
+
+def single_loop_pvcompare_in_workspace(
+    workspace_directory,
+    user_inputs_pvcompare_directory,
+    user_inputs_mvs_directory,
+    technology=None,
+    temp_high=None,
+    temperatures_high=None,
+    keep_workspace=False,
+    **kwargs,
+):
+    """
+    Runs :py:func:`~.single_loop_pvcompare` in a scenario workspace.
+
+    The workspace is created from `user_inputs_pvcompare_directory` and
+    `user_inputs_mvs_directory` with
+    :py:func:`~.scenario_workspace.create_scenario_workspace` and the PV technology
+    or the high temperature of the heat pump are changed in the workspace.
+
+    Parameters
+    ----------
+    workspace_directory: str or None
+        Directory of the workspace. If None, the step is run in
+        `user_inputs_pvcompare_directory` and `user_inputs_mvs_directory`
+        directly.
+    user_inputs_pvcompare_directory: str
+        Path to the pvcompare inputs that are copied to the workspace.
+    user_inputs_mvs_directory: str
+        Path to the MVS inputs that are copied to the workspace.
+    technology: str or None
+        If not None, the technology of all PV systems in 'pv_setup.csv' is set to
+        `technology`. Default: None.
+    temp_high: float or None
+        If not None, the high temperature of the heat pump in
+        'heat_pumps_and_chillers.csv' is set to `temp_high`. Default: None.
+    temperatures_high: list or None
+        If not None, the COPs of the heat pump are calculated for all high
+        temperatures in `temperatures_high` with
+        :py:func:`~.heat_pump_and_chiller.calculate_cops_sweep`, so that steps
+        that use the workspace of this step only need to load them.
+        Default: None.
+    keep_workspace: bool
+        If False, the workspace is removed at the end of the step.
+        Default: False.
+    kwargs:
+        Other parameters of :py:func:`~.single_loop_pvcompare`.
+
+    Returns
+    -------
+        None
+    """
+    if workspace_directory is not None:
+        (
+            user_inputs_mvs_directory,
+            user_inputs_pvcompare_directory,
+        ) = scenario_workspace.create_scenario_workspace(
+            workspace_directory=workspace_directory,
+            user_inputs_mvs_directory=user_inputs_mvs_directory,
+            user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+        )
+
+    if technology is not None:
+        data_path = os.path.join(user_inputs_pvcompare_directory, "pv_setup.csv")
+        # load input parameters from pv_setup.csv
+        pv_setup = pd.read_csv(data_path)
+        for i, row in pv_setup.iterrows():
+            pv_setup.at[i, "technology"] = technology
+        pv_setup.to_csv(data_path, index=False)
+
+    if temp_high is not None:
+        data_path = os.path.join(
+            user_inputs_pvcompare_directory, "heat_pumps_and_chillers.csv"
+        )
+        # load input parameters from heat_pumps_and_chillers.csv
+        hp_file = pd.read_csv(data_path, index_col=0)
+        hp_file.at["heat_pump", "temp_high"] = temp_high
+        hp_file.to_csv(data_path)
+
+    single_loop_pvcompare(
+        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+        user_inputs_mvs_directory=user_inputs_mvs_directory,
+        **kwargs,
+    )
+
+    if temperatures_high is not None:
+        heat_pump_and_chiller.calculate_cops_sweep(
+            weather=main.load_weather_data(
+                latitude=kwargs["latitude"],
+                longitude=kwargs["longitude"],
+                year=kwargs["year"],
+            ),
+            lat=kwargs["latitude"],
+            lon=kwargs["longitude"],
+            temperatures_high=temperatures_high,
+            user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+            user_inputs_mvs_directory=user_inputs_mvs_directory,
+        )
+
+    if workspace_directory is not None and not keep_workspace:
+        shutil.rmtree(workspace_directory)
+
+
 def single_loop_pvcompare(
     scenario_name,
     storeys,
@@ -290,6 +672,8 @@ def single_loop_pvcompare(
     loop_output_directory,
     loop_type,
     step,
+    sector_coupling_only=False,
+    export_excel=True,
 ):
     """
 
@@ -324,51 +708,81 @@ def single_loop_pvcompare(
         Defines the variable or variables that are changed with each loop.
     step: str or int
         Gradation of the loop variable.
+    sector_coupling_only: bool
+        If True, only the COPs of the heat pump are updated with
+        :py:func:`~.heat_pump_and_chiller.add_sector_coupling` instead of running
+        :py:func:`~.main.apply_pvcompare`. This is used in loops over the high
+        temperature of the heat pump, where all other inputs of the previous step
+        can be kept. Default: False.
+    export_excel: bool
+        If True, the excel sheets of the results are copied into
+        `loop_output_directory`. Default: True.
 
     Returns
     -------
         None
     """
 
-    main.apply_pvcompare(
-        storeys=storeys,
-        country=country,
-        latitude=latitude,
-        longitude=longitude,
-        year=year,
-        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
-        plot=plot,
-        pv_setup=pv_setup,
-    )
+    if sector_coupling_only:
+        heat_pump_and_chiller.add_sector_coupling(
+            weather=main.load_weather_data(
+                latitude=latitude, longitude=longitude, year=year
+            ),
+            lat=latitude,
+            lon=longitude,
+            user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+            user_inputs_mvs_directory=user_inputs_mvs_directory,
+            overwrite_hp_parameters=True,
+        )
+    else:
+        main.apply_pvcompare(
+            storeys=storeys,
+            country=country,
+            latitude=latitude,
+            longitude=longitude,
+            year=year,
+            user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+            user_inputs_mvs_directory=user_inputs_mvs_directory,
+            plot=plot,
+            pv_setup=pv_setup,
+            # in a loop over storeys the demand profiles only change by the
+            # population and are therefore scaled instead of recalculated
+            use_unit_demand_profiles=loop_type == "storeys",
+        )
 
     # define mvs_output_directory for every looping step
-    mvs_output_directory = os.path.join(
-        outputs_directory,
-        scenario_name,
-        "mvs_outputs_loop_" + str(loop_type) + "_" + str(year) + "_" + str(step),
+    mvs_output_directory = _get_mvs_output_directory(
+        outputs_directory, scenario_name, loop_type, year, step
     )
 
-    main.apply_mvs(
+    dict_values = main.apply_mvs(
         scenario_name,
         user_inputs_mvs_directory=user_inputs_mvs_directory,
         mvs_output_directory=mvs_output_directory,
         outputs_directory=outputs_directory,
+        in_memory=True,
+        save_png=False,
+        save_excel=export_excel,
     )
+    if loop_results.is_available():
+        loop_results.store_step_results(
+            loop_output_directory, scenario_name, year, step, dict_values
+        )
 
-    excel_file1 = "scalars.xlsx"
-    new_excel_file1 = "scalars_" + str(year) + "_" + str(step) + ".xlsx"
-    src_dir = os.path.join(mvs_output_directory, excel_file1)
-    dst_dir = os.path.join(loop_output_directory, "scalars", new_excel_file1)
-    shutil.copy(src_dir, dst_dir)
+    if export_excel:
+        excel_file1 = "scalars.xlsx"
+        new_excel_file1 = "scalars_" + str(year) + "_" + str(step) + ".xlsx"
+        src_dir = os.path.join(mvs_output_directory, excel_file1)
+        dst_dir = os.path.join(loop_output_directory, "scalars", new_excel_file1)
+        shutil.copy(src_dir, dst_dir)
 
-    excel_file2 = "timeseries_all_busses.xlsx"
-    new_excel_file2 = (
-        "timeseries_all_busses_" + "_" + str(year) + "_" + str(step) + ".xlsx"
-    )
-    src_dir = os.path.join(mvs_output_directory, excel_file2)
-    dst_dir = os.path.join(loop_output_directory, "timeseries", new_excel_file2)
-    shutil.copy(src_dir, dst_dir)
+        excel_file2 = "timeseries_all_busses.xlsx"
+        new_excel_file2 = (
+            "timeseries_all_busses_" + "_" + str(year) + "_" + str(step) + ".xlsx"
+        )
+        src_dir = os.path.join(mvs_output_directory, excel_file2)
+        dst_dir = os.path.join(loop_output_directory, "timeseries", new_excel_file2)
+        shutil.copy(src_dir, dst_dir)
 
 
 def loop_mvs(
@@ -386,14 +800,29 @@ def loop_mvs(
     scenario_name,
     user_inputs_mvs_directory=None,
     outputs_directory=None,
+    max_workers=1,
+    retries=0,
+    min_available_memory=None,
+    resume=False,
+    export_excel=True,
 ):
     """
     Starts multiple MVS simulations with a range of values for a specific parameter.
 
     This function applies :py:func:`~.main.apply_pvcompare`, one time. After that
      :py:func:`~.main.apply_mvs` is executed in a loop.
-     Before each loop a specific variable value is changed. The
+     Before each loop a specific variable value is changed in a scenario workspace,
+     see :py:func:`~.scenario_workspace.create_scenario_workspace`, so that the
+     files in `user_inputs_mvs_directory` are not modified. The
     results, stored in two excel sheets, are copied into `loop_output_directory`.
+    If pyarrow is installed, the results are also stored in the loop results
+    store, see :py:mod:`~.loop_results`.
+    As the steps do not depend on each other, they can be run in parallel
+    processes with :py:func:`~.loop_runner.run_loop_steps`, see `max_workers`.
+    The status of the steps is recorded in the ledger 'loop_ledger.json' in
+    `loop_output_directory`. If the loop is started again with `resume`, the
+    steps that have finished with the same value and the same files in
+    'csv_elements' and 'time_series' are skipped.
 
     Parameters
     ----------
@@ -427,6 +856,23 @@ def loop_mvs(
     outputs_directory: str or None
         Path to output directory.
         Default: `outputs_directory = constants.DEFAULT_OUTPUTS_DIRECTORY`
+    max_workers: int or None
+        Maximum number of processes the MVS simulations are run in at the same
+        time. If 1, the simulations are run one after another in the current
+        process. If None, the number of processors of the machine is used.
+        Default: 1.
+    retries: int
+        Number of times a failed MVS simulation is retried. Default: 0.
+    min_available_memory: float or None
+        Available memory in MB that is required for starting another MVS
+        simulation while other simulations are running. If None,
+        `loop_runner.MIN_AVAILABLE_MEMORY` is used. Default: None.
+    resume: bool
+        If True, an existing `loop_output_directory` is used and the finished
+        steps of a previous run are skipped. Default: False.
+    export_excel: bool
+        If False, the results are not saved as excel sheets but only in the loop
+        results store, which requires pyarrow. Default: True.
 
     Returns
     -------
@@ -435,16 +881,15 @@ def loop_mvs(
 
     if outputs_directory is None:
         outputs_directory = constants.DEFAULT_OUTPUTS_DIRECTORY
+    if not export_excel:
+        loop_results.check_available()
     loop_output_directory = create_loop_output_structure(
-        outputs_directory, scenario_name, variable_name
+        outputs_directory, scenario_name, variable_name, exist_ok=resume
     )
-    # define filename of variable that should be looped over
     if user_inputs_mvs_directory is None:
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
-    csv_filename = os.path.join(
-        user_inputs_mvs_directory, "csv_elements", csv_file_variable
-    )
 
+    steps = []
     # loop over years
     for year in years:
         # apply pvcompare
@@ -457,70 +902,176 @@ def loop_mvs(
             user_inputs_mvs_directory=user_inputs_mvs_directory,
         )
 
+        # the steps are repeated if the inputs changed
+        inputs_fingerprint = _get_inputs_fingerprint(
+            os.path.join(user_inputs_mvs_directory, "csv_elements"),
+            os.path.join(user_inputs_mvs_directory, "time_series"),
+        )
+
         # loop over the variable
         i = start
         while i <= stop:
-            # change variable value and save this value to csv
-            csv_file = pd.read_csv(csv_filename, index_col=0)
-            csv_file.loc[[variable_name], [variable_column]] = i
-            csv_file.to_csv(csv_filename)
-
-            # define mvs_output_directory for every looping step
-            mvs_output_directory = os.path.join(
-                outputs_directory,
-                scenario_name,
-                "mvs_outputs_loop_"
-                + str(variable_name)
-                + "_"
-                + str(year)
-                + "_"
-                + str(i),
-            )
-
-            # apply mvs for every looping step
-            main.apply_mvs(
-                scenario_name=scenario_name,
-                mvs_output_directory=mvs_output_directory,
-                user_inputs_mvs_directory=user_inputs_mvs_directory,
-                outputs_directory=outputs_directory,
+            workspace_directory = get_workspace_directory(
+                outputs_directory, scenario_name, variable_name, year, i
             )
-
-            # copy excel sheets to loop_output_directory
-            number_digits = len(str(stop)) - len(str(i))
-
-            if number_digits == 0:
-                j = str(i)
-            elif number_digits == 1:
-                j = "0" + str(i)
-            elif number_digits == 2:
-                j = "00" + str(i)
-            elif number_digits == 3:
-                j = "000" + str(i)
-            elif number_digits == 4:
-                j = "0000" + str(i)
-
-            excel_file1 = "scalars.xlsx"
-            new_excel_file1 = "scalars_" + str(year) + "_" + str(j) + ".xlsx"
-            src_dir = os.path.join(mvs_output_directory, excel_file1)
-            dst_dir = os.path.join(loop_output_directory, "scalars", new_excel_file1)
-            shutil.copy(src_dir, dst_dir)
-
-            excel_file2 = "timeseries_all_busses.xlsx"
-            new_excel_file2 = (
-                "timeseries_all_busses_" + str(year) + "_" + str(j) + ".xlsx"
+            loop_step = {
+                "name": str(year) + "_" + str(i),
+                "function": single_loop_mvs,
+                "kwargs": dict(
+                    scenario_name=scenario_name,
+                    workspace_directory=workspace_directory,
+                    variable_name=variable_name,
+                    variable_column=variable_column,
+                    csv_file_variable=csv_file_variable,
+                    value=i,
+                    year=year,
+                    step=str(i).zfill(len(str(stop))),
+                    outputs_directory=outputs_directory,
+                    loop_output_directory=loop_output_directory,
+                    export_excel=export_excel,
+                ),
+                "output_directories": [
+                    _get_mvs_output_directory(
+                        outputs_directory, scenario_name, variable_name, year, i
+                    )
+                ],
+            }
+            loop_step["fingerprint"] = cache.get_fingerprint(
+                loop_runner.get_step_fingerprint(loop_step), inputs_fingerprint
             )
-            src_dir = os.path.join(mvs_output_directory, excel_file2)
-            dst_dir = os.path.join(loop_output_directory, "timeseries", new_excel_file2)
-            shutil.copy(src_dir, dst_dir)
+            if not loop_runner.is_step_finished(
+                loop_output_directory, loop_step["name"], loop_step["fingerprint"]
+            ):
+                # the workspace is created before the inputs are changed for the
+                # next year, a workspace of an interrupted run is replaced
+                if resume and os.path.isdir(workspace_directory):
+                    shutil.rmtree(workspace_directory)
+                scenario_workspace.create_scenario_workspace(
+                    workspace_directory=workspace_directory,
+                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                )
+                steps.append(loop_step)
 
             # add another step
             i = i + step
+
+    loop_runner.run_loop_steps(
+        steps=steps,
+        max_workers=max_workers,
+        retries=retries,
+        min_available_memory=min_available_memory,
+        ledger_directory=loop_output_directory,
+    )
+
     logging.info("starting postprocessing KPI")
     postprocessing_kpi(
         scenario_name=scenario_name,
         variable_name=variable_name,
         outputs_directory=outputs_directory,
+        max_workers=max_workers,
+    )
+
+
+def single_loop_mvs(
+    scenario_name,
+    workspace_directory,
+    variable_name,
+    variable_column,
+    csv_file_variable,
+    value,
+    year,
+    step,
+    outputs_directory,
+    loop_output_directory,
+    export_excel=True,
+):
+    """
+    Runs one step of :py:func:`~.loop_mvs`.
+
+    The variable is set to `value` in the MVS inputs of the scenario workspace and
+    :py:func:`~.main.apply_mvs` is executed. The results are stored in
+    `loop_output_directory` and the workspace is removed afterwards.
+
+    Parameters
+    ----------
+    scenario_name: str
+        Name of the Scenario.
+    workspace_directory: str
+        Directory of the scenario workspace of the step, see
+        :py:func:`~.scenario_workspace.create_scenario_workspace`.
+    variable_name: str
+        name of the variable that is atapted in each loop
+    variable_column: str
+        name of the  variable column in the csv file
+    csv_file_variable: str
+        name of the csv file the variable is saved in
+    value: int
+        value of the variable
+    year: int
+        year of the simulation
+    step: str
+        Gradation of the loop variable that is used in the names of the copied
+        excel sheets.
+    outputs_directory: str
+        Path to output directory.
+    loop_output_directory: str
+        output directory defined in 'pvcompare.outputs.create_loop_output_structure()'.
+    export_excel: bool
+        If True, the excel sheets of the results are copied into
+        `loop_output_directory`. Default: True.
+
+    Returns
+    -------
+        None
+    """
+    workspace_mvs_directory = os.path.join(workspace_directory, "mvs_inputs")
+    check_inputs.add_parameter_to_mvs_file(
+        user_inputs_mvs_directory=workspace_mvs_directory,
+        mvs_filename=csv_file_variable,
+        mvs_row=variable_name,
+        mvs_column=variable_column,
+        pvcompare_parameter=value,
+        warning=False,
+    )
+
+    # define mvs_output_directory for every looping step
+    mvs_output_directory = _get_mvs_output_directory(
+        outputs_directory, scenario_name, variable_name, year, value
+    )
+
+    # apply mvs for every looping step
+    dict_values = main.apply_mvs(
+        scenario_name=scenario_name,
+        mvs_output_directory=mvs_output_directory,
+        user_inputs_mvs_directory=workspace_mvs_directory,
+        outputs_directory=outputs_directory,
+        in_memory=True,
+        save_png=False,
+        save_excel=export_excel,
     )
+    if loop_results.is_available():
+        loop_results.store_step_results(
+            loop_output_directory, scenario_name, year, step, dict_values
+        )
+
+    if export_excel:
+        # copy excel sheets to loop_output_directory
+        excel_file1 = "scalars.xlsx"
+        new_excel_file1 = "scalars_" + str(year) + "_" + step + ".xlsx"
+        src_dir = os.path.join(mvs_output_directory, excel_file1)
+        dst_dir = os.path.join(loop_output_directory, "scalars", new_excel_file1)
+        shutil.copy(src_dir, dst_dir)
+
+        excel_file2 = "timeseries_all_busses.xlsx"
+        new_excel_file2 = "timeseries_all_busses_" + str(year) + "_" + step + ".xlsx"
+        src_dir = os.path.join(mvs_output_directory, excel_file2)
+        dst_dir = os.path.join(loop_output_directory, "timeseries", new_excel_file2)
+        shutil.copy(src_dir, dst_dir)
+    logging.info(
+        f"The results of the MVS simulation with {variable_name} = {value} in "
+        f"{year} have been stored in {loop_output_directory}."
+    )
+    shutil.rmtree(workspace_directory)
 
 
 def postprocessing_kpi(
@@ -528,6 +1079,7 @@ def postprocessing_kpi(
     variable_name,
     user_inputs_pvcompare_directory=None,
     outputs_directory=None,
+    max_workers=1,
 ):
     """
     Overwrites all output excel files "timeseries_all_flows.xlsx" and "scalars.xlsx"
@@ -535,6 +1087,14 @@ def postprocessing_kpi(
     1) Creates new sheet "Electricity bus1" with the column
     Electricity demand = Electricity demand + Heat pump.
     2) Creates new sheets in scalars.xlsx with KPI's adjusted to the new demand.
+    If the results of the steps are stored in the loop results store, see
+    :py:mod:`~.loop_results`, the sheets "scalar_matrix1" and "scalars1" are
+    added to the stored scalars of each step in the same way.
+
+    The scalars file of each step is joined with its timeseries_all_busses file
+    by year and step, see :py:func:`~.get_loop_excel_files`. As the steps do not
+    depend on each other, they can be processed in parallel processes, see
+    `max_workers`.
 
     Parameters
     ----------------
@@ -544,6 +1104,11 @@ def postprocessing_kpi(
         pvcompare inputs directory
     outputs_directory: str
         output directory
+    max_workers: int or None
+        Maximum number of processes the steps are post-processed in at the same
+        time. If 1, the steps are post-processed one after another in the current
+        process. If None, the number of processors of the machine is used.
+        Default: 1.
 
     Returns
         Saves new sheet in output excel file
@@ -566,11 +1131,8 @@ def postprocessing_kpi(
     )
     if os.path.exists(strat_tes_inputs):
         strat_tes = pd.read_csv(strat_tes_inputs, index_col=0)
-        heat_capacity = 4195.52
-        density = 971.803
-        temp_h = strat_tes.at["temp_h", "var_value"]
-        temp_c = strat_tes.at["temp_c", "var_value"]
-        diameter = strat_tes.at["diameter", "var_value"]
+    else:
+        strat_tes = None
 
     # Get number of households in simulation
     building_params = pd.read_csv(
@@ -596,135 +1158,377 @@ def postprocessing_kpi(
             f"The loop output folder {loop_output_directory} does not exist. "
             f"Please check the variable_name"
         )
-    # parse through scalars folder and read in all excel sheets
-    for filepath_s in list(
-        glob.glob(os.path.join(loop_output_directory, "scalars", "*.xlsx"))
-    ):
-        # read sheets of scalars
-        scalars = pd.read_excel(filepath_s, sheet_name=None)
-
-        file_sheet1 = scalars["cost_matrix"]
-        file_sheet2 = scalars["scalar_matrix"]
-        file_sheet2.index = file_sheet2["label"]
-        file_sheet3 = scalars["scalars"]
-        file_sheet3.index = file_sheet3.iloc[:, 0]
-        file_sheet4 = scalars["KPI individual sectors"]
-
-        # get variable value from filepath
-        split_path = filepath_s.split("_")
-        get_year = split_path[::-1][1]
-        get_step = split_path[::-1][0]
-        ending = str(get_year) + "_" + str(get_step)
-
-        # load timeseries_all_busses
-        for filepath_t in list(
-            glob.glob(os.path.join(loop_output_directory, "timeseries", "*.xlsx"))
-        ):
-            heat_exists = False
-            if filepath_t.endswith(ending) is True:
-                # add heat demand to electricty demand it heat demand exists
-                timeseries = pd.read_excel(filepath_t, sheet_name="Electricity bus")
-                if "Heat pump" in timeseries.columns:
-                    heat_exists = True
-                    electricity_demand = (
-                        timeseries["Electricity demand"] + timeseries["Heat pump"]
-                    )
-                    timeseries["Electricity demand"] = electricity_demand
-                    with pd.ExcelWriter(filepath_t, mode="a") as writer:
-                        timeseries.to_excel(writer, sheet_name="Electricity bus")
-                    logging.info(
-                        f"The timeseries_all_flows file {filepath_t} has been overwritten with the new electricity demand."
-                    )
-                else:
-                    electricity_demand = timeseries["Electricity demand"]
-
-                if heat_exists == True:
-                    timeseries_heat = pd.read_excel(filepath_t, sheet_name="Heat bus")
-                    if "TES output power" in timeseries_heat:
-                        # Calculate maximum capacity, nominal capacity and height
-                        # of one storage unit
-                        maximal_tes_capacity = file_sheet2.at[
-                            "TES storage capacity", "optimizedAddCap"
-                        ]
-                        # There is 15 % of unused storage volume according to
-                        # https://op.europa.eu/en/publication-detail/-/publication/312f0f62-dfbd-11e7-9749-01aa75ed71a1/language-en
-                        # The nominal storage capacity is hence the maximum storage capacity multiplied by 1.15
-                        nominal_storage_capacity = maximal_tes_capacity * 1.15
-                        # Calculate volume of TES using oemof-thermal's equations
-                        # in stratified_thermal_storage.py
-                        volume = (
-                            maximal_tes_capacity
-                            * 1000
-                            / (heat_capacity * density * (temp_h - temp_c) * (1 / 3600))
-                        )
-                        # Calculate height of TES using oemof-thermal's equations
-                        # in stratified_thermal_storage.py
-                        height = volume / (0.25 * np.pi * diameter ** 2)
-                        file_sheet3.at[
-                            "Installed capacity per TES", "Unnamed: 0"
-                        ] = "Installed capacity per TES"
-                        # Divide total capacity through number of households = number of plants
-                        file_sheet3.at["Installed capacity per TES", 0] = (
-                            maximal_tes_capacity / total_number_households
-                        )
-                        file_sheet3.at[
-                            "Installed nominal capacity per TES", "Unnamed: 0"
-                        ] = "Installed nominal capacity per TES"
-                        # Divide total nominal capacity through number of households = number of plants
-                        file_sheet3.at["Installed nominal capacity per TES", 0] = (
-                            nominal_storage_capacity / total_number_households
-                        )
-                        file_sheet3.at[
-                            "Height of each TES", "Unnamed: 0"
-                        ] = "Height of each TES"
-                        # Divide total height of all TES through number of households = number of plants
-                        file_sheet3.at["Height of each TES", 0] = (
-                            height / total_number_households
-                        )
-                    if "Heat pump" in timeseries_heat.columns:
-                        # Calculate maximum capacity of one heat pump unit and write to scalars
-                        maximal_hp_capacity = max(timeseries_heat["Heat pump"])
-                        file_sheet3.at[
-                            "Installed capacity per heat pump", "Unnamed: 0"
-                        ] = "Installed capacity per heat pump"
-                        # Divide total capacity through number of households = number of plants
-                        file_sheet3.at["Installed capacity per heat pump", 0] = (
-                            maximal_hp_capacity / total_number_households
-                        )
-
-        # recalculate KPI
-        file_sheet2.at["Electricity demand", "total_flow"] = sum(electricity_demand) * (
-            -1
-        )
-        file_sheet3.at["Total_demandElectricity", 0] = sum(electricity_demand) * (-1)
-        file_sheet3.at["Degree of NZE", 0] = (
-            1
-            + (
-                file_sheet3.at["Total_feedinElectricity", 0]
-                - file_sheet3.at[
-                    "Total_consumption_from_energy_provider_electricity_equivalent", 0
-                ]
+
+    # the steps are collected first, so that they can be processed in parallel
+    steps = []
+    excel_files = get_loop_excel_files(loop_output_directory)
+    for (year, step), (filepath_s, filepath_t) in excel_files.items():
+        if filepath_t is None:
+            logging.warning(
+                f"The timeseries_all_busses file of {filepath_s} does not exist. "
+                f"The KPI's of year {year} and step {step} are not post-processed."
+            )
+            continue
+        steps.append(
+            (
+                _postprocess_excel_step,
+                dict(
+                    filepath_s=filepath_s,
+                    filepath_t=filepath_t,
+                    strat_tes=strat_tes,
+                    total_number_households=total_number_households,
+                ),
             )
-            / file_sheet3.at["Total_demandElectricity", 0]
         )
-        file_sheet3.at["Degree of autonomy", 0] = (
-            file_sheet3.at["Total_demandElectricity", 0]
-            - file_sheet3.at["Total_consumption_from_energy_providerElectricity", 0]
-        ) / file_sheet3.at["Total_demandElectricity", 0]
-        file_sheet3.at["Onsite energy fraction", 0] = (
-            file_sheet3.at["Total internal renewable generation", 0]
-            - file_sheet3.at["Total_feedinElectricity", 0]
-            - file_sheet3.at["Total_excessElectricity", 0]
-        ) / file_sheet3.at["Total internal renewable generation", 0]
-
-        # save excel sheets
-        with pd.ExcelWriter(filepath_s, mode="a") as writer:
-            file_sheet1.to_excel(writer, sheet_name="cost_matrix", index=None)
-            file_sheet2.to_excel(writer, sheet_name="scalar_matrix", index=None)
-            file_sheet3.to_excel(writer, sheet_name="scalars", index=None)
-            file_sheet4.to_excel(
-                writer, sheet_name="KPI individual sectors", index=None
+    # the results in the loop results store are post-processed in the same way
+    if loop_results.is_available():
+        for scenario, year, step in loop_results.get_steps(loop_output_directory):
+            steps.append(
+                (
+                    _postprocess_stored_step,
+                    dict(
+                        loop_output_directory=loop_output_directory,
+                        scenario=scenario,
+                        year=year,
+                        step=step,
+                        strat_tes=strat_tes,
+                        total_number_households=total_number_households,
+                    ),
+                )
             )
+
+    if max_workers == 1:
+        for function, kwargs in steps:
+            function(**kwargs)
+    else:
+        if max_workers == None:
+            max_workers = os.cpu_count()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            futures = [
+                executor.submit(function, **kwargs) for function, kwargs in steps
+            ]
+            for future in futures:
+                future.result()
+
+
+def get_loop_excel_files(loop_output_directory):
+    r"""
+    Returns the excel files of the results of all steps of a loop.
+
+    The names of the files in the folders 'scalars' and 'timeseries' of
+    `loop_output_directory` are parsed once. The files of the time series are
+    named 'timeseries_all_busses__<year>_<step>.xlsx' by
+    :py:func:`~.single_loop_pvcompare` and
+    'timeseries_all_busses_<year>_<step>.xlsx' by :py:func:`~.single_loop_mvs`.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        output directory defined in 'pvcompare.outputs.create_loop_output_structure()'.
+
+    Returns
+    -------
+    dict
+        Paths of the scalars file and the timeseries_all_busses file by year and
+        step. The path of the timeseries_all_busses file is None if it does not
+        exist.
+    """
+    timeseries_files = {}
+    for filepath_t in glob.glob(
+        os.path.join(
+            loop_output_directory, "timeseries", "timeseries_all_busses_*.xlsx"
+        )
+    ):
+        ending = os.path.basename(filepath_t)[len("timeseries_all_busses_") : -5]
+        timeseries_files[ending.lstrip("_")] = filepath_t
+
+    excel_files = {}
+    for filepath_s in sorted(
+        glob.glob(os.path.join(loop_output_directory, "scalars", "scalars_*.xlsx"))
+    ):
+        ending = os.path.basename(filepath_s)[len("scalars_") : -5]
+        # the step can contain underscores, e.g. in loops over locations
+        year, _, step = ending.partition("_")
+        excel_files[(year, step)] = (filepath_s, timeseries_files.get(ending))
+    return excel_files
+
+
+def _postprocess_excel_step(filepath_s, filepath_t, strat_tes, total_number_households):
+    r"""
+    Post-processes the KPIs of one step in its excel files.
+
+    Only the sheets that are needed are read from the excel files.
+
+    Parameters
+    ----------
+    filepath_s: str
+        Path of the scalars file of the step.
+    filepath_t: str
+        Path of the timeseries_all_busses file of the step.
+    strat_tes: :pandas:`pandas.DataFrame<frame>` or None
+        Inputs of the stratified thermal storage.
+    total_number_households: float
+        Total number of households in the simulation.
+
+    Returns
+    -------
+    None
+    """
+    # read sheets of scalars
+    scalars = pd.read_excel(
+        filepath_s,
+        sheet_name=[
+            "cost_matrix",
+            "scalar_matrix",
+            "scalars",
+            "KPI individual sectors",
+        ],
+    )
+    file_sheet1 = scalars["cost_matrix"]
+    file_sheet2 = scalars["scalar_matrix"]
+    file_sheet2.index = file_sheet2["label"]
+    file_sheet3 = scalars["scalars"]
+    file_sheet3.index = file_sheet3.iloc[:, 0]
+    file_sheet4 = scalars["KPI individual sectors"]
+
+    # add heat demand to electricty demand it heat demand exists
+    with pd.ExcelFile(filepath_t) as excel_file:
+        timeseries = excel_file.parse(sheet_name="Electricity bus")
+        if "Heat pump" in timeseries.columns:
+            timeseries_heat = excel_file.parse(sheet_name="Heat bus")
+    electricity_demand = _get_electricity_demand(timeseries)
+    if "Heat pump" in timeseries.columns:
+        timeseries["Electricity demand"] = electricity_demand
+        with pd.ExcelWriter(filepath_t, mode="a") as writer:
+            timeseries.to_excel(writer, sheet_name="Electricity bus")
         logging.info(
-            f"Scalars file sheet {filepath_s} has been overwritten with new KPI's"
+            f"The timeseries_all_flows file {filepath_t} has been overwritten with the new electricity demand."
         )
+        _add_heat_kpis(
+            scalar_matrix=file_sheet2,
+            scalars=file_sheet3,
+            timeseries_heat=timeseries_heat,
+            strat_tes=strat_tes,
+            total_number_households=total_number_households,
+        )
+
+    _recalculate_kpis(
+        scalar_matrix=file_sheet2,
+        scalars=file_sheet3,
+        electricity_demand=electricity_demand,
+    )
+    # the first column holds the names of the scalars
+    file_sheet3["Unnamed: 0"] = file_sheet3.index
+
+    # save excel sheets
+    with pd.ExcelWriter(filepath_s, mode="a") as writer:
+        file_sheet1.to_excel(writer, sheet_name="cost_matrix", index=None)
+        file_sheet2.to_excel(writer, sheet_name="scalar_matrix", index=None)
+        file_sheet3.to_excel(writer, sheet_name="scalars", index=None)
+        file_sheet4.to_excel(writer, sheet_name="KPI individual sectors", index=None)
+    logging.info(f"Scalars file sheet {filepath_s} has been overwritten with new KPI's")
+
+
+def _postprocess_stored_step(
+    loop_output_directory, scenario, year, step, strat_tes, total_number_households
+):
+    r"""
+    Post-processes the KPIs of one step in the loop results store.
+
+    The sheets "scalar_matrix1" and "scalars1" are added to the scalars of the
+    step, like in the Excel files of :py:func:`~.postprocessing_kpi`, see
+    :py:func:`~.loop_results.store_step_scalars`.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+    scenario: str
+        Name of the scenario.
+    year: int
+        Year of the step.
+    step: str
+        Gradation of the loop variable.
+    strat_tes: :pandas:`pandas.DataFrame<frame>` or None
+        Inputs of the stratified thermal storage.
+    total_number_households: float
+        Total number of households in the simulation.
+
+    Returns
+    -------
+    None
+    """
+    scalar_matrix = loop_results.load_scalars(
+        loop_output_directory, "scalar_matrix", year=year, step=step
+    ).reset_index(drop=True)
+    scalar_matrix.index = scalar_matrix["label"]
+    # the values of the scalars are in column 0 as in the Excel files
+    scalars = loop_results.load_scalars(
+        loop_output_directory, "scalars", year=year, step=step
+    ).droplevel(loop_results.STEP_COLUMNS)
+    scalars = scalars.rename(columns={"0": 0})
+
+    timeseries = loop_results.load_timeseries(
+        loop_output_directory, "Electricity bus", year=year, step=step
+    )
+    electricity_demand = _get_electricity_demand(timeseries)
+    if "Heat pump" in timeseries.columns:
+        _add_heat_kpis(
+            scalar_matrix=scalar_matrix,
+            scalars=scalars,
+            timeseries_heat=loop_results.load_timeseries(
+                loop_output_directory, "Heat bus", year=year, step=step
+            ),
+            strat_tes=strat_tes,
+            total_number_households=total_number_households,
+        )
+    _recalculate_kpis(
+        scalar_matrix=scalar_matrix,
+        scalars=scalars,
+        electricity_demand=electricity_demand,
+    )
+    loop_results.store_step_scalars(
+        loop_output_directory,
+        scenario,
+        year,
+        step,
+        {
+            "scalar_matrix1": scalar_matrix.drop(columns="label"),
+            "scalars1": scalars.rename_axis(None),
+        },
+    )
+
+
+def _get_electricity_demand(timeseries):
+    r"""
+    Returns the electricity demand including the demand of the heat pump.
+
+    Parameters
+    ----------
+    timeseries: :pandas:`pandas.DataFrame<frame>`
+        Flows of the electricity bus.
+
+    Returns
+    -------
+    :pandas:`pandas.Series<series>`
+        Electricity demand.
+    """
+    if "Heat pump" in timeseries.columns:
+        return timeseries["Electricity demand"] + timeseries["Heat pump"]
+    else:
+        return timeseries["Electricity demand"]
+
+
+def _add_heat_kpis(
+    scalar_matrix, scalars, timeseries_heat, strat_tes, total_number_households
+):
+    r"""
+    Adds the capacities of one TES and one heat pump to `scalars`.
+
+    Parameters
+    ----------
+    scalar_matrix: :pandas:`pandas.DataFrame<frame>`
+        Sheet "scalar_matrix" of the scalars with the labels as index.
+    scalars: :pandas:`pandas.DataFrame<frame>`
+        Sheet "scalars" of the scalars with the names as index and the values in
+        column 0. It is changed in place.
+    timeseries_heat: :pandas:`pandas.DataFrame<frame>`
+        Flows of the heat bus.
+    strat_tes: :pandas:`pandas.DataFrame<frame>` or None
+        Inputs of the stratified thermal storage. If None, the TES is not
+        evaluated.
+    total_number_households: float
+        Total number of households in the simulation.
+
+    Returns
+    -------
+    None
+    """
+    if "TES output power" in timeseries_heat and strat_tes is not None:
+        heat_capacity = 4195.52
+        density = 971.803
+        temp_h = strat_tes.at["temp_h", "var_value"]
+        temp_c = strat_tes.at["temp_c", "var_value"]
+        diameter = strat_tes.at["diameter", "var_value"]
+        # Calculate maximum capacity, nominal capacity and height
+        # of one storage unit
+        maximal_tes_capacity = scalar_matrix.at[
+            "TES storage capacity", "optimizedAddCap"
+        ]
+        # There is 15 % of unused storage volume according to
+        # https://op.europa.eu/en/publication-detail/-/publication/312f0f62-dfbd-11e7-9749-01aa75ed71a1/language-en
+        # The nominal storage capacity is hence the maximum storage capacity multiplied by 1.15
+        nominal_storage_capacity = maximal_tes_capacity * 1.15
+        # Calculate volume of TES using oemof-thermal's equations
+        # in stratified_thermal_storage.py
+        volume = (
+            maximal_tes_capacity
+            * 1000
+            / (heat_capacity * density * (temp_h - temp_c) * (1 / 3600))
+        )
+        # Calculate height of TES using oemof-thermal's equations
+        # in stratified_thermal_storage.py
+        height = volume / (0.25 * np.pi * diameter ** 2)
+        # Divide total capacity through number of households = number of plants
+        scalars.at["Installed capacity per TES", 0] = (
+            maximal_tes_capacity / total_number_households
+        )
+        # Divide total nominal capacity through number of households = number of plants
+        scalars.at["Installed nominal capacity per TES", 0] = (
+            nominal_storage_capacity / total_number_households
+        )
+        # Divide total height of all TES through number of households = number of plants
+        scalars.at["Height of each TES", 0] = height / total_number_households
+    if "Heat pump" in timeseries_heat.columns:
+        # Calculate maximum capacity of one heat pump unit and write to scalars
+        maximal_hp_capacity = max(timeseries_heat["Heat pump"])
+        # Divide total capacity through number of households = number of plants
+        scalars.at["Installed capacity per heat pump", 0] = (
+            maximal_hp_capacity / total_number_households
+        )
+
+
+def _recalculate_kpis(scalar_matrix, scalars, electricity_demand):
+    r"""
+    Recalculates the KPIs that depend on the electricity demand.
+
+    Parameters
+    ----------
+    scalar_matrix: :pandas:`pandas.DataFrame<frame>`
+        Sheet "scalar_matrix" of the scalars with the labels as index. It is
+        changed in place.
+    scalars: :pandas:`pandas.DataFrame<frame>`
+        Sheet "scalars" of the scalars with the names as index and the values in
+        column 0. It is changed in place.
+    electricity_demand: :pandas:`pandas.Series<series>`
+        Electricity demand including the demand of the heat pump.
+
+    Returns
+    -------
+    None
+    """
+    scalar_matrix.at["Electricity demand", "total_flow"] = sum(electricity_demand) * (
+        -1
+    )
+    scalars.at["Total_demandElectricity", 0] = sum(electricity_demand) * (-1)
+    scalars.at["Degree of NZE", 0] = (
+        1
+        + (
+            scalars.at["Total_feedinElectricity", 0]
+            - scalars.at[
+                "Total_consumption_from_energy_provider_electricity_equivalent", 0
+            ]
+        )
+        / scalars.at["Total_demandElectricity", 0]
+    )
+    scalars.at["Degree of autonomy", 0] = (
+        scalars.at["Total_demandElectricity", 0]
+        - scalars.at["Total_consumption_from_energy_providerElectricity", 0]
+    ) / scalars.at["Total_demandElectricity", 0]
+    scalars.at["Onsite energy fraction", 0] = (
+        scalars.at["Total internal renewable generation", 0]
+        - scalars.at["Total_feedinElectricity", 0]
+        - scalars.at["Total_excessElectricity", 0]
+    ) / scalars.at["Total internal renewable generation", 0]
@@ -0,0 +1,310 @@
+"""
+This module provides fingerprints and a manifest for reusing generated files.
+
+A fingerprint is a hash of all inputs a generated file depends on. The
+fingerprints of the generated files of a directory are saved to the manifest
+'cache_manifest.json' in that directory. As long as the fingerprint of the
+inputs matches the one in the manifest and the file has not been modified since,
+the file does not need to be generated again.
+
+Generated files are written to a temporary file that then replaces the file, so
+that a file is never left half-written and a file that is hard-linked into a
+scenario workspace (see :py:mod:`~pvcompare.scenario_workspace`) is not changed
+in the other workspaces.
+
+Functions this module contains:
+- get_fingerprint
+- get_directory_fingerprint
+- load_manifest
+- is_up_to_date
+- update_manifest
+- replace_files
+- write_csv
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+# name of the manifest file in the directory of the generated files
+MANIFEST_FILENAME = "cache_manifest.json"
+
+# lock of the manifests, that may be updated by stages running in parallel threads
+_MANIFEST_LOCK = threading.Lock()
+
+# permissions of new files, temporary files are created with 0o600 otherwise
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _update_hash(hash_object, value):
+    r"""
+    Updates `hash_object` with the type and the content of `value`.
+
+    Parameters
+    ----------
+    hash_object: hashlib hash object
+        Hash object that is updated.
+    value: any
+        Value that is added to the hash. Pandas objects and numpy arrays are
+        hashed by their content, dicts, lists and tuples element-wise and all
+        other values by their representation.
+
+    Returns
+    -------
+    None
+    """
+    hash_object.update(type(value).__name__.encode())
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        if isinstance(value, pd.DataFrame):
+            _update_hash(hash_object, list(value.columns))
+        else:
+            _update_hash(hash_object, value.name)
+        hash_object.update(
+            pd.util.hash_pandas_object(value, index=True).values.tobytes()
+        )
+    elif isinstance(value, np.ndarray):
+        hash_object.update(str((value.dtype, value.shape)).encode())
+        hash_object.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            _update_hash(hash_object, key)
+            _update_hash(hash_object, value[key])
+    elif isinstance(value, (list, tuple)):
+        hash_object.update(str(len(value)).encode())
+        for item in value:
+            _update_hash(hash_object, item)
+    else:
+        hash_object.update(repr(value).encode())
+    hash_object.update(b"\x00")
+
+
+def get_fingerprint(*values):
+    r"""
+    Returns a fingerprint of `values`.
+
+    Parameters
+    ----------
+    values: any
+        Inputs the generated file depends on, e.g. parameters, data frames or
+        time series.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 hash of `values`.
+    """
+    hash_object = hashlib.sha256()
+    for value in values:
+        _update_hash(hash_object, value)
+    return hash_object.hexdigest()
+
+
+def get_directory_fingerprint(directory):
+    r"""
+    Returns a fingerprint of the files in `directory` and its subdirectories.
+
+    Hidden files, the manifest and the files recorded in the manifest are not
+    part of the fingerprint, as they are generated.
+
+    Parameters
+    ----------
+    directory: str
+        Input directory.
+
+    Returns
+    -------
+    str
+        Fingerprint of the relative paths and the contents of the files, see
+        :py:func:`~.get_fingerprint`.
+    """
+    contents = {}
+    for root, directories, filenames in os.walk(directory):
+        directories[:] = [name for name in directories if not name.startswith(".")]
+        generated = load_manifest(root)
+        for filename in filenames:
+            if (
+                filename.startswith(".")
+                or filename == MANIFEST_FILENAME
+                or filename in generated
+            ):
+                continue
+            file_path = os.path.join(root, filename)
+            with open(file_path, "rb") as file:
+                contents[os.path.relpath(file_path, directory)] = hashlib.sha256(
+                    file.read()
+                ).hexdigest()
+    return get_fingerprint(contents)
+
+
+def load_manifest(directory, manifest_filename=None):
+    r"""
+    Loads the manifest of the generated files in `directory`.
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the generated files.
+    manifest_filename: str or None
+        Name of the manifest. If None, `MANIFEST_FILENAME` is used.
+        Default: None.
+
+    Returns
+    -------
+    dict
+        Entries of the manifest by file name. Empty, if the manifest does not
+        exist or cannot be read.
+    """
+    if manifest_filename == None:
+        manifest_filename = MANIFEST_FILENAME
+    manifest_file = os.path.join(directory, manifest_filename)
+    if not os.path.isfile(manifest_file):
+        return {}
+    try:
+        with open(manifest_file, "r") as json_file:
+            manifest = json.load(json_file)
+    except (ValueError, OSError):
+        logging.warning(f"The manifest {manifest_file} cannot be read and is reset.")
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def is_up_to_date(directory, filename, fingerprint):
+    r"""
+    Checks if the file `filename` in `directory` was generated from `fingerprint`.
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the generated file.
+    filename: str
+        Name of the generated file.
+    fingerprint: str
+        Fingerprint of the inputs of the file, see :py:func:`~.get_fingerprint`.
+
+    Returns
+    -------
+    bool
+        True, if the file exists, its entry in the manifest has the fingerprint
+        `fingerprint` and the file has not been modified after the entry was
+        made.
+    """
+    file_path = os.path.join(directory, filename)
+    if not os.path.isfile(file_path):
+        return False
+    entry = load_manifest(directory).get(filename)
+    if not isinstance(entry, dict):
+        return False
+    stat = os.stat(file_path)
+    return (
+        entry.get("fingerprint") == fingerprint
+        and entry.get("size") == stat.st_size
+        and entry.get("mtime") == stat.st_mtime_ns
+    )
+
+
+def update_manifest(directory, filename, fingerprint):
+    r"""
+    Records in the manifest of `directory` that `filename` was generated from `fingerprint`.
+
+    The manifest is written with :py:func:`~.replace_files`, so that an
+    interrupted run does not leave a corrupted manifest, and it is updated under
+    a lock, so that no entry is lost if several threads update it.
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the generated file.
+    filename: str
+        Name of the generated file.
+    fingerprint: str
+        Fingerprint of the inputs of the file, see :py:func:`~.get_fingerprint`.
+
+    Returns
+    -------
+    None
+    """
+    stat = os.stat(os.path.join(directory, filename))
+    with _MANIFEST_LOCK:
+        manifest = load_manifest(directory)
+        manifest[filename] = {
+            "fingerprint": fingerprint,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+        }
+        replace_files(
+            {
+                os.path.join(directory, MANIFEST_FILENAME): json.dumps(
+                    manifest, indent=4, sort_keys=True
+                )
+            }
+        )
+
+
+def replace_files(contents):
+    r"""
+    Replaces files with new contents.
+
+    All contents are written to temporary files in the directories of the files
+    first. Only then the files are replaced, so that no file is left half-written
+    if writing fails.
+
+    Parameters
+    ----------
+    contents: dict
+        New contents (str or bytes) by path of the file.
+
+    Returns
+    -------
+    None
+    """
+    temporary_files = {}
+    try:
+        for filename, content in contents.items():
+            file_descriptor, temporary_file = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(filename)),
+                prefix=".",
+                suffix=os.path.splitext(filename)[1],
+            )
+            temporary_files[filename] = temporary_file
+            if isinstance(content, bytes):
+                with os.fdopen(file_descriptor, "wb") as file:
+                    file.write(content)
+            else:
+                with os.fdopen(file_descriptor, "w", newline="") as file:
+                    file.write(content)
+            if os.path.isfile(filename):
+                os.chmod(temporary_file, os.stat(filename).st_mode & 0o777)
+            else:
+                os.chmod(temporary_file, 0o666 & ~_UMASK)
+        for filename, temporary_file in list(temporary_files.items()):
+            os.replace(temporary_file, filename)
+            del temporary_files[filename]
+    finally:
+        for temporary_file in temporary_files.values():
+            os.remove(temporary_file)
+
+
+def write_csv(data, filename, **kwargs):
+    r"""
+    Writes `data` to the csv file `filename` with :py:func:`~.replace_files`.
+
+    Parameters
+    ----------
+    data: :pandas:`pandas.DataFrame<frame>` or :pandas:`pandas.Series<series>`
+        Data that is written.
+    filename: str
+        Path of the csv file.
+    kwargs:
+        Keyword arguments of :pandas:`pandas.DataFrame.to_csv<frame>`.
+
+    Returns
+    -------
+    None
+    """
+    replace_files({filename: data.to_csv(**kwargs)})
@@ -12,20 +12,49 @@ functions this module contains:
 - add_file_name_to_energy_consumption_file
 - add_evaluated_period_to_simulation_settings
 - add_parameter_to_mvs_file
+- add_parameters_to_mvs_file
 - load_parameter_from_mvs_file
 - add_parameters_to_storage_xx_file
+- csv_elements_workspace
+- lock_csv_elements
+- record_mvs_files
+- read_mvs_file
+- write_mvs_file
+- get_mvs_file_content
 
 """
 import pandas as pd
 import os
 import logging
+import threading
+import contextlib
 from pvcompare import constants
+from pvcompare import static_inputs
+from pvcompare import time_index
+from pvcompare import cache
 
 try:
     import matplotlib.pyplot as plt
 except ImportError:
     plt = None
 
+try:
+    import fcntl
+except ImportError:
+    # advisory file locks are not available on Windows
+    fcntl = None
+
+# name of the lock file of `csv_elements` in the mvs inputs directory
+LOCK_FILENAME = ".csv_elements.lock"
+
+# open workspaces of `csv_elements` by directory, see csv_elements_workspace()
+_WORKSPACES = {}
+# number of nested locks of `csv_elements` by directory of the current thread
+_LOCKS = threading.local()
+# sets of accessed files of `csv_elements` by directory of the current thread, see
+# record_mvs_files()
+_RECORDERS = threading.local()
+
 
 def add_scenario_name_to_project_data(user_inputs_mvs_directory, scenario_name):
     r"""
@@ -124,15 +153,12 @@ def add_location_and_year_to_project_data(
             "latitude, longitude and country into the main.py user inputs."
         )
     else:
-        for key in params:
-            add_parameter_to_mvs_file(
-                user_inputs_mvs_directory=user_inputs_mvs_directory,
-                mvs_filename="project_data.csv",
-                mvs_row=key,
-                mvs_column="project_data",
-                pvcompare_parameter=params[key],
-                warning=True,
-            )
+        add_parameters_to_mvs_file(
+            user_inputs_mvs_directory=user_inputs_mvs_directory,
+            mvs_filename="project_data.csv",
+            parameters={(key, "project_data"): params[key] for key in params},
+            warning=True,
+        )
     if year is None:
         start_date = load_parameter_from_mvs_file(
             user_inputs_mvs_directory=user_inputs_mvs_directory,
@@ -163,7 +189,10 @@ def check_for_valid_country_year(country, year, static_inputs_directory):
 
     Returns error if the country or year of the simulation is not valid.
     Static input files that are checked: 'EUROSTAT_population.csv',
-    'list_of_workalender_countries.csv', 'total_electricity_consumption_residential.csv'
+    'list_of_workalender_countries.csv', 'electricity_consumption_residential.xlsx'.
+    The statistics are taken from the compiled static inputs, see
+    :py:func:`~.static_inputs.load_statistics`. Only countries and years for which
+    values are available are valid.
 
     Parameters
     ----------
@@ -180,35 +209,20 @@ def check_for_valid_country_year(country, year, static_inputs_directory):
     -------
     None
     """
-    pop = pd.read_csv(
-        os.path.join(static_inputs_directory, "EUROSTAT_population.csv"),
-        header=0,
-        sep=",",
+    countries_pop, years_pop = static_inputs.get_countries_and_years(
+        filename="EUROSTAT_population.csv",
+        static_inputs_directory=static_inputs_directory,
+    )
+    countries_consumption, years_consumption = static_inputs.get_countries_and_years(
+        filename="electricity_consumption_residential.xlsx",
+        static_inputs_directory=static_inputs_directory,
     )
     workalendar = pd.read_csv(
         os.path.join(static_inputs_directory, "list_of_workalender_countries.csv"),
         header=0,
     )
-    consumption = pd.read_excel(
-        os.path.join(
-            static_inputs_directory, "electricity_consumption_residential.xlsx"
-        ),
-        header=1,
-        index_col=0,
-    )
-
-    countries_pop = set(pop["country"][:43])
     countries_workalender = set(workalendar["country"])
-    countries_consumption = set(consumption.index[:30])
-
-    years_pop = set([x for x in pop.columns if x != "country"])
-    years_consumption = set(
-        [
-            str(x)
-            for x in consumption.columns
-            if x not in ["country", "ISO code", "Unit", "Source Code", "Note", "Source"]
-        ]
-    )
+
     possible_countries = countries_pop & countries_workalender & countries_consumption
     possible_years = years_pop & years_consumption
 
@@ -219,7 +233,7 @@ def check_for_valid_country_year(country, year, static_inputs_directory):
             f"countries: {possible_countries}"
         )
 
-    if str(year) not in possible_years:
+    if int(year) not in possible_years:
         raise ValueError(
             f"The given year {year} is not recognized. "
             f"Please select one of the following "
@@ -256,20 +270,15 @@ def add_local_grid_parameters(static_inputs_directory, user_inputs_mvs_directory
     None
     """
     # load grid_parameters
-    grid_file_path = os.path.join(static_inputs_directory, "local_grid_parameters.xlsx")
-    grid_parameters = pd.read_excel(grid_file_path, index_col=0, header=0)
+    grid_parameters = static_inputs.load_local_grid_parameters(
+        static_inputs_directory=static_inputs_directory
+    )
 
     # load project data to select country
-    project_data_filename = os.path.join(
-        user_inputs_mvs_directory, "csv_elements/" "project_data.csv"
-    )
-    project_data = pd.read_csv(project_data_filename, index_col=0)
+    project_data = read_mvs_file(user_inputs_mvs_directory, "project_data.csv")
     country = project_data.at["country", "project_data"]
 
-    energy_providers_filename = os.path.join(
-        user_inputs_mvs_directory, "csv_elements/" "energyProviders.csv"
-    )
-    energy_providers = pd.read_csv(energy_providers_filename, index_col=0)
+    energy_providers = read_mvs_file(user_inputs_mvs_directory, "energyProviders.csv")
 
     list_parameters = [
         "electricity_price",
@@ -281,6 +290,8 @@ def add_local_grid_parameters(static_inputs_directory, user_inputs_mvs_directory
     if not energy_providers.columns.str.contains("Gas plant").any():
         list_parameters.remove("gas_price")
 
+    # collect the parameters to add them to 'energyProviders.csv' at once
+    provider_parameters = {}
     for parameter in list_parameters:
         value = grid_parameters.at[country, parameter]
 
@@ -295,35 +306,19 @@ def add_local_grid_parameters(static_inputs_directory, user_inputs_mvs_directory
         if parameter == "gas_price":
             for column in energy_providers.columns:
                 if column.startswith("Gas plant"):
-
-                    add_parameter_to_mvs_file(
-                        user_inputs_mvs_directory=user_inputs_mvs_directory,
-                        mvs_filename="energyProviders.csv",
-                        mvs_row="energy_price",
-                        mvs_column=column,
-                        pvcompare_parameter=value,
-                        warning=True,
-                    )
+                    provider_parameters[("energy_price", column)] = value
 
         elif parameter == "electricity_price":
-
-            add_parameter_to_mvs_file(
-                user_inputs_mvs_directory=user_inputs_mvs_directory,
-                mvs_filename="energyProviders.csv",
-                mvs_row="energy_price",
-                mvs_column="Electricity grid",
-                pvcompare_parameter=value,
-                warning=True,
-            )
+            provider_parameters[("energy_price", "Electricity grid")] = value
         else:
-            add_parameter_to_mvs_file(
-                user_inputs_mvs_directory=user_inputs_mvs_directory,
-                mvs_filename="energyProviders.csv",
-                mvs_row=parameter,
-                mvs_column="Electricity grid",
-                pvcompare_parameter=value,
-                warning=True,
-            )
+            provider_parameters[(parameter, "Electricity grid")] = value
+
+    add_parameters_to_mvs_file(
+        user_inputs_mvs_directory=user_inputs_mvs_directory,
+        mvs_filename="energyProviders.csv",
+        parameters=provider_parameters,
+        warning=True,
+    )
 
 
 def overwrite_mvs_energy_production_file(
@@ -368,10 +363,7 @@ def overwrite_mvs_energy_production_file(
         collections_mvs_inputs_directory = (
             constants.DEFAULT_COLLECTION_MVS_INPUTS_DIRECTORY
         )
-    filename = os.path.join(
-        user_inputs_mvs_directory, "csv_elements/" "energyProduction.csv"
-    )
-    user_input_ep = pd.read_csv(filename, index_col=0)
+    user_input_ep = read_mvs_file(user_inputs_mvs_directory, "energyProduction.csv")
 
     counter = 1
     if not overwrite_pv_parameters:
@@ -427,7 +419,7 @@ def overwrite_mvs_energy_production_file(
                     f"user_inputs/mvs_inputs/csv_elements/energyProduction.csv."
                 )
 
-        user_input_ep.to_csv(filename)
+        write_mvs_file(user_input_ep, user_inputs_mvs_directory, "energyProduction.csv")
 
 
 def add_parameters_to_energy_production_file(
@@ -453,23 +445,15 @@ def add_parameters_to_energy_production_file(
     -------
     None
     """
-    # add maximum capacity
+    # add maximum capacity and file name
     label = "PV " + technology
-    add_parameter_to_mvs_file(
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
-        mvs_filename="energyProduction.csv",
-        mvs_row="maximumCap",
-        mvs_column=label,
-        pvcompare_parameter=nominal_value,
-        warning=False,
-    )
-    # add file name
-    add_parameter_to_mvs_file(
+    add_parameters_to_mvs_file(
         user_inputs_mvs_directory=user_inputs_mvs_directory,
         mvs_filename="energyProduction.csv",
-        mvs_row="file_name",
-        mvs_column=label,
-        pvcompare_parameter=ts_filename,
+        parameters={
+            ("maximumCap", label): nominal_value,
+            ("file_name", label): ts_filename,
+        },
         warning=False,
     )
 
@@ -510,10 +494,15 @@ def add_evaluated_period_to_simulation_settings(time_series, user_inputs_mvs_dir
     r"""
     Adds number of days of the time series into 'simulation_settings.csv'.
 
+    The number of days only depends on the length of `time_series`, which is why
+    it is added once per simulation from the weather data in
+    :py:func:`~.main.apply_pvcompare`.
+
     Parameters
     ----------
     time_series: :pandas:`pandas.DataFrame<frame>`
-        Pv time series.
+        Hourly time series of the simulation, e.g. weather data or pv time
+        series.
     user_inputs_mvs_directory: str or None
         Path to MVS specific input directory. If None,
         `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
@@ -524,7 +513,7 @@ def add_evaluated_period_to_simulation_settings(time_series, user_inputs_mvs_dir
     None
     """
 
-    length = len(time_series.index) / 24
+    length = time_index.get_evaluated_period(time_series.index)
     add_parameter_to_mvs_file(
         user_inputs_mvs_directory=user_inputs_mvs_directory,
         mvs_filename="simulation_settings.csv",
@@ -564,6 +553,42 @@ def add_parameter_to_mvs_file(
         If True, a warning is returned that the parameter with the name
         `mvs_row` is overwritten.
 
+    Returns
+    ------
+    None
+    """
+    add_parameters_to_mvs_file(
+        user_inputs_mvs_directory=user_inputs_mvs_directory,
+        mvs_filename=mvs_filename,
+        parameters={(mvs_row, mvs_column): pvcompare_parameter},
+        warning=warning,
+    )
+
+
+def add_parameters_to_mvs_file(
+    user_inputs_mvs_directory, mvs_filename, parameters, warning=True,
+):
+    r"""
+    Overwrites several values from a file in 'mvs_inputs/csv_elements' at once.
+
+    The file is read and saved only once for all `parameters`.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+    mvs_filename: str
+        Name of the mvs-csv file.
+    parameters: dict
+        Parameters that should be added to the mvs_csv file with tuples of row
+        name and column name of the value in `mvs_filename` as keys, e.g.
+        {("energy_price", "Electricity grid"): 0.3}.
+    warning: bool
+        If True, a warning is returned for each parameter that is overwritten
+        with a different value.
+
     Returns
     ------
     None
@@ -571,24 +596,26 @@ def add_parameter_to_mvs_file(
     if user_inputs_mvs_directory == None:
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
 
-    filename = os.path.join(user_inputs_mvs_directory, "csv_elements", mvs_filename)
-    # load mvs_csv_file
-    mvs_file = pd.read_csv(filename, index_col=0)
+    # the file must not be modified by other processes until it is saved
+    with lock_csv_elements(user_inputs_mvs_directory):
+        # load mvs_csv_file
+        mvs_file = read_mvs_file(user_inputs_mvs_directory, mvs_filename)
+
+        for (mvs_row, mvs_column), pvcompare_parameter in parameters.items():
+            if warning is True:
+                if mvs_file.at[mvs_row, mvs_column] != pvcompare_parameter:
+                    logging.warning(
+                        f"The parameter {pvcompare_parameter} differs from "
+                        f"the parameter {mvs_row} in {mvs_filename} and thus will "
+                        f"be overwritten."
+                    )
 
-    if warning is True:
-        if mvs_file.at[mvs_row, mvs_column] != pvcompare_parameter:
-            logging.warning(
-                f"The parameter {pvcompare_parameter} differs from "
-                f"the parameter {mvs_row} in {mvs_filename} and thus will "
-                f"be overwritten."
+            mvs_file.loc[[mvs_row], [mvs_column]] = pvcompare_parameter
+            logging.info(
+                f"The parameter {mvs_row} has been added to the "
+                f"mvs input file {mvs_filename}."
             )
-
-    mvs_file.loc[[mvs_row], [mvs_column]] = pvcompare_parameter
-    mvs_file.to_csv(filename)
-    logging.info(
-        f"The parameter {mvs_row} has been added to the "
-        f"mvs input file {mvs_filename}."
-    )
+        write_mvs_file(mvs_file, user_inputs_mvs_directory, mvs_filename)
 
 
 def load_parameter_from_mvs_file(
@@ -619,9 +646,8 @@ def load_parameter_from_mvs_file(
     if user_inputs_mvs_directory == None:
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
 
-    filename = os.path.join(user_inputs_mvs_directory, "csv_elements", mvs_filename)
     # load mvs_csv_file
-    mvs_file = pd.read_csv(filename, index_col=0)
+    mvs_file = read_mvs_file(user_inputs_mvs_directory, mvs_filename)
 
     pvcompare_parameter = mvs_file.at[mvs_row, mvs_column]
 
@@ -661,10 +687,7 @@ def add_parameters_to_storage_xx_file(
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
 
     # Read storage_xx.csv from input value
-    storage_xx_path = os.path.join(
-        user_inputs_mvs_directory, "csv_elements", storage_csv
-    )
-    storage_xx = pd.read_csv(storage_xx_path, header=0, index_col=0,)
+    storage_xx = read_mvs_file(user_inputs_mvs_directory, storage_csv)
 
     parameters = {"installedCap": nominal_storage_capacity, "efficiency": 1 - loss_rate}
 
@@ -682,4 +705,306 @@ def add_parameters_to_storage_xx_file(
             logging.info(f"The {name} of the storage has been added to {storage_csv}.")
 
     # Save values in storage_xx.csv
-    storage_xx.to_csv(storage_xx_path)
+    write_mvs_file(storage_xx, user_inputs_mvs_directory, storage_csv)
+
+
+@contextlib.contextmanager
+def csv_elements_workspace(user_inputs_mvs_directory=None):
+    r"""
+    Keeps the files of 'mvs_inputs/csv_elements' in memory while it is open.
+
+    Within the workspace, :py:func:`~.read_mvs_file` loads each file only once and
+    :py:func:`~.write_mvs_file` changes the file in memory only. The modified
+    files are written to `csv_elements` when the outermost workspace of the
+    directory is closed. Each file is written to a temporary file first, that
+    replaces the original file only after all files are written. If an error
+    occurs within the workspace, the modifications are discarded and the files
+    in `csv_elements` are left unchanged. The files are locked with
+    :py:func:`~.lock_csv_elements` while the workspace is open.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+
+    Yields
+    ------
+    None
+
+    Examples
+    --------
+    >>> with csv_elements_workspace(user_inputs_mvs_directory):
+    ...     add_parameter_to_mvs_file(
+    ...         user_inputs_mvs_directory, "project_data.csv", "country",
+    ...         "project_data", "Germany",
+    ...     )  # doctest: +SKIP
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+    key = os.path.abspath(user_inputs_mvs_directory)
+
+    # a nested workspace uses the workspace that is already open
+    if key in _WORKSPACES:
+        yield
+        return
+
+    # the files must not be modified by other processes until they are saved
+    with lock_csv_elements(user_inputs_mvs_directory):
+        _WORKSPACES[key] = {"files": {}, "modified": {}}
+        try:
+            yield
+            workspace = _WORKSPACES[key]
+            cache.replace_files(
+                {
+                    os.path.join(key, "csv_elements", mvs_filename): workspace["files"][
+                        mvs_filename
+                    ].to_csv(na_rep=na_rep)
+                    for mvs_filename, na_rep in workspace["modified"].items()
+                }
+            )
+            if workspace["modified"]:
+                logging.info(
+                    f"The modified mvs input files {list(workspace['modified'])} "
+                    f"have been saved to {os.path.join(key, 'csv_elements')}."
+                )
+        finally:
+            del _WORKSPACES[key]
+
+
+@contextlib.contextmanager
+def lock_csv_elements(user_inputs_mvs_directory=None):
+    r"""
+    Locks the files of 'mvs_inputs/csv_elements' against other processes.
+
+    An exclusive advisory lock of the file '.csv_elements.lock' in
+    `user_inputs_mvs_directory` is held while the context is open. Other pvcompare
+    processes or threads that modify the files of the same `csv_elements` wait
+    until the lock is released. Nested locks of the same directory within one
+    thread are acquired only once. While a :py:func:`~.csv_elements_workspace` of
+    the directory is open, it holds the lock for all threads of the process, e.g.
+    for the stages of :py:func:`~pvcompare.pipeline.run_pipeline` that are
+    executed in parallel. On systems without `fcntl` (Windows) no lock is
+    acquired.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+
+    Yields
+    ------
+    None
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+    key = os.path.abspath(user_inputs_mvs_directory)
+
+    depths = _LOCKS.__dict__.setdefault("depths", {})
+    if key in depths or key in _WORKSPACES or fcntl is None:
+        depths[key] = depths.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            depths[key] -= 1
+            if depths[key] == 0:
+                del depths[key]
+        return
+
+    with open(os.path.join(key, LOCK_FILENAME), "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        depths[key] = 1
+        try:
+            yield
+        finally:
+            del depths[key]
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def record_mvs_files(user_inputs_mvs_directory=None):
+    r"""
+    Records the names of the files of 'mvs_inputs/csv_elements' that are accessed.
+
+    The files are kept in a :py:func:`~.csv_elements_workspace` while the
+    context is open. The names of all files that are read with
+    :py:func:`~.read_mvs_file` or saved with :py:func:`~.write_mvs_file` by the
+    current thread within the context are added to the yielded set.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+
+    Yields
+    ------
+    set
+        Names of the accessed files.
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+
+    with csv_elements_workspace(user_inputs_mvs_directory):
+        recorders = _RECORDERS.__dict__.setdefault("recorders", {}).setdefault(
+            os.path.abspath(user_inputs_mvs_directory), []
+        )
+        mvs_filenames = set()
+        recorders.append(mvs_filenames)
+        try:
+            yield mvs_filenames
+        finally:
+            recorders[:] = [
+                recorder for recorder in recorders if recorder is not mvs_filenames
+            ]
+
+
+def read_mvs_file(user_inputs_mvs_directory, mvs_filename):
+    r"""
+    Loads a file from 'mvs_inputs/csv_elements'.
+
+    If a :py:func:`~.csv_elements_workspace` of `user_inputs_mvs_directory` is
+    open, the file is only read from disk if it is not in the workspace yet.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+    mvs_filename: str
+        Name of the mvs-csv file.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Content of the file with its first column as index. Changes to the
+        data frame only take effect if it is passed to :py:func:`~.write_mvs_file`.
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+
+    workspace = _WORKSPACES.get(os.path.abspath(user_inputs_mvs_directory))
+    if workspace is None:
+        return pd.read_csv(
+            os.path.join(user_inputs_mvs_directory, "csv_elements", mvs_filename),
+            index_col=0,
+        )
+    _record_access(user_inputs_mvs_directory, mvs_filename)
+    if mvs_filename not in workspace["files"]:
+        # a file that has been loaded by another thread in the meantime is kept
+        workspace["files"].setdefault(
+            mvs_filename,
+            pd.read_csv(
+                os.path.join(user_inputs_mvs_directory, "csv_elements", mvs_filename),
+                index_col=0,
+            ),
+        )
+    return workspace["files"][mvs_filename].copy()
+
+
+def write_mvs_file(mvs_file, user_inputs_mvs_directory, mvs_filename, na_rep=""):
+    r"""
+    Saves a file to 'mvs_inputs/csv_elements'.
+
+    If a :py:func:`~.csv_elements_workspace` of `user_inputs_mvs_directory` is
+    open, the file is only saved when the workspace is closed. Otherwise, the file
+    is written to a temporary file first, that then replaces the file, so that
+    the file is never left half-written.
+
+    Parameters
+    ----------
+    mvs_file: :pandas:`pandas.DataFrame<frame>`
+        Content of the file with its first column as index.
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+    mvs_filename: str
+        Name of the mvs-csv file.
+    na_rep: str
+        Representation of missing values in the file. Default: "".
+
+    Returns
+    -------
+    None
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+
+    workspace = _WORKSPACES.get(os.path.abspath(user_inputs_mvs_directory))
+    if workspace is None:
+        with lock_csv_elements(user_inputs_mvs_directory):
+            cache.replace_files(
+                {
+                    os.path.join(
+                        user_inputs_mvs_directory, "csv_elements", mvs_filename
+                    ): mvs_file.to_csv(na_rep=na_rep)
+                }
+            )
+    else:
+        workspace["files"][mvs_filename] = mvs_file.copy()
+        workspace["modified"][mvs_filename] = na_rep
+        _record_access(user_inputs_mvs_directory, mvs_filename)
+
+
+def _record_access(user_inputs_mvs_directory, mvs_filename):
+    r"""
+    Adds `mvs_filename` to the recorders of the current thread.
+
+    See :py:func:`~.record_mvs_files`.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+    mvs_filename: str
+        Name of the mvs-csv file.
+
+    Returns
+    -------
+    None
+    """
+    recorders = _RECORDERS.__dict__.get("recorders", {})
+    for recorder in recorders.get(os.path.abspath(user_inputs_mvs_directory), []):
+        recorder.add(mvs_filename)
+
+
+def get_mvs_file_content(user_inputs_mvs_directory, mvs_filename):
+    r"""
+    Returns the content of a file of 'mvs_inputs/csv_elements' as it is saved.
+
+    If a :py:func:`~.csv_elements_workspace` of `user_inputs_mvs_directory` is
+    open, the content of the file in the workspace is returned.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+    mvs_filename: str
+        Name of the mvs-csv file.
+
+    Returns
+    -------
+    content: str or None
+        Content of the file in csv format. None, if the file does not exist.
+    na_rep: str
+        Representation of missing values in `content`.
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+
+    workspace = _WORKSPACES.get(os.path.abspath(user_inputs_mvs_directory), {})
+    na_rep = workspace.get("modified", {}).get(mvs_filename, "")
+    if mvs_filename not in workspace.get("files", {}) and not os.path.isfile(
+        os.path.join(user_inputs_mvs_directory, "csv_elements", mvs_filename)
+    ):
+        return None, na_rep
+    mvs_file = read_mvs_file(user_inputs_mvs_directory, mvs_filename)
+    return mvs_file.to_csv(na_rep=na_rep), na_rep
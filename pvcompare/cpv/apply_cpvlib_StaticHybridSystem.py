@@ -6,6 +6,7 @@ from cpvlib import cpvlib
 from pvcompare.cpv.inputs import mod_params_cpv, mod_params_flatplate
 import os
 import pvcompare.constants as constants
+from pvcompare import shared_weather
 
 
 def create_cpv_time_series(
@@ -43,6 +44,8 @@ def create_cpv_time_series(
 
     location = pvlib.location.Location(latitude=lat, longitude=lon, tz="utc")
 
+    # columns are added to a view, so that `weather` is not modified
+    weather = shared_weather.get_weather_view(weather)
     weather.index = pd.to_datetime(weather.index)
 
     solar_zenith = location.get_solarposition(weather.index).zenith
@@ -92,7 +95,7 @@ def create_cpv_time_series(
         wind_speed=weather["wind_speed"],
     )
 
-    weather.fillna(0, inplace=True)
+    weather = weather.fillna(0)
     # calcparams_pvsyst
     (
         diode_parameters_cpv,
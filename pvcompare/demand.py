@@ -13,6 +13,7 @@ Optional:
 
 """
 
+import demandlib
 import demandlib.bdew as bdew
 import demandlib.particular_profiles as profiles
 import os
@@ -20,10 +21,13 @@ import sys
 import pandas as pd
 import numpy as np
 import inspect
+import collections
 from pkgutil import iter_modules
 from importlib import import_module
 from pvcompare import constants
 from pvcompare import check_inputs
+from pvcompare import static_inputs
+from pvcompare import cache
 
 import logging
 
@@ -41,6 +45,22 @@ try:
 except ImportError:
     workalendar = None
 
+# name of the file the registry of workalendar classes is persisted to
+WORKALENDAR_REGISTRY_FILENAME = "workalendar_registry.csv"
+# calendar classes by country name and holidays by (country, year), both are
+# filled on first use and kept for the lifetime of the process
+_WORKALENDAR_REGISTRY = {}
+_HOLIDAYS_CACHE = {}
+# demand profiles by the fingerprint of their inputs, see `_load_demand_profile`;
+# only the profiles that were used last are kept, so that loops in one process do
+# not keep the profiles of all steps in memory
+MAX_DEMAND_PROFILES = 8
+# version of demandlib whose normalized BDEW heat profile is evaluated for space
+# heating and warm water at once, see `_get_normalized_heat_profiles`; other
+# versions of the range in setup.py use the public API of demandlib
+BDEW_HEAT_PROFILE_DEMANDLIB_VERSION = "0.2.2"
+_DEMAND_PROFILES = collections.OrderedDict()
+
 
 def calculate_load_profiles(
     country,
@@ -52,6 +72,7 @@ def calculate_load_profiles(
     static_inputs_directory=None,
     user_inputs_pvcompare_directory=None,
     user_inputs_mvs_directory=None,
+    use_unit_demand_profiles=False,
 ):
     r"""
     Calculates electricity and heat load profiles for `country`, `storeys`, and `year`.
@@ -92,6 +113,13 @@ def calculate_load_profiles(
         `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
         Default: None.
 
+    use_unit_demand_profiles: bool
+        If True, the profile is calculated only once for one inhabitant and
+        scaled with the population of the buildings. This avoids recalculating
+        the profile when only the number of storeys changes, e.g. in a loop over
+        storeys. The scaled profile may differ from the directly calculated one
+        by floating point rounding. Default: False.
+
     Returns
     ------
     None
@@ -107,9 +135,8 @@ def calculate_load_profiles(
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
 
     # load eneryConsumption.csv
-    energyConsumption = pd.read_csv(
-        os.path.join(user_inputs_mvs_directory, "csv_elements/energyConsumption.csv"),
-        index_col=0,
+    energyConsumption = check_inputs.read_mvs_file(
+        user_inputs_mvs_directory, "energyConsumption.csv"
     )
 
     for column in energyConsumption:
@@ -126,6 +153,7 @@ def calculate_load_profiles(
                     user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
                     user_inputs_mvs_directory=user_inputs_mvs_directory,
                     column=column,
+                    use_unit_demand_profiles=use_unit_demand_profiles,
                 )
             elif energyConsumption.at["energyVector", column] == "Electricity":
                 calculate_power_demand(
@@ -136,6 +164,7 @@ def calculate_load_profiles(
                     user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
                     user_inputs_mvs_directory=user_inputs_mvs_directory,
                     column=column,
+                    use_unit_demand_profiles=use_unit_demand_profiles,
                 )
             else:
                 logging.warning(
@@ -153,6 +182,7 @@ def calculate_power_demand(
     static_inputs_directory=None,
     user_inputs_pvcompare_directory=None,
     user_inputs_mvs_directory=None,
+    use_unit_demand_profiles=False,
 ):
     r"""
     Calculates electricity demand profile for `country`, `storeys`, and `year`.
@@ -188,6 +218,13 @@ def calculate_power_demand(
         `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
         Default: None.
 
+    use_unit_demand_profiles: bool
+        If True, the profile is calculated only once for one inhabitant and
+        scaled with the population of the buildings. This avoids recalculating
+        the profile when only the number of storeys changes, e.g. in a loop over
+        storeys. The scaled profile may differ from the directly calculated one
+        by floating point rounding. Default: False.
+
     Returns
     -------
     shifted_elec_demand: :pandas:`pandas.DataFrame<frame>`
@@ -205,71 +242,27 @@ def calculate_power_demand(
 
     # load calendar for holidays
     logging.info("loading calender for %s" % country)
-    cal = get_workalendar_class(country)
-    holidays = dict(cal.holidays(int(year)))
+    holidays = get_holidays(
+        country=country, year=year, static_inputs_directory=static_inputs_directory
+    )
 
     logging.info("loading residential electricity demand")
     bp = pd.read_csv(
         os.path.join(user_inputs_pvcompare_directory, "building_parameters.csv"),
         index_col=0,
     )
-    # loading total residential electricity demand
-    filename_electr_SH = os.path.join(
-        static_inputs_directory, bp.at["filename_elect_SH", "value"]
-    )
-    filename_residential_electricity_demand = bp.at[
-        "filename_residential_electricity_demand", "value"
-    ]
-    filename_elec = os.path.join(
-        static_inputs_directory, filename_residential_electricity_demand
-    )
-    powerstat = pd.read_excel(filename_elec, header=1, index_col=0)
-
-    # loading residential space heating
-    electr_SH = pd.read_excel(filename_electr_SH, header=1, index_col=0)
-
-    # loading residential water heating
-    filename_electr_WH = os.path.join(
-        static_inputs_directory, bp.at["filename_elect_WH", "value"]
-    )
-    electr_WH = pd.read_excel(filename_electr_WH, header=1, index_col=0)
-
-    # loading residential cooking demand total
-    filename_total_cooking = os.path.join(
-        static_inputs_directory, bp.at["filename_total_cooking_consumption", "value"]
-    )
-    filename_electricity_cooking = os.path.join(
-        static_inputs_directory,
-        bp.at["filename_electricity_cooking_consumption", "value"],
-    )
-
-    total_cooking = pd.read_excel(filename_total_cooking, header=1, index_col=0)
-    elect_cooking = pd.read_excel(filename_electricity_cooking, header=1, index_col=0)
-
     # loading population for simulation
-    filename_population = bp.at["filename_country_population", "value"]
     population_per_storey = int(bp.at["population per storey", "value"])
     number_of_houses = int(bp.at["number of houses", "value"])
     population = storeys * population_per_storey * number_of_houses
 
-    # loading population of country
-    filename1 = os.path.join(static_inputs_directory, filename_population)
-    populations = pd.read_csv(filename1, index_col=0, sep=",")
-
-    # calculate annual demand.
-    # electricity_consumption = total_electricity_consumption -
-    # electricity_consumption_SH - electricity_consumption_WH +
-    # (total_consumption_cooking - electricity_consumption_cooking)
-    # Convert TWh in kWh
-    national_energyconsumption = (
-        powerstat.at[country, year]
-        - electr_SH.at[country, year]
-        - electr_WH.at[country, year]
-        + (total_cooking.at[country, year] - elect_cooking.at[country, year])
-    ) * 10 ** 9
-    annual_demand_per_population = (
-        national_energyconsumption / float(populations.at[country, str(year)])
-    ) * population
+    annual_demand_per_capita = _calculate_annual_power_demand_per_capita(
+        country=country,
+        year=year,
+        bp=bp,
+        static_inputs_directory=static_inputs_directory,
+    )
+    annual_demand_per_population = annual_demand_per_capita * population
 
     logging.info(
         "The annual demand for a population of %s" % population
@@ -277,33 +270,60 @@ def calculate_power_demand(
         + "is %s kW" % annual_demand_per_population
     )
 
-    ann_el_demand_h0 = {"h0": annual_demand_per_population}
-
-    # read standard load profiles
-    e_slp = bdew.ElecSlp(int(year), holidays=holidays)
-
-    # multiply given annual demand with timeseries
-    elec_demand = e_slp.get_profile(ann_el_demand_h0)
-
-    # Resample 15-minute values to hourly values.
-    elec_demand = elec_demand.resample("H").mean()
-
-    shifted_elec_demand = shift_working_hours(country=country, ts=elec_demand)
-    # rename column "h0" to kWh
-    shifted_elec_demand.rename(columns={"h0": "kWh"}, inplace=True)
-
     timeseries_directory = os.path.join(user_inputs_mvs_directory, "time_series/")
-
-    logging.info(
-        "The electrical load profile is completly calculated and "
-        "being saved under %s." % timeseries_directory
-    )
-
     # define the name of the output file of the time series
     el_demand_csv = f"electricity_load_{year}_{country}_{storeys}.csv"
 
-    filename = os.path.join(timeseries_directory, el_demand_csv)
-    shifted_elec_demand.to_csv(filename, index=False)
+    # the profile is only calculated if it is neither in memory nor saved
+    # for the same inputs
+    fingerprint = cache.get_fingerprint(
+        "electricity",
+        demandlib.__version__,
+        country,
+        int(year),
+        storeys,
+        bp,
+        annual_demand_per_population,
+        use_unit_demand_profiles,
+    )
+    shifted_elec_demand = _load_demand_profile(
+        fingerprint=fingerprint,
+        timeseries_directory=timeseries_directory,
+        filename=el_demand_csv,
+        year=year,
+    )
+    if shifted_elec_demand is None:
+        if use_unit_demand_profiles:
+            # scale the profile of one inhabitant, which is calculated only once
+            shifted_elec_demand = (
+                _get_unit_power_profile(
+                    country=country,
+                    year=year,
+                    holidays=holidays,
+                    annual_demand_per_capita=annual_demand_per_capita,
+                )
+                * population
+            )
+        else:
+            shifted_elec_demand = _calculate_power_profile(
+                country=country,
+                year=year,
+                annual_demand=annual_demand_per_population,
+                holidays=holidays,
+            )
+        _keep_demand_profile(fingerprint, shifted_elec_demand.copy())
+
+        logging.info(
+            "The electrical load profile is completly calculated and "
+            "being saved under %s." % timeseries_directory
+        )
+
+    _save_demand_profile(
+        demand_profile=shifted_elec_demand,
+        fingerprint=fingerprint,
+        timeseries_directory=timeseries_directory,
+        filename=el_demand_csv,
+    )
 
     # save the file name of the time series and the nominal value to
     # mvs_inputs/elements/csv/energyProduction.csv
@@ -327,6 +347,7 @@ def calculate_heat_demand(
     static_inputs_directory=None,
     user_inputs_pvcompare_directory=None,
     user_inputs_mvs_directory=None,
+    use_unit_demand_profiles=False,
 ):
     r"""
     Calculates heat demand profile for `storeys`, `country`, `year`.
@@ -369,6 +390,13 @@ def calculate_heat_demand(
         `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
         Default: None.
 
+    use_unit_demand_profiles: bool
+        If True, the profile is calculated only once for one inhabitant and
+        scaled with the population of the buildings. This avoids recalculating
+        the profile when only the number of storeys changes, e.g. in a loop over
+        storeys. The scaled profile may differ from the directly calculated one
+        by floating point rounding. Default: False.
+
     Returns
     -------
     shifted_heat_demand : :pandas:`pandas.DataFrame<frame>`
@@ -385,19 +413,13 @@ def calculate_heat_demand(
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
 
     # load workelendar for country
-    cal = get_workalendar_class(country)
-    holidays = dict(cal.holidays(int(year)))
+    holidays = get_holidays(
+        country=country, year=year, static_inputs_directory=static_inputs_directory
+    )
 
     # define temperature
     temp = weather["temp_air"]
 
-    # Create DataFrame for demand timeseries
-    demand = pd.DataFrame(
-        index=pd.date_range(
-            pd.datetime(int(year), 1, 1, 0), periods=temp.count(), freq="H"
-        )
-    )
-
     # calculate annual demand
     # The annual heat consumption is calculated by adding up the total
     # consumption for SH and WH and subtracting the electrical consumption of
@@ -406,116 +428,715 @@ def calculate_heat_demand(
         os.path.join(user_inputs_pvcompare_directory, "building_parameters.csv"),
         index_col=0,
     )
-    filename_total_SH = os.path.join(
-        static_inputs_directory, bp.at["filename_total_SH", "value"]
-    )
-    filename_total_WH = os.path.join(
-        static_inputs_directory, bp.at["filename_total_WH", "value"]
-    )
     population_per_storey = int(bp.at["population per storey", "value"])
     number_of_houses = int(bp.at["number of houses", "value"])
     population = storeys * population_per_storey * number_of_houses
 
-    total_SH = pd.read_excel(filename_total_SH, header=1, index_col=0)
-    total_WH = pd.read_excel(filename_total_WH, header=1, index_col=0)
+    (
+        annual_heat_demand_per_capita,
+        annual_heat_demand_ww_per_capita,
+    ) = _calculate_annual_heat_demand_per_capita(
+        country=country,
+        year=year,
+        bp=bp,
+        static_inputs_directory=static_inputs_directory,
+    )
+    annual_heat_demand_per_population = annual_heat_demand_per_capita * population
+    annual_heat_demand_ww_per_population = annual_heat_demand_ww_per_capita * population
+
+    # Multi family house (mfh: Mehrfamilienhaus)
+    include_warm_water = eval(bp.at["include warm water", "value"])
+    # Read heating limit temperature
+    heating_lim_temp = int(bp.at["heating limit temperature", "value"])
+
+    timeseries_directory = os.path.join(user_inputs_mvs_directory, "time_series/")
+    # define the name of the output file of the time series
+    h_demand_csv = f"heat_load_{year}_{lat}_{lon}_{storeys}.csv"
+
+    # the profile is only calculated if it is neither in memory nor saved
+    # for the same inputs
+    fingerprint = cache.get_fingerprint(
+        "heat",
+        demandlib.__version__,
+        country,
+        int(year),
+        storeys,
+        bp,
+        temp,
+        include_warm_water,
+        heating_lim_temp,
+        annual_heat_demand_per_population,
+        annual_heat_demand_ww_per_population,
+        use_unit_demand_profiles,
+    )
+    shifted_heat_demand = _load_demand_profile(
+        fingerprint=fingerprint,
+        timeseries_directory=timeseries_directory,
+        filename=h_demand_csv,
+        year=year,
+    )
+    if shifted_heat_demand is None:
+        if use_unit_demand_profiles:
+            # scale the profile of one inhabitant, which is calculated only once
+            shifted_heat_demand = (
+                _get_unit_heat_profile(
+                    country=country,
+                    year=year,
+                    temperature=temp,
+                    holidays=holidays,
+                    annual_heat_demand_per_capita=annual_heat_demand_per_capita,
+                    annual_heat_demand_ww_per_capita=annual_heat_demand_ww_per_capita,
+                    include_warm_water=include_warm_water,
+                    heating_limit_temp=heating_lim_temp,
+                )
+                * population
+            )
+        else:
+            shifted_heat_demand = _calculate_heat_profile(
+                country=country,
+                year=year,
+                temperature=temp,
+                holidays=holidays,
+                annual_heat_demand=annual_heat_demand_per_population,
+                annual_heat_demand_ww=annual_heat_demand_ww_per_population,
+                include_warm_water=include_warm_water,
+                heating_limit_temp=heating_lim_temp,
+            )
+        _keep_demand_profile(fingerprint, shifted_heat_demand.copy())
+
+        logging.info(
+            "The heat load profile is completely calculated and "
+            "being saved under %s." % timeseries_directory
+        )
 
-    # load population
-    filename_population = bp.at["filename_country_population", "value"]
-    filename1 = os.path.join(static_inputs_directory, filename_population)
-    populations = pd.read_csv(filename1, index_col=0, sep=",")
+    _save_demand_profile(
+        demand_profile=shifted_heat_demand,
+        fingerprint=fingerprint,
+        timeseries_directory=timeseries_directory,
+        filename=h_demand_csv,
+    )
+    # save the file name of the time series and the nominal value to
+    # mvs_inputs/elements/csv/energyProduction.csv
+    check_inputs.add_file_name_to_energy_consumption_file(
+        column=column,
+        ts_filename=h_demand_csv,
+        user_inputs_mvs_directory=user_inputs_mvs_directory,
+    )
+    return shifted_heat_demand
+
+
+def calculate_demand_batch(
+    buildings,
+    year,
+    energy_vector="Electricity",
+    weather=None,
+    static_inputs_directory=None,
+    user_inputs_pvcompare_directory=None,
+):
+    r"""
+    Calculates the electricity or heat demand profiles of several buildings at once.
 
+    The demand profile of one inhabitant is calculated only once for each country
+    of `buildings` and scaled with the population of each building. The holidays,
+    the BDEW profile and the national statistics are therefore shared by all
+    buildings of a country. The profiles equal the ones of
+    :py:func:`~.calculate_power_demand` and :py:func:`~.calculate_heat_demand`
+    with `use_unit_demand_profiles=True`. In contrast to these functions, no time
+    series are saved and no MVS input files are changed.
+
+    Parameters
+    ----------
+    buildings: :pandas:`pandas.DataFrame<frame>`
+        One row for each building with the columns 'country' and 'storeys' and
+        optionally 'population per storey' and 'number of houses'. If the optional
+        columns are missing, the values of 'building_parameters.csv' are used.
+    year: int
+        Year for which the demand time series are calculated.
+    energy_vector: str
+        Either 'Electricity' or 'Heat'. Default: 'Electricity'.
+    weather: :pandas:`pandas.DataFrame<frame>` or None
+        Hourly weather data frame with the column 'temp_air', which is used for
+        all buildings. Required if `energy_vector` is 'Heat'. Default: None.
+    static_inputs_directory: str or None
+        Path to pvcompare static inputs. If None,
+        `constants.DEFAULT_STATIC_INPUTS_DIRECTORY` is used.
+        Default: None.
+    user_inputs_pvcompare_directory: str or None
+        Path to user input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY` is used.
+        Default: None.
+
+    Returns
+    -------
+    numpy.ndarray
+        Hourly demand in kWh with one row for each building in the order of
+        `buildings` and one column for each hour of `year`.
+    """
+    if static_inputs_directory == None:
+        static_inputs_directory = constants.DEFAULT_STATIC_INPUTS_DIRECTORY
+    if user_inputs_pvcompare_directory == None:
+        user_inputs_pvcompare_directory = (
+            constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY
+        )
+    if energy_vector not in ["Electricity", "Heat"]:
+        raise ValueError(
+            f"The energy vector {energy_vector} is not recognized. Please enter "
+            f"either >Heat< or >Electricity<."
+        )
+    if energy_vector == "Heat" and weather is None:
+        raise ValueError("The heat demand can only be calculated with `weather`.")
+
+    bp = pd.read_csv(
+        os.path.join(user_inputs_pvcompare_directory, "building_parameters.csv"),
+        index_col=0,
+    )
+    buildings = buildings.reset_index(drop=True)
+    populations = buildings["storeys"].values.astype(float)
+    for parameter in ["population per storey", "number of houses"]:
+        if parameter in buildings.columns:
+            populations = populations * buildings[parameter].values
+        else:
+            populations = populations * int(bp.at[parameter, "value"])
+
+    demand = None
+    for country, rows in buildings.groupby("country").indices.items():
+        holidays = get_holidays(
+            country=country, year=year, static_inputs_directory=static_inputs_directory
+        )
+        if energy_vector == "Electricity":
+            unit_profile = _get_unit_power_profile(
+                country=country,
+                year=year,
+                holidays=holidays,
+                annual_demand_per_capita=_calculate_annual_power_demand_per_capita(
+                    country=country,
+                    year=year,
+                    bp=bp,
+                    static_inputs_directory=static_inputs_directory,
+                ),
+            )
+        else:
+            (
+                annual_heat_demand_per_capita,
+                annual_heat_demand_ww_per_capita,
+            ) = _calculate_annual_heat_demand_per_capita(
+                country=country,
+                year=year,
+                bp=bp,
+                static_inputs_directory=static_inputs_directory,
+            )
+            unit_profile = _get_unit_heat_profile(
+                country=country,
+                year=year,
+                temperature=weather["temp_air"],
+                holidays=holidays,
+                annual_heat_demand_per_capita=annual_heat_demand_per_capita,
+                annual_heat_demand_ww_per_capita=annual_heat_demand_ww_per_capita,
+                include_warm_water=eval(bp.at["include warm water", "value"]),
+                heating_limit_temp=int(bp.at["heating limit temperature", "value"]),
+            )
+        if demand is None:
+            demand = np.empty((len(buildings), len(unit_profile)))
+        demand[rows] = np.outer(populations[rows], unit_profile["kWh"].values)
+
+    if demand is None:
+        demand = np.empty((0, 0))
+    return demand
+
+
+def _calculate_annual_power_demand_per_capita(
+    country, year, bp, static_inputs_directory
+):
+    r"""
+    Calculates the annual electricity demand of one inhabitant of `country` in `year`.
+
+    The annual electricity demand is the total residential electricity
+    consumption without the electricity consumption for space heating and
+    warm water plus the consumption for cooking that is not covered by
+    electricity, divided by the population of `country`.
+
+    Parameters
+    ----------
+    country: str
+        The country's name has to be in English and with capital first letter.
+    year: int
+        Year of the statistics.
+    bp: :pandas:`pandas.DataFrame<frame>`
+        Building parameters containing the file names of the statistics.
+    static_inputs_directory: str
+        Path to pvcompare static inputs.
+
+    Returns
+    -------
+    float
+        Annual electricity demand of one inhabitant in kWh.
+    """
+
+    def statistic(parameter):
+        return static_inputs.get_statistic(
+            country=country,
+            year=year,
+            filename=bp.at[parameter, "value"],
+            static_inputs_directory=static_inputs_directory,
+        )
+
+    # electricity_consumption = total_electricity_consumption -
+    # electricity_consumption_SH - electricity_consumption_WH +
+    # (total_consumption_cooking - electricity_consumption_cooking)
+    # Convert TWh in kWh
+    national_energyconsumption = (
+        statistic("filename_residential_electricity_demand")
+        - statistic("filename_elect_SH")
+        - statistic("filename_elect_WH")
+        + (
+            statistic("filename_total_cooking_consumption")
+            - statistic("filename_electricity_cooking_consumption")
+        )
+    ) * 10 ** 9
+    return national_energyconsumption / float(statistic("filename_country_population"))
+
+
+def _calculate_annual_heat_demand_per_capita(
+    country, year, bp, static_inputs_directory
+):
+    r"""
+    Calculates the annual heat demand of one inhabitant of `country` in `year`.
+
+    Parameters
+    ----------
+    country: str
+        The country's name has to be in English and with capital first letter.
+    year: int
+        Year of the statistics.
+    bp: :pandas:`pandas.DataFrame<frame>`
+        Building parameters containing the file names of the statistics.
+    static_inputs_directory: str
+        Path to pvcompare static inputs.
+
+    Returns
+    -------
+    annual_heat_demand: float
+        Annual heat demand for space heating of one inhabitant in kWh.
+    annual_heat_demand_ww: float
+        Annual heat demand for warm water of one inhabitant in kWh.
+    """
+
+    def statistic(parameter):
+        return static_inputs.get_statistic(
+            country=country,
+            year=year,
+            filename=bp.at[parameter, "value"],
+            static_inputs_directory=static_inputs_directory,
+        )
+
+    populations = float(statistic("filename_country_population"))
     # convert TWh in kWh
-    # Heat demand of residential space heating
-    heat_demand = total_SH.at[country, year] * 10 ** 9
-    annual_heat_demand_per_population = (
-        heat_demand / float(populations.at[country, str(year)])
-    ) * population
-    # Heat demand of residential water heating
-    heat_demand_ww = total_WH.at[country, year] * 10 ** 9
-    annual_heat_demand_ww_per_population = (
-        heat_demand_ww / float(populations.at[country, str(year)])
-    ) * population
+    annual_heat_demand = statistic("filename_total_SH") * 10 ** 9 / populations
+    annual_heat_demand_ww = statistic("filename_total_WH") * 10 ** 9 / populations
+    return annual_heat_demand, annual_heat_demand_ww
 
-    # Multi family house (mfh: Mehrfamilienhaus)
-    include_warm_water = eval(bp.at["include warm water", "value"])
 
-    # Calculate heat demand only for space heating
-    demand["h0"] = bdew.HeatBuilding(
+def _get_unit_power_profile(country, year, holidays, annual_demand_per_capita):
+    r"""
+    Returns the electricity profile of one inhabitant of `country` in `year`.
+
+    The profile is calculated with :py:func:`~._calculate_power_profile` only if
+    it is not in memory yet.
+
+    Parameters
+    ----------
+    country: str
+        The country's name has to be in English and with capital first letter.
+    year: int
+        Year of the profile.
+    holidays: dict
+        Holidays of `country` in `year`, see :py:func:`~.get_holidays`.
+    annual_demand_per_capita: float
+        Annual electricity demand of one inhabitant in kWh.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Hourly electricity demand of one inhabitant in the column 'kWh'. The
+        data frame is kept in memory and must not be altered.
+    """
+    unit_fingerprint = cache.get_fingerprint(
+        "electricity per capita",
+        demandlib.__version__,
+        country,
+        int(year),
+        annual_demand_per_capita,
+    )
+    unit_profile = _get_demand_profile(unit_fingerprint)
+    if unit_profile is None:
+        unit_profile = _calculate_power_profile(
+            country=country,
+            year=year,
+            annual_demand=annual_demand_per_capita,
+            holidays=holidays,
+        )
+        _keep_demand_profile(unit_fingerprint, unit_profile)
+    return unit_profile
+
+
+def _get_unit_heat_profile(
+    country,
+    year,
+    temperature,
+    holidays,
+    annual_heat_demand_per_capita,
+    annual_heat_demand_ww_per_capita,
+    include_warm_water,
+    heating_limit_temp,
+):
+    r"""
+    Returns the heat profile of one inhabitant of `country` in `year`.
+
+    The profile is calculated with :py:func:`~._calculate_heat_profile` only if
+    it is not in memory yet.
+
+    Parameters
+    ----------
+    country: str
+        The country's name has to be in English and with capital first letter.
+    year: int
+        Year of the profile.
+    temperature: :pandas:`pandas.Series<series>`
+        Hourly ambient temperature.
+    holidays: dict
+        Holidays of `country` in `year`, see :py:func:`~.get_holidays`.
+    annual_heat_demand_per_capita: float
+        Annual heat demand for space heating of one inhabitant in kWh.
+    annual_heat_demand_ww_per_capita: float
+        Annual heat demand for warm water of one inhabitant in kWh.
+    include_warm_water: bool
+        If True, the heat demand for warm water is added to the profile.
+    heating_limit_temp: int
+        Temperature limit for heating, see :py:func:`~.adjust_heat_demand`.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Hourly heat demand of one inhabitant in the column 'kWh'. The data frame
+        is kept in memory and must not be altered.
+    """
+    unit_fingerprint = cache.get_fingerprint(
+        "heat per capita",
+        demandlib.__version__,
+        country,
+        int(year),
+        temperature,
+        include_warm_water,
+        heating_limit_temp,
+        annual_heat_demand_per_capita,
+        annual_heat_demand_ww_per_capita,
+    )
+    unit_profile = _get_demand_profile(unit_fingerprint)
+    if unit_profile is None:
+        unit_profile = _calculate_heat_profile(
+            country=country,
+            year=year,
+            temperature=temperature,
+            holidays=holidays,
+            annual_heat_demand=annual_heat_demand_per_capita,
+            annual_heat_demand_ww=annual_heat_demand_ww_per_capita,
+            include_warm_water=include_warm_water,
+            heating_limit_temp=heating_limit_temp,
+        )
+        _keep_demand_profile(unit_fingerprint, unit_profile)
+    return unit_profile
+
+
+def _calculate_power_profile(country, year, annual_demand, holidays):
+    r"""
+    Calculates the hourly BDEW H0 electricity profile scaled to `annual_demand`.
+
+    Parameters
+    ----------
+    country: str
+        The country's name has to be in English and with capital first letter.
+    year: int
+        Year of the profile.
+    annual_demand: float
+        Annual electricity demand in kWh.
+    holidays: dict
+        Holidays of `country` in `year`, see :py:func:`~.get_holidays`.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Hourly electricity demand in the column 'kWh'.
+    """
+    ann_el_demand_h0 = {"h0": annual_demand}
+
+    # read standard load profiles
+    e_slp = bdew.ElecSlp(int(year), holidays=holidays)
+
+    # multiply given annual demand with timeseries
+    elec_demand = e_slp.get_profile(ann_el_demand_h0)
+
+    # Resample 15-minute values to hourly values.
+    elec_demand = elec_demand.resample("H").mean()
+
+    shifted_elec_demand = shift_working_hours(country=country, ts=elec_demand)
+    # rename column "h0" to kWh
+    shifted_elec_demand.rename(columns={"h0": "kWh"}, inplace=True)
+    return shifted_elec_demand
+
+
+def _calculate_heat_profile(
+    country,
+    year,
+    temperature,
+    holidays,
+    annual_heat_demand,
+    annual_heat_demand_ww,
+    include_warm_water,
+    heating_limit_temp,
+):
+    r"""
+    Calculates the hourly BDEW MFH heat profile scaled to the annual heat demand.
+
+    Parameters
+    ----------
+    country: str
+        The country's name has to be in English and with capital first letter.
+    year: int
+        Year of the profile.
+    temperature: :pandas:`pandas.Series<series>`
+        Hourly ambient temperature.
+    holidays: dict
+        Holidays of `country` in `year`, see :py:func:`~.get_holidays`.
+    annual_heat_demand: float
+        Annual heat demand for space heating in kWh.
+    annual_heat_demand_ww: float
+        Annual heat demand for warm water in kWh.
+    include_warm_water: bool
+        If True, the heat demand for warm water is added to the profile.
+    heating_limit_temp: int
+        Temperature limit for heating, see :py:func:`~.adjust_heat_demand`.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Hourly heat demand in the column 'kWh'.
+    """
+    # Create DataFrame for demand timeseries
+    demand = pd.DataFrame(
+        index=pd.date_range(
+            pd.datetime(int(year), 1, 1, 0), periods=temperature.count(), freq="H"
+        )
+    )
+
+    # Space heating and warm water are derived from one evaluation of the
+    # building, warm water is only included in the sigmoid function
+    building = bdew.HeatBuilding(
         demand.index,
         holidays=holidays,
-        temperature=temp,
+        temperature=temperature,
         shlp_type="MFH",
         building_class=2,
         wind_class=0,
-        annual_heat_demand=annual_heat_demand_per_population,
+        annual_heat_demand=annual_heat_demand,
         name="MFH",
-        ww_incl=False,  # This must be False. Warm water calc follows
-    ).get_bdew_profile()
+        ww_incl=True,
+    )
+    (
+        normalized_space_heating,
+        normalized_heat_with_ww,
+    ) = _get_normalized_heat_profiles(building=building)
 
-    # Read heating limit temperature
-    heating_lim_temp = int(bp.at["heating limit temperature", "value"])
+    # Calculate heat demand only for space heating
+    demand["h0"] = normalized_space_heating * annual_heat_demand
 
     if include_warm_water:
-        # Calculate annual heat demand with warm water included
-        annual_heat_demand_per_population = (
-            annual_heat_demand_per_population + annual_heat_demand_ww_per_population
+        # Get total heat demand with warm water included
+        heat_demand_with_ww = normalized_heat_with_ww * (
+            annual_heat_demand + annual_heat_demand_ww
         )
-
-        # Create a copy of demand dataframe for warm water calculations
-        demand_ww_calc = demand.copy()
-
-        # Get total heat demand with warm water
-        demand_ww_calc["h0_ww"] = bdew.HeatBuilding(
-            demand_ww_calc.index,
-            holidays=holidays,
-            temperature=temp,
-            shlp_type="MFH",
-            building_class=2,
-            wind_class=0,
-            annual_heat_demand=annual_heat_demand_per_population,
-            name="MFH",
-            ww_incl=True,
-        ).get_bdew_profile()
-
         # Calculate hourly difference in demand between space heating and space heating with warm water
-        demand_ww_calc["h0_diff"] = demand_ww_calc["h0_ww"] - demand_ww_calc["h0"]
+        heat_demand_ww = heat_demand_with_ww - demand["h0"]
 
         # for space heating *only* adjust the heat demand so there is no demand if daily mean temperature
         # is above the heating limit temperature
-        demand["h0"] = adjust_heat_demand(temp, heating_lim_temp, demand["h0"])
+        demand["h0"] = adjust_heat_demand(temperature, heating_limit_temp, demand["h0"])
         # Add the heat demand for warm water to the adjusted space heating demand
-        demand["h0"] = demand["h0"] + demand_ww_calc["h0_diff"]
+        demand["h0"] = demand["h0"] + heat_demand_ww
 
     else:
         # Adjust the heat demand so there is no demand if daily mean temperature
         # is above the heating limit temperature
-        demand["h0"] = adjust_heat_demand(temp, heating_lim_temp, demand["h0"])
+        demand["h0"] = adjust_heat_demand(temperature, heating_limit_temp, demand["h0"])
 
     shifted_heat_demand = shift_working_hours(country=country, ts=demand)
     shifted_heat_demand.rename(columns={"h0": "kWh"}, inplace=True)
+    return shifted_heat_demand
 
-    if user_inputs_mvs_directory is None:
-        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
-    timeseries_directory = os.path.join(user_inputs_mvs_directory, "time_series/")
 
-    logging.info(
-        "The electrical load profile is completely calculated and "
-        "being saved under %s." % timeseries_directory
+def _get_normalized_heat_profiles(building):
+    r"""
+    Returns the normalized heat profiles of `building` without and with warm water.
+
+    `bdew.HeatBuilding.get_normalized_bdew_profile()` calculates
+    :math:`kw \cdot h \cdot f \cdot sf` with the sigmoid function
+    :math:`h = a / (1 + (b / (T_{geo} - 40))^c) + d`, where only the parameter
+    :math:`d` depends on whether warm water is included. The geometric series of
+    the temperature, the hour factors `sf` and the weekday factors `f` are
+    therefore evaluated only once for both profiles. The results equal the ones
+    of two separate evaluations with `ww_incl` set to False and True.
+
+    As this follows the implementation of demandlib
+    `BDEW_HEAT_PROFILE_DEMANDLIB_VERSION`, the two profiles are evaluated
+    separately with `get_normalized_bdew_profile()` for other versions of
+    demandlib.
+
+    Parameters
+    ----------
+    building: :class:`demandlib.bdew.HeatBuilding`
+        Heat building with `ww_incl=True`.
+
+    Returns
+    -------
+    normalized_space_heating: :pandas:`pandas.Series<series>`
+        Normalized heat profile of space heating.
+    normalized_heat_with_ww: :pandas:`pandas.Series<series>`
+        Normalized heat profile of space heating and warm water.
+    """
+    if demandlib.__version__ != BDEW_HEAT_PROFILE_DEMANDLIB_VERSION:
+        normalized_profiles = []
+        for ww_incl in [False, True]:
+            building.ww_incl = ww_incl
+            normalized_profiles.append(building.get_normalized_bdew_profile())
+        return normalized_profiles[0], normalized_profiles[1]
+
+    building.df["temperature"] = building.temperature.values
+    building.df["temperature_geo"] = building.weighted_temperature(
+        how="geometric_series"
     )
-    # define the name of the output file of the time series
-    h_demand_csv = f"heat_load_{year}_{lat}_{lon}_{storeys}.csv"
+    sf = building.get_sf_values()
+    f = building.get_weekday_parameters()
+    [a, b, c, d] = building.get_sigmoid_parameters()
 
-    filename = os.path.join(timeseries_directory, h_demand_csv)
+    normalized_profiles = []
+    for parameter_d in [0, d]:
+        h = a / (1 + (b / (building.df["temperature_geo"] - 40)) ** c) + parameter_d
+        kw = 1.0 / (sum(h * f) / 24)
+        normalized_profiles.append(kw * h * f * sf)
+    return normalized_profiles[0], normalized_profiles[1]
 
-    shifted_heat_demand.to_csv(filename, index=False)
-    # save the file name of the time series and the nominal value to
-    # mvs_inputs/elements/csv/energyProduction.csv
-    check_inputs.add_file_name_to_energy_consumption_file(
-        column=column,
-        ts_filename=h_demand_csv,
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
+
+def _load_demand_profile(fingerprint, timeseries_directory, filename, year):
+    r"""
+    Loads a demand profile that has already been calculated for `fingerprint`.
+
+    The profile is taken from memory or, if it is not in memory, from the
+    file `filename` in `timeseries_directory` if this file was saved for the same
+    fingerprint (see :py:func:`~.cache.is_up_to_date`).
+
+    Parameters
+    ----------
+    fingerprint: str
+        Fingerprint of the inputs of the demand profile.
+    timeseries_directory: str
+        Directory of the time series of MVS.
+    filename: str
+        Name of the file of the demand profile.
+    year: int
+        Year of the demand profile. The saved file does not contain a time index,
+        which is therefore restored as hourly index starting at the beginning of
+        `year`.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>` or None
+        Copy of the demand profile with the column 'kWh' or None if the profile
+        has not been calculated for `fingerprint` yet.
+    """
+    demand_profile = _get_demand_profile(fingerprint)
+    if demand_profile is None:
+        if not cache.is_up_to_date(timeseries_directory, filename, fingerprint):
+            return None
+        demand_profile = pd.read_csv(
+            os.path.join(timeseries_directory, filename), float_precision="round_trip"
+        )
+        demand_profile.index = pd.date_range(
+            pd.Timestamp(int(year), 1, 1), periods=len(demand_profile), freq="H"
+        )
+        _keep_demand_profile(fingerprint, demand_profile)
+    logging.info(f"The demand profile {filename} is reused.")
+    return demand_profile.copy()
+
+
+def _get_demand_profile(fingerprint):
+    r"""
+    Returns the demand profile of `fingerprint` if it is kept in memory.
+
+    Parameters
+    ----------
+    fingerprint: str
+        Fingerprint of the inputs of the demand profile.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>` or None
+        Demand profile or None if it is not in memory. The data frame must not be
+        altered.
+    """
+    if fingerprint not in _DEMAND_PROFILES:
+        return None
+    _DEMAND_PROFILES.move_to_end(fingerprint)
+    return _DEMAND_PROFILES[fingerprint]
+
+
+def _keep_demand_profile(fingerprint, demand_profile):
+    r"""
+    Keeps `demand_profile` in memory.
+
+    If more than `MAX_DEMAND_PROFILES` profiles are kept, the profiles that were
+    used least recently are removed.
+
+    Parameters
+    ----------
+    fingerprint: str
+        Fingerprint of the inputs of the demand profile.
+    demand_profile: :pandas:`pandas.DataFrame<frame>`
+        Demand profile.
+
+    Returns
+    -------
+    None
+    """
+    _DEMAND_PROFILES[fingerprint] = demand_profile
+    _DEMAND_PROFILES.move_to_end(fingerprint)
+    while len(_DEMAND_PROFILES) > MAX_DEMAND_PROFILES:
+        _DEMAND_PROFILES.popitem(last=False)
+
+
+def _save_demand_profile(demand_profile, fingerprint, timeseries_directory, filename):
+    r"""
+    Saves `demand_profile` unless it has already been saved for `fingerprint`.
+
+    Parameters
+    ----------
+    demand_profile: :pandas:`pandas.DataFrame<frame>`
+        Demand profile with the column 'kWh'.
+    fingerprint: str
+        Fingerprint of the inputs of the demand profile.
+    timeseries_directory: str
+        Directory of the time series of MVS.
+    filename: str
+        Name of the file of the demand profile.
+
+    Returns
+    -------
+    None
+    """
+    if cache.is_up_to_date(timeseries_directory, filename, fingerprint):
+        return
+    cache.write_csv(
+        demand_profile, os.path.join(timeseries_directory, filename), index=False
     )
-    return shifted_heat_demand
+    cache.update_manifest(timeseries_directory, filename, fingerprint)
 
 
 def adjust_heat_demand(temperature, heating_limit_temp, demand):
@@ -669,26 +1290,152 @@ def shift_working_hours(country, ts):
         return ts
 
 
-def get_workalendar_class(country):
+def get_workalendar_registry(static_inputs_directory=None):
+    r"""
+    Returns a dictionary that maps country names to workalendar calendar classes.
+
+    The registry is built only once per process by importing all modules of
+    `workalendar <https://github.com/workalendar/workalendar>`_ and matching the
+    docstrings of their classes with country names. If `static_inputs_directory`
+    is given, the registry is also persisted to 'workalendar_registry.csv' next to
+    'list_of_workalender_countries.csv', so that following processes only import
+    the modules of the registered classes instead of scanning the whole package.
+    The file is rewritten whenever the registry is rebuilt, e.g. after an update
+    of workalendar. If the file cannot be written, e.g. in a read-only
+    installation, the registry is only kept in memory.
+
+    Parameters
+    ----------
+    static_inputs_directory: str or None
+        Directory of the pvcompare static inputs, where the registry is
+        persisted. If None, the registry is only kept in memory.
+        Default: None.
+
+    Returns
+    -------
+    dict
+        Dictionary with country names as keys and calendar classes as values.
+    """
+    version = str(getattr(workalendar, "__version__", ""))
+    registry_file = None
+    if static_inputs_directory is not None:
+        registry_file = os.path.join(
+            static_inputs_directory, WORKALENDAR_REGISTRY_FILENAME
+        )
+
+    # load persisted registry if it was created with the installed workalendar
+    if (
+        not _WORKALENDAR_REGISTRY
+        and registry_file is not None
+        and os.path.isfile(registry_file)
+    ):
+        persisted = pd.read_csv(registry_file, dtype=str, keep_default_na=False)
+        if (persisted["workalendar_version"] == version).all():
+            try:
+                for i, row in persisted.iterrows():
+                    module = import_module(row["module"])
+                    _WORKALENDAR_REGISTRY[row["country"]] = getattr(
+                        module, row["class_name"]
+                    )
+                logging.info(
+                    f"The workalendar registry is loaded from {registry_file}."
+                )
+            except (ImportError, AttributeError):
+                _WORKALENDAR_REGISTRY.clear()
+
+    rebuilt = not _WORKALENDAR_REGISTRY
+    if rebuilt:
+        # scan all workalendar modules and map the docstring of each class
+        for finder, name, ispkg in iter_modules(workalendar.__path__):
+            module_name = "workalendar.{}".format(name)
+            try:
+                import_module(module_name)
+            except ImportError:
+                # modules with missing optional dependencies hold no calendars
+                logging.debug(f"The module {module_name} could not be imported.")
+                continue
+            classes = inspect.getmembers(sys.modules[module_name], inspect.isclass)
+            for class_name, _class in classes:
+                doc = _class.__doc__
+                if isinstance(doc, str) and "\n" not in doc:
+                    # keep the first match like the previous search did
+                    _WORKALENDAR_REGISTRY.setdefault(doc, _class)
+
+    # a registry of another workalendar version is replaced by the new one
+    if registry_file is not None and (rebuilt or not os.path.isfile(registry_file)):
+        persisted = pd.DataFrame(
+            [
+                [country, _class.__module__, _class.__name__, version]
+                for country, _class in _WORKALENDAR_REGISTRY.items()
+            ],
+            columns=["country", "module", "class_name", "workalendar_version"],
+        )
+        try:
+            cache.write_csv(persisted, registry_file, index=False)
+            logging.info(f"The workalendar registry is saved to {registry_file}.")
+        except OSError as error:
+            # persisting is optional, e.g. in a read-only installation
+            logging.debug(
+                f"The workalendar registry could not be saved to {registry_file}: {error}"
+            )
+    return _WORKALENDAR_REGISTRY
+
+
+def get_workalendar_class(country, static_inputs_directory=None):
     r"""
     Loads workalender for a given country.
 
+    The calendar class is looked up in the registry returned by
+    :py:func:`~.get_workalendar_registry`.
+
     Parameters
     ---------
     country: str
         name of the country
+    static_inputs_directory: str or None
+        Directory of the pvcompare static inputs, where the registry of
+        calendar classes is persisted. Default: None.
 
     Returns
     ------
-    None
+    workalendar calendar or None
+        Instance of the calendar of `country`. None if no calendar is found.
+    """
+    registry = get_workalendar_registry(static_inputs_directory=static_inputs_directory)
+    _class = registry.get(country)
+    if _class is None:
+        return None
+    return _class()
+
+
+def get_holidays(country, year, static_inputs_directory=None):
+    r"""
+    Returns the holidays of `country` in `year`.
+
+    The holidays are computed with the calendar from
+    :py:func:`~.get_workalendar_class` only once per country and year and are
+    kept in memory for later calls.
+
+    Parameters
+    ---------
+    country: str
+        name of the country
+    year: int
+        Year for which the holidays are returned.
+    static_inputs_directory: str or None
+        Directory of the pvcompare static inputs, where the registry of
+        calendar classes is persisted. Default: None.
+
+    Returns
+    ------
+    dict
+        Dictionary with the dates of the holidays as keys and their names as values.
     """
-    country_name = country
-    for finder, name, ispkg in iter_modules(workalendar.__path__):
-        module_name = "workalendar.{}".format(name)
-        import_module(module_name)
-        classes = inspect.getmembers(sys.modules[module_name], inspect.isclass)
-        for class_name, _class in classes:
-            if _class.__doc__ == country_name:
-                return _class()
-
-    return None
+    key = (country, int(year))
+    if key not in _HOLIDAYS_CACHE:
+        cal = get_workalendar_class(
+            country, static_inputs_directory=static_inputs_directory
+        )
+        _HOLIDAYS_CACHE[key] = dict(cal.holidays(int(year)))
+    # return a copy so that callers cannot alter the cached holidays
+    return dict(_HOLIDAYS_CACHE[key])
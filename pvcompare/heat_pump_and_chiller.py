@@ -8,13 +8,13 @@ coefficient of performance (COP) of heat pumps and energy efficiency ratios
 import pandas as pd
 import os
 import logging
-import maya
 import numpy as np
 
-import oemof.thermal.compression_heatpumps_and_chillers as cmpr_hp_chiller
-
 # internal imports
 from pvcompare import constants
+from pvcompare import time_index
+from pvcompare import cache
+from pvcompare import check_inputs
 
 
 def calculate_cops_and_eers(
@@ -30,9 +30,9 @@ def calculate_cops_and_eers(
     Calculates the COPs of a heat pump or EERs of a chiller depending on `mode`.
 
     Temperature dependency is taken into consideration.
-    For these calculations the ``calc_cops()` <functionality>`_ functionality of
-    `oemof.thermal <https://oemof-thermal.readthedocs.io/en/stable/>`_  is
-    used. Data like quality grade and factor icing is read from the file
+    For these calculations :py:func:`~.calculate_cops_array` is used, which
+    is a vectorized version of the ``calc_cops()`` functionality of
+    `oemof.thermal <https://oemof-thermal.readthedocs.io/en/stable/>`_. Data like quality grade and factor icing is read from the file
     `heat_pumps_and_chillers.csv` in the `input_directory`.
     Negative values, which might occur due to high ambient temperatures in summer are
     set to zero.
@@ -67,13 +67,263 @@ def calculate_cops_and_eers(
     None
     """
 
+    if user_inputs_pvcompare_directory == None:
+        user_inputs_pvcompare_directory = (
+            constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY
+        )
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+
     # read parameters from file
+    (
+        parameters,
+        high_temperature,
+        low_temperature,
+        quality_grade,
+        temp_threshold_icing,
+        factor_icing,
+    ) = _get_efficiency_parameters(
+        weather=weather,
+        mode=mode,
+        temperature_col=temperature_col,
+        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+    )
+
+    # create add on to filename (year, lat, lon)
+    year = time_index.get_year(weather.index)
+
+    # define file name and parameters of the COPs or EERs
+    if mode == "heat_pump":
+        if len(high_temperature) > 1:
+            add_on = f"_{year}_{lat}_{lon}"
+        elif len(high_temperature) == 1:
+            add_on = f"_{year}_{lat}_{lon}_{high_temperature[0]}"
+        filename = f"cops_heat_pump{add_on}.csv"
+
+    elif mode == "chiller":
+        if len(low_temperature) > 1:
+            add_on = f"_{year}_{lat}_{lon}"
+        elif len(low_temperature) == 1:
+            add_on = f"_{year}_{lat}_{lon}_{low_temperature[0]}"
+        filename = f"eers_chiller{add_on}.csv"
+
+    time_series_directory = os.path.join(user_inputs_mvs_directory, "time_series")
+
+    # the COPs/EERs are only calculated if they have not been saved for the same
+    # parameters before
+    fingerprint = _get_efficiency_fingerprint(
+        mode=mode,
+        technology=parameters.technology,
+        high_temperature=high_temperature,
+        low_temperature=low_temperature,
+        quality_grade=quality_grade,
+        temp_threshold_icing=temp_threshold_icing,
+        factor_icing=factor_icing,
+        time_index=weather.index,
+    )
+    if cache.is_up_to_date(time_series_directory, filename, fingerprint):
+        logging.info(
+            f"The {mode} efficiencies in {filename} are up to date and are reused."
+        )
+        efficiency = pd.read_csv(
+            os.path.join(time_series_directory, filename), float_precision="round_trip"
+        )["no_unit"].values
+        return pd.Series(efficiency, index=weather.index, name="no_unit")
+
+    # calculate COPs or EERs
+    efficiency = calculate_cops_array(
+        temp_high=high_temperature,
+        temp_low=low_temperature,
+        quality_grade=quality_grade,
+        mode=mode,
+        temp_threshold_icing=temp_threshold_icing,
+        factor_icing=factor_icing,
+    )
+
+    # set negative COPs/EERs to np.inf
+    # COP/EER below zero results from temp_low > temp_high
+    # and will therefore be represented with COP/EER -> infinity
+    efficiency = np.where(efficiency < 0, np.inf, efficiency)
+
+    # extract COPs/EERs as pd.Series with the index of `weather`
+    efficiency_series = pd.Series(
+        np.broadcast_to(efficiency, len(weather)), index=weather.index, name="no_unit"
+    )
+
+    # save time series to `user_inputs_mvs_directory/time_series`
+    logging.info(
+        f"The cops of a heat pump are calculated and saved under {time_series_directory}."
+    )
+
+    cache.write_csv(
+        efficiency_series,
+        os.path.join(time_series_directory, filename),
+        index=False,
+        header=True,
+    )
+    cache.update_manifest(time_series_directory, filename, fingerprint)
+
+    return efficiency_series
+
+
+def calculate_cops_sweep(
+    weather,
+    lat,
+    lon,
+    temperatures_high,
+    temperature_col="temp_air",
+    user_inputs_pvcompare_directory=None,
+    user_inputs_mvs_directory=None,
+):
+    r"""
+    Calculates the COPs of a heat pump for several constant high temperatures at once.
+
+    All other parameters of the heat pump are read from
+    `heat_pumps_and_chillers.csv` as in :py:func:`~.calculate_cops_and_eers`. The
+    COPs of all high temperatures are calculated in one call of
+    :py:func:`~.calculate_cops_array` with the high temperatures as column vector.
+    The COPs of each high temperature are saved to
+    `cops_heat_pump_{year}_{lat}_{lon}_{temp_high}.csv` in the `time_series` folder
+    of `user_inputs_mvs_directory`, the file that
+    :py:func:`~.calculate_cops_and_eers` and :py:func:`~.add_sector_coupling`
+    reuse for the same parameters with `temp_high` in `heat_pumps_and_chillers.csv`.
+
+    Parameters
+    ----------
+    weather : :pandas:`pandas.DataFrame<frame>`
+        Contains weather data time series. Required: ambient temperature in
+        column `temperature_col`.
+    lat : float
+        Latitude of ambient temperature location in `weather`.
+    lon : float
+        Longitude of ambient temperature location in `weather`.
+    temperatures_high : list
+        Constant high temperatures of the heat pump in °C.
+    temperature_col : str
+        Name of column in `weather` containing ambient temperature.
+        Default: "temp_air".
+    user_inputs_pvcompare_directory: str or None
+        Path to user input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY` is used.
+        Default: None.
+    user_inputs_mvs_directory: str or None
+        Path to input directory containing files that describe the energy
+        system and that are an input to MVS. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        COPs with the index of `weather` and one column per high temperature.
+    """
     if user_inputs_pvcompare_directory == None:
         user_inputs_pvcompare_directory = (
             constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY
         )
     if user_inputs_mvs_directory == None:
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+
+    # read parameters from file, the high temperature of the file is not used
+    (
+        parameters,
+        high_temperature,
+        low_temperature,
+        quality_grade,
+        temp_threshold_icing,
+        factor_icing,
+    ) = _get_efficiency_parameters(
+        weather=weather,
+        mode="heat_pump",
+        temperature_col=temperature_col,
+        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+    )
+    temperatures_high = [float(temperature) for temperature in temperatures_high]
+
+    # calculate COPs of all high temperatures (rows) and time steps (columns)
+    efficiency = calculate_cops_array(
+        temp_high=np.array(temperatures_high).reshape(-1, 1),
+        temp_low=low_temperature,
+        quality_grade=quality_grade,
+        mode="heat_pump",
+        temp_threshold_icing=temp_threshold_icing,
+        factor_icing=factor_icing,
+    )
+    # set negative COPs to np.inf, see calculate_cops_and_eers()
+    efficiency = np.where(efficiency < 0, np.inf, efficiency)
+    efficiency = np.broadcast_to(efficiency, (len(temperatures_high), len(weather)))
+
+    # save the COPs of each high temperature to `user_inputs_mvs_directory/time_series`
+    time_series_directory = os.path.join(user_inputs_mvs_directory, "time_series")
+    year = time_index.get_year(weather.index)
+    for temperature, cops in zip(temperatures_high, efficiency):
+        filename = f"cops_heat_pump_{year}_{lat}_{lon}_{temperature}.csv"
+        fingerprint = _get_efficiency_fingerprint(
+            mode="heat_pump",
+            technology=parameters.technology,
+            high_temperature=[temperature],
+            low_temperature=low_temperature,
+            quality_grade=quality_grade,
+            temp_threshold_icing=temp_threshold_icing,
+            factor_icing=factor_icing,
+            time_index=weather.index,
+        )
+        if cache.is_up_to_date(time_series_directory, filename, fingerprint):
+            continue
+        cache.write_csv(
+            pd.Series(cops, index=weather.index, name="no_unit"),
+            os.path.join(time_series_directory, filename),
+            index=False,
+            header=True,
+        )
+        cache.update_manifest(time_series_directory, filename, fingerprint)
+    logging.info(
+        f"The cops of a heat pump with the high temperatures {temperatures_high} °C "
+        f"are calculated and saved under {time_series_directory}."
+    )
+
+    return pd.DataFrame(efficiency.T, index=weather.index, columns=temperatures_high)
+
+
+def _get_efficiency_parameters(
+    weather, mode, temperature_col, user_inputs_pvcompare_directory
+):
+    r"""
+    Reads and processes the parameters of a heat pump or chiller.
+
+    The parameters are read from `heat_pumps_and_chillers.csv` in
+    `user_inputs_pvcompare_directory`. A default quality grade is saved to this
+    file if no quality grade is given.
+
+    Parameters
+    ----------
+    weather : :pandas:`pandas.DataFrame<frame>`
+        Contains weather data time series. Required: ambient temperature in
+        column `temperature_col`.
+    mode : str
+        Defines whether parameters of heat pump ("heat_pump") or chiller
+        ("chiller") are processed.
+    temperature_col : str
+        Name of column in `weather` containing ambient temperature.
+    user_inputs_pvcompare_directory: str
+        Path to user input directory.
+
+    Returns
+    -------
+    parameters : :pandas:`pandas.Series<series>`
+        Parameters of the heat pump or chiller as read from file.
+    high_temperature : list or numpy.ndarray
+        High temperature in °C.
+    low_temperature : list or numpy.ndarray
+        Low temperature in °C.
+    quality_grade : float
+        Quality grade of the heat pump or chiller.
+    temp_threshold_icing : float or None
+        Temperature in °C below which icing occurs. None for chillers.
+    factor_icing : float or None
+        Relative COP drop caused by icing. None for chillers and if icing is not
+        considered.
+    """
     filename = os.path.join(
         user_inputs_pvcompare_directory, "heat_pumps_and_chillers.csv"
     )
@@ -85,7 +335,7 @@ def calculate_cops_and_eers(
         raise ValueError(
             f"Parameter `mode` should be 'heat_pump' or 'chiller' but is {mode}"
         )
-    # prepare parameters for calc_cops
+    # prepare parameters for calculate_cops_array
 
     def process_temperatures(temperature, level, mode, technology):
         r"""
@@ -111,7 +361,7 @@ def calculate_cops_and_eers(
 
         Returns
         -------
-        temperature: list
+        temperature: list or numpy.ndarray
             Temperature adjusted to use case of plant.
         """
 
@@ -122,18 +372,18 @@ def calculate_cops_and_eers(
                     level == "high" and mode == "chiller"
                 ):
                     if technology == "brine-water":
-                        # Prepare mean yearly ambient temperature for calc_cops (numeric)
+                        # Prepare mean yearly ambient temperature (numeric)
                         temperature = np.average(weather[temperature_col].values)
                         temperature = [temperature]
                     elif technology == "air-air" or technology == "air-water":
-                        # Prepare ambient temperature for calc_cops (list)
-                        temperature = weather[temperature_col].values.tolist()
+                        # Prepare ambient temperature (array)
+                        temperature = weather[temperature_col].values
                         logging.info(
                             f"The {mode} is modeled with the ambient temperature from weather data as {level} temperature."
                         )
                     else:
-                        # Prepare ambient temperature for calc_cops (list)
-                        temperature = weather[temperature_col].values.tolist()
+                        # Prepare ambient temperature (array)
+                        temperature = weather[temperature_col].values
                         logging.warning(
                             f"The technology of the {mode} should be either 'air-air', 'air-water' or 'brine-water'."
                             f"'{technology}' is not a valid technology. The {mode} is modeled as an air source {mode} by default"
@@ -162,7 +412,7 @@ def calculate_cops_and_eers(
                     os.path.join(user_inputs_pvcompare_directory, temp_filename)
                 )
                 temperature_df = temperature_df.set_index(temp_header)
-                temperature = temperature_df.index.tolist()
+                temperature = temperature_df.index.values
                 logging.info(
                     f"The {mode} is modeled with passed time series as {level} temperature."
                 )
@@ -228,16 +478,8 @@ def calculate_cops_and_eers(
     parameters_complete.quality_grade = quality_grade
     parameters_complete.to_csv(filename, index=False, header=True, float_format="%g")
 
-    # create add on to filename (year, lat, lon)
-    year = maya.parse(weather.index[int(len(weather) / 2)]).datetime().year
-
-    # calculate COPs or EERs with oemof thermal
+    # additional parameters for heat_pump mode
     if mode == "heat_pump":
-        if len(high_temperature) > 1:
-            add_on = f"_{year}_{lat}_{lon}"
-        elif len(high_temperature) == 1:
-            add_on = f"_{year}_{lat}_{lon}_{high_temperature[0]}"
-        # additional parameters for heat_pump mode
         factor_icing = (
             None
             if parameters.factor_icing == "None"
@@ -248,64 +490,121 @@ def calculate_cops_and_eers(
             if parameters.temp_threshold_icing == "None"
             else float(parameters.temp_threshold_icing)
         )
+    else:
+        factor_icing = None
+        temp_threshold_icing = None
+
+    return (
+        parameters,
+        high_temperature,
+        low_temperature,
+        quality_grade,
+        temp_threshold_icing,
+        factor_icing,
+    )
 
-        efficiency = cmpr_hp_chiller.calc_cops(
-            temp_high=high_temperature,
-            temp_low=low_temperature,
-            quality_grade=quality_grade,
-            mode=mode,
-            temp_threshold_icing=temp_threshold_icing,
-            factor_icing=factor_icing,
-        )
 
-        # define variables for later proceeding
-        column_name = "cop"
-        filename = f"cops_heat_pump{add_on}.csv"
+def _get_efficiency_fingerprint(
+    mode,
+    technology,
+    high_temperature,
+    low_temperature,
+    quality_grade,
+    temp_threshold_icing,
+    factor_icing,
+    time_index,
+):
+    r"""
+    Returns the fingerprint of the COPs or EERs calculated from the parameters.
 
-    elif mode == "chiller":
-        if len(low_temperature) > 1:
-            add_on = f"_{year}_{lat}_{lon}"
-        elif len(low_temperature) == 1:
-            add_on = f"_{year}_{lat}_{lon}_{low_temperature[0]}"
-        efficiency = cmpr_hp_chiller.calc_cops(
-            temp_high=high_temperature,
-            temp_low=low_temperature,
-            quality_grade=quality_grade,
-            mode=mode,
-        )
-        column_name = "eer"
-        filename = f"eers_chiller{add_on}.csv"
+    Parameters are the ones of :py:func:`~.calculate_cops_array`, `technology` of
+    the heat pump or chiller and the time index `time_index` of the weather data.
 
-    # add list of cops/eers to data frame
-    df = pd.DataFrame(weather[temperature_col])
+    Returns
+    -------
+    str
+        Fingerprint of the COPs or EERs, see :py:func:`~.cache.get_fingerprint`.
+    """
+    return cache.get_fingerprint(
+        mode,
+        technology,
+        np.asarray(high_temperature, dtype=float),
+        np.asarray(low_temperature, dtype=float),
+        quality_grade,
+        temp_threshold_icing,
+        factor_icing,
+        time_index,
+    )
 
-    try:
-        df[column_name] = efficiency
-    except ValueError:
-        df[column_name] = np.multiply(efficiency, np.ones(len(df)))
 
-    # set negative COPs/EERs to np.inf
-    # COP/EER below zero results from temp_low > temp_high
-    # and will therefore be represented with COP/EER -> infinity
-    indices = df.loc[df[column_name] < 0].index
-    df[column_name][indices] = np.inf
+def calculate_cops_array(
+    mode, temp_high, temp_low, quality_grade, temp_threshold_icing=2, factor_icing=None,
+):
+    r"""
+    Calculates COPs of a heat pump or EERs of a chiller on numpy arrays.
 
-    # extract COPs/EERs as pd.Series from data frame
-    efficiency_series = df[column_name]
-    efficiency_series.name = "no_unit"
+    The COPs and EERs equal the ones of ``calc_cops()`` of
+    `oemof.thermal <https://oemof-thermal.readthedocs.io/en/stable/>`_, but are
+    calculated on whole arrays instead of element by element.
 
-    # save time series to `user_inputs_mvs_directory/time_series`
-    time_series_directory = os.path.join(user_inputs_mvs_directory, "time_series")
+    Parameters
+    ----------
+    mode : str
+        Defines whether COPs of heat pump ("heat_pump") or EERs of chiller
+        ("chiller") are calculated.
+    temp_high : float, list, numpy.ndarray or :pandas:`pandas.Series<series>`
+        Temperature of the high temperature reservoir in °C.
+    temp_low : float, list, numpy.ndarray or :pandas:`pandas.Series<series>`
+        Temperature of the low temperature reservoir in °C. `temp_high` and
+        `temp_low` are broadcast against each other, e.g. a constant high
+        temperature and a time series of low temperatures or a column vector of
+        high temperatures and a time series of low temperatures.
+    quality_grade : float
+        Factor that scales down the efficiency of the real process from the
+        ideal process (Carnot efficiency).
+    temp_threshold_icing : float
+        Temperature in °C below which icing at the heat exchanger occurs.
+        Only used if `factor_icing` is not None. Default: 2.
+    factor_icing : float or None
+        Relative COP drop caused by icing, where 1 stands for no efficiency drop.
+        If None, icing is not considered. Default: None.
 
-    logging.info(
-        f"The cops of a heat pump are calculated and saved under {time_series_directory}."
-    )
+    Returns
+    -------
+    numpy.ndarray
+        COPs or EERs in the broadcast shape of `temp_high` and `temp_low`.
+    """
+    temp_high_k = np.asarray(temp_high, dtype=float) + 273.15
+    temp_low_k = np.asarray(temp_low, dtype=float) + 273.15
+    try:
+        temp_high_k, temp_low_k = np.broadcast_arrays(temp_high_k, temp_low_k)
+    except ValueError:
+        raise IndexError(
+            "Arguments 'temp_low' and 'temp_high' have to be of same length or "
+            "one has to be of length 1 !"
+        )
 
-    efficiency_series.to_csv(
-        os.path.join(time_series_directory, filename), index=False, header=True
-    )
+    if factor_icing is not None and mode == "chiller":
+        raise ValueError("Argument 'factor_icing' has to be None for mode='chiller'!")
 
-    return efficiency_series
+    if mode == "heat_pump":
+        temp_numerator = temp_high_k
+    elif mode == "chiller":
+        temp_numerator = temp_low_k
+    else:
+        raise ValueError(
+            f"Parameter `mode` should be 'heat_pump' or 'chiller' but is {mode}"
+        )
+
+    grade = quality_grade
+    if factor_icing is not None:
+        # the COP is lowered by `factor_icing` below the icing threshold
+        grade = np.where(
+            temp_low_k < temp_threshold_icing + 273.15,
+            factor_icing * quality_grade,
+            quality_grade,
+        )
+    return grade * temp_numerator / (temp_high_k - temp_low_k)
 
 
 def add_sector_coupling(
@@ -365,10 +664,8 @@ def add_sector_coupling(
         )
     if user_inputs_mvs_directory is None:
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
-    energy_conversion = pd.read_csv(
-        os.path.join(user_inputs_mvs_directory, "csv_elements", "energyConversion.csv"),
-        header=0,
-        index_col=0,
+    energy_conversion = check_inputs.read_mvs_file(
+        user_inputs_mvs_directory, "energyConversion.csv"
     )
     heat_pump_and_chillers = pd.read_csv(
         os.path.join(user_inputs_pvcompare_directory, "heat_pumps_and_chillers.csv"),
@@ -405,7 +702,7 @@ def add_sector_coupling(
 
             if not os.path.isfile(cops_filename_csv) or overwrite_hp_parameters == True:
                 high_temperature = heat_pump_and_chillers.at["heat_pump", "temp_high"]
-                year = weather.index[int(len(weather) / 2)].year
+                year = time_index.get_year(weather.index)
                 cops_filename = os.path.join(
                     user_inputs_mvs_directory,
                     "time_series",
@@ -427,32 +724,26 @@ def add_sector_coupling(
 
         if file_exists == False:
             # update energyConversion.csv
-            energy_conversion.to_csv(
-                os.path.join(
-                    user_inputs_mvs_directory, "csv_elements", "energyConversion.csv"
-                )
+            check_inputs.write_mvs_file(
+                energy_conversion, user_inputs_mvs_directory, "energyConversion.csv"
+            )
+            # calculate COPs of heat pump for location, existing COPs are only
+            # reused if they were calculated with the same parameters
+            calculate_cops_and_eers(
+                weather=weather,
+                mode="heat_pump",
+                lat=lat,
+                lon=lon,
+                user_inputs_mvs_directory=user_inputs_mvs_directory,
+                user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+            )
+            logging.info(
+                f"COPs in {cops_filename} are up to date in `user_inputs_mvs_directory/time_series`."
             )
-            # calculate COPs of heat pump for location if not existent
-            if not os.path.isfile(cops_filename):
-                calculate_cops_and_eers(
-                    weather=weather,
-                    mode="heat_pump",
-                    lat=lat,
-                    lon=lon,
-                    user_inputs_mvs_directory=user_inputs_mvs_directory,
-                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-                )
-                logging.info(
-                    "COPs successfully calculated and saved in `user_inputs_mvs_directory/time_series`."
-                )
 
         # display warning if heat demand seems to be missing in energyConsumption.csv
-        energy_consumption = pd.read_csv(
-            os.path.join(
-                user_inputs_mvs_directory, "csv_elements", "energyConsumption.csv"
-            ),
-            header=0,
-            index_col=0,
+        energy_consumption = check_inputs.read_mvs_file(
+            user_inputs_mvs_directory, "energyConsumption.csv"
         )
 
     # chiller
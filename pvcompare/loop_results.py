@@ -0,0 +1,446 @@
+"""
+This module stores the results of the steps of a loop, e.g. of
+:py:func:`~pvcompare.analysis.loop_pvcompare`, in a columnar data set.
+
+The scalars and the time series of the busses of each step are saved as Parquet
+files in the directory 'results' of the loop output directory, one file per step
+and kind of results, so that steps running in parallel processes do not write into
+the same file. The results of all steps are read at once with
+:py:func:`~.load_scalars` and :py:func:`~.load_timeseries`, which is much faster
+than parsing the Excel files of the steps.
+
+- Scalars: one row per value of the sheets of 'scalars.xlsx' of MVS with the
+  columns "scenario", "year", "step", "sheet", "row", "column", "value" (numbers)
+  and "text" (all other values).
+- Time series: one row per bus and time step with the columns "scenario",
+  "year", "step", "bus", "timestamp" and one column per flow of the busses.
+
+The Parquet files are written and read with pyarrow, which is an optional
+dependency of pvcompare and can be installed with `pip install pyarrow`.
+
+Functions this module contains:
+- is_available
+- check_available
+- get_scalar_sheets
+- store_step_results
+- store_step_scalars
+- get_steps
+- load_scalars
+- load_timeseries
+"""
+
+import io
+import os
+import glob
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from multi_vector_simulator.E1_process_results import get_units_of_cost_matrix_entries
+from multi_vector_simulator.utils.constants_json_strings import (
+    KPI,
+    KPI_SCALARS_DICT,
+    OPTIMIZED_FLOWS,
+    ECONOMIC_DATA,
+    UNIT,
+)
+
+from pvcompare import cache
+
+# directory of the results in the loop output directory
+RESULTS_DIRECTORY = "results"
+
+# columns that identify a step
+STEP_COLUMNS = ["scenario", "year", "step"]
+
+
+def is_available():
+    r"""
+    Checks if the results can be stored, which requires pyarrow.
+
+    Returns
+    -------
+    bool
+    """
+    return pyarrow is not None
+
+
+def check_available():
+    r"""
+    Raises an ImportError if pyarrow is not installed.
+
+    Returns
+    -------
+    None
+    """
+    if not is_available():
+        raise ImportError(
+            "The results of the loop steps are stored in Parquet files, which "
+            "requires pyarrow. Please install it with `pip install pyarrow`."
+        )
+
+
+def _get_filename(loop_output_directory, kind, year, step):
+    r"""
+    Returns the path of the Parquet file of one step.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+    kind: str
+        "scalars" or "timeseries".
+    year: int
+        Year of the step.
+    step: str or int
+        Gradation of the loop variable.
+
+    Returns
+    -------
+    str
+    """
+    return os.path.join(
+        loop_output_directory,
+        RESULTS_DIRECTORY,
+        kind + "_" + str(year) + "_" + str(step) + ".parquet",
+    )
+
+
+def get_scalar_sheets(dict_values):
+    r"""
+    Returns the scalar results of an MVS simulation as saved in 'scalars.xlsx'.
+
+    Parameters
+    ----------
+    dict_values: dict
+        MVS dictionary with all inputs and results, see
+        :py:func:`~.mvs_interface.run_mvs_simulation`.
+
+    Returns
+    -------
+    dict
+        :pandas:`pandas.DataFrame<frame>` by name of the sheet.
+    """
+    # same sheets as in multi_vector_simulator.F0_output.store_scalars_to_excel()
+    sheets = {}
+    for kpi_set in dict_values[KPI]:
+        if isinstance(dict_values[KPI][kpi_set], dict):
+            data = pd.DataFrame([dict_values[KPI][kpi_set]])
+        else:
+            data = dict_values[KPI][kpi_set]
+        if kpi_set == KPI_SCALARS_DICT:
+            data = data.transpose()
+            data[UNIT] = get_units_of_cost_matrix_entries(
+                dict_values[ECONOMIC_DATA], dict_values[KPI][kpi_set]
+            )
+        sheets[kpi_set] = data
+    return sheets
+
+
+def _get_scalar_rows(sheets):
+    r"""
+    Converts the sheets of the scalars into one row per value.
+
+    Parameters
+    ----------
+    sheets: dict
+        :pandas:`pandas.DataFrame<frame>` by name of the sheet.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Rows with the columns "sheet", "row", "column", "value" and "text".
+    """
+    rows = []
+    for sheet, data in sheets.items():
+        data = data.copy()
+        data.index = data.index.astype(str)
+        data.columns = data.columns.astype(str)
+        values = (
+            data.astype(object)
+            .rename_axis(index="row", columns="column")
+            .stack(dropna=False)
+            .rename("raw")
+            .reset_index()
+        )
+        values.insert(0, "sheet", sheet)
+        values["value"] = pd.to_numeric(values["raw"], errors="coerce").astype(float)
+        values["text"] = (
+            values["raw"]
+            .where(values["value"].isna() & values["raw"].notna())
+            .map(str, na_action="ignore")
+        )
+        rows.append(values.drop(columns="raw"))
+    return pd.concat(rows, ignore_index=True)
+
+
+def _get_timeseries_rows(dict_values):
+    r"""
+    Converts the flows of all busses into one row per bus and time step.
+
+    Parameters
+    ----------
+    dict_values: dict
+        MVS dictionary with all inputs and results.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Rows with the columns "bus", "timestamp" and one column per flow.
+    """
+    rows = []
+    for bus, flows in dict_values[OPTIMIZED_FLOWS].items():
+        flows = flows.copy()
+        flows.columns = flows.columns.astype(str)
+        flows = flows.rename_axis("timestamp").reset_index()
+        flows.insert(0, "bus", bus)
+        rows.append(flows)
+    return pd.concat(rows, ignore_index=True, sort=False)
+
+
+def _to_parquet(data, scenario_name, year, step):
+    r"""
+    Returns the contents of a Parquet file of the rows of one step.
+
+    Parameters
+    ----------
+    data: :pandas:`pandas.DataFrame<frame>`
+        Rows of the step.
+    scenario_name: str
+        Name of the scenario.
+    year: int
+        Year of the step.
+    step: str or int
+        Gradation of the loop variable.
+
+    Returns
+    -------
+    bytes
+    """
+    data = data.copy()
+    for i, (column, value) in enumerate(
+        zip(STEP_COLUMNS, [str(scenario_name), int(year), str(step)])
+    ):
+        data.insert(i, column, value)
+    buffer = io.BytesIO()
+    data.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def store_step_results(loop_output_directory, scenario_name, year, step, dict_values):
+    r"""
+    Stores the scalars and the time series of the busses of one step of a loop.
+
+    The files of the step are replaced if they exist, e.g. if the step is run
+    again.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+    scenario_name: str
+        Name of the scenario.
+    year: int
+        Year of the step.
+    step: str or int
+        Gradation of the loop variable.
+    dict_values: dict
+        MVS dictionary with all inputs and results, see
+        :py:func:`~.mvs_interface.run_mvs_simulation`.
+
+    Returns
+    -------
+    None
+    """
+    check_available()
+    os.makedirs(os.path.join(loop_output_directory, RESULTS_DIRECTORY), exist_ok=True)
+    cache.replace_files(
+        {
+            _get_filename(loop_output_directory, "scalars", year, step): _to_parquet(
+                _get_scalar_rows(get_scalar_sheets(dict_values)),
+                scenario_name,
+                year,
+                step,
+            ),
+            _get_filename(loop_output_directory, "timeseries", year, step): _to_parquet(
+                _get_timeseries_rows(dict_values), scenario_name, year, step
+            ),
+        }
+    )
+
+
+def store_step_scalars(loop_output_directory, scenario_name, year, step, sheets):
+    r"""
+    Adds sheets to the scalars of one step or replaces them.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+    scenario_name: str
+        Name of the scenario.
+    year: int
+        Year of the step.
+    step: str or int
+        Gradation of the loop variable.
+    sheets: dict
+        :pandas:`pandas.DataFrame<frame>` by name of the sheet.
+
+    Returns
+    -------
+    None
+    """
+    check_available()
+    filename = _get_filename(loop_output_directory, "scalars", year, step)
+    rows = pd.read_parquet(filename).drop(columns=STEP_COLUMNS)
+    rows = pd.concat(
+        [rows[~rows["sheet"].isin(list(sheets))], _get_scalar_rows(sheets)],
+        ignore_index=True,
+    )
+    cache.replace_files({filename: _to_parquet(rows, scenario_name, year, step)})
+
+
+def _read_steps(loop_output_directory, kind, year=None, step=None, filters=None):
+    r"""
+    Reads the Parquet files of all steps or of one step.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+    kind: str
+        "scalars" or "timeseries".
+    year: int or None
+        Year of the step. If None, all steps are read. Default: None.
+    step: str or int or None
+        Gradation of the loop variable. If None, all steps are read.
+        Default: None.
+    filters: list or None
+        Filters of the rows, see :pandas:`pandas.read_parquet`. Default: None.
+
+    Returns
+    -------
+    list
+        :pandas:`pandas.DataFrame<frame>` of each step.
+    """
+    check_available()
+    if year is not None and step is not None:
+        filenames = [_get_filename(loop_output_directory, kind, year, step)]
+    else:
+        filenames = sorted(
+            glob.glob(
+                os.path.join(loop_output_directory, RESULTS_DIRECTORY, kind + "_*")
+            )
+        )
+    return [pd.read_parquet(filename, filters=filters) for filename in filenames]
+
+
+def get_steps(loop_output_directory):
+    r"""
+    Returns the steps whose results are stored.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+
+    Returns
+    -------
+    list
+        Tuples of scenario name, year and step.
+    """
+    check_available()
+    steps = []
+    for filename in sorted(
+        glob.glob(os.path.join(loop_output_directory, RESULTS_DIRECTORY, "scalars_*"))
+    ):
+        data = pd.read_parquet(filename, columns=STEP_COLUMNS)
+        steps.append(tuple(data.iloc[0]))
+    return steps
+
+
+def load_scalars(loop_output_directory, sheet, year=None, step=None):
+    r"""
+    Loads a sheet of the scalars of all steps or of one step.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+    sheet: str
+        Name of the sheet, e.g. "scalars", "scalar_matrix" or "cost_matrix".
+    year: int or None
+        Year of the step. If None, all steps are loaded. Default: None.
+    step: str or int or None
+        Gradation of the loop variable. If None, all steps are loaded.
+        Default: None.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Sheet with the index "scenario", "year", "step" and "row" and the
+        columns of the sheet.
+    """
+    rows = pd.concat(
+        _read_steps(
+            loop_output_directory,
+            "scalars",
+            year=year,
+            step=step,
+            filters=[("sheet", "==", sheet)],
+        ),
+        ignore_index=True,
+    )
+    index = STEP_COLUMNS + ["row"]
+    rows["value"] = (
+        rows["value"].astype(object).where(rows["text"].isna(), rows["text"])
+    )
+    data = rows.set_index(index + ["column"])["value"].unstack("column")
+    # the order of the rows and columns of the sheet is kept
+    data = data.reindex(
+        index=pd.MultiIndex.from_frame(rows[index].drop_duplicates()),
+        columns=rows["column"].unique(),
+    )
+    data.columns.name = None
+    return data.apply(lambda column: pd.to_numeric(column, errors="ignore"))
+
+
+def load_timeseries(loop_output_directory, bus, year=None, step=None):
+    r"""
+    Loads the flows of a bus of all steps or of one step.
+
+    Parameters
+    ----------
+    loop_output_directory: str
+        Path of the loop output directory.
+    bus: str
+        Name of the bus, e.g. "Electricity bus".
+    year: int or None
+        Year of the step. If None, all steps are loaded. Default: None.
+    step: str or int or None
+        Gradation of the loop variable. If None, all steps are loaded.
+        Default: None.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Flows of the bus with the index "scenario", "year", "step" and
+        "timestamp".
+    """
+    steps = _read_steps(
+        loop_output_directory,
+        "timeseries",
+        year=year,
+        step=step,
+        filters=[("bus", "==", bus)],
+    )
+    # the columns of the flows of other busses are empty
+    data = pd.concat(
+        [rows.drop(columns="bus").dropna(axis=1, how="all") for rows in steps],
+        ignore_index=True,
+        sort=False,
+    )
+    return data.set_index(STEP_COLUMNS + ["timestamp"])
@@ -0,0 +1,430 @@
+"""
+This module runs the independent steps of a loop, e.g. of
+:py:func:`~pvcompare.analysis.loop_pvcompare`, one after another or in parallel
+processes.
+
+A step is described by a dict with the keys
+
+- "name": unique name of the step,
+- "function": module-level function that runs the step,
+- "kwargs": keyword arguments of "function",
+- "depends_on": name of a step that has to be finished first (optional) and
+- "output_directories": directories that are created by the step and removed
+  before it is retried (optional) and
+- "fingerprint": fingerprint of the inputs of the step (optional), see
+  :py:func:`~.get_step_fingerprint`.
+
+The status and the fingerprint of each step can be recorded in the ledger
+'loop_ledger.json' of a directory. A loop that is started again with the same
+ledger skips the steps that have already finished with the same inputs.
+
+Functions this module contains:
+- get_step_fingerprint
+- load_ledger
+- is_step_finished
+- run_loop_steps
+"""
+
+import os
+import json
+import shutil
+import logging
+import concurrent.futures
+import psutil
+
+from pvcompare import cache
+
+# available memory in MB that is required for starting another step in parallel
+MIN_AVAILABLE_MEMORY = 2048
+
+# name of the ledger of the steps in the loop output directory
+LEDGER_FILENAME = "loop_ledger.json"
+
+
+def get_step_fingerprint(step):
+    r"""
+    Returns the fingerprint of the inputs of `step`.
+
+    Parameters
+    ----------
+    step: dict
+        Step as described in the module docstring.
+
+    Returns
+    -------
+    str
+        The fingerprint of `step` if it has one, otherwise a fingerprint of its
+        function and keyword arguments.
+    """
+    if step.get("fingerprint") is not None:
+        return step["fingerprint"]
+    function = step["function"]
+    return cache.get_fingerprint(
+        function.__module__ + "." + function.__qualname__, step["kwargs"]
+    )
+
+
+def load_ledger(directory):
+    r"""
+    Loads the ledger of the loop steps in `directory`.
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the ledger, e.g. the loop output directory.
+
+    Returns
+    -------
+    dict
+        Entries with "status" and "fingerprint" by name of the step. Empty, if
+        the ledger does not exist or cannot be read.
+    """
+    ledger_file = os.path.join(directory, LEDGER_FILENAME)
+    if not os.path.isfile(ledger_file):
+        return {}
+    try:
+        with open(ledger_file, "r") as json_file:
+            ledger = json.load(json_file)
+    except (ValueError, OSError):
+        logging.warning(f"The ledger {ledger_file} cannot be read and is reset.")
+        return {}
+    return ledger if isinstance(ledger, dict) else {}
+
+
+def is_step_finished(directory, name, fingerprint):
+    r"""
+    Checks if the step `name` has finished with the inputs `fingerprint`.
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the ledger.
+    name: str
+        Name of the step.
+    fingerprint: str
+        Fingerprint of the inputs of the step, see :py:func:`~.get_step_fingerprint`.
+
+    Returns
+    -------
+    bool
+        True, if the ledger in `directory` records that the step has finished
+        with the same fingerprint.
+    """
+    entry = load_ledger(directory).get(name)
+    return (
+        isinstance(entry, dict)
+        and entry.get("status") == "finished"
+        and entry.get("fingerprint") == fingerprint
+    )
+
+
+def _update_ledger(directory, step, status):
+    r"""
+    Records `status` of `step` in the ledger of `directory`.
+
+    Parameters
+    ----------
+    directory: str or None
+        Directory of the ledger. If None, nothing is recorded.
+    step: dict
+        Step as described in the module docstring.
+    status: str
+        "running", "finished" or "failed".
+
+    Returns
+    -------
+    None
+    """
+    if directory is None:
+        return
+    ledger = load_ledger(directory)
+    ledger[step["name"]] = {
+        "status": status,
+        "fingerprint": get_step_fingerprint(step),
+    }
+    cache.replace_files(
+        {
+            os.path.join(directory, LEDGER_FILENAME): json.dumps(
+                ledger, indent=4, sort_keys=True
+            )
+        }
+    )
+
+
+def _start_step(directory, step):
+    r"""
+    Removes the outputs of a previous run of `step` and records that it is running.
+
+    Parameters
+    ----------
+    directory: str or None
+        Directory of the ledger. If None, nothing is removed or recorded.
+    step: dict
+        Step as described in the module docstring.
+
+    Returns
+    -------
+    None
+    """
+    if directory is None:
+        return
+    # only outputs of steps in the ledger are removed, so that outputs of other
+    # loops are not removed
+    if step["name"] in load_ledger(directory):
+        _remove_outputs(step)
+    _update_ledger(directory, step, "running")
+
+
+def _get_steps_to_run(steps, directory):
+    r"""
+    Returns the steps that have not finished with the same inputs yet.
+
+    A step that has finished is run again if a step that depends on it is run.
+
+    Parameters
+    ----------
+    steps: list
+        Steps as described in the module docstring.
+    directory: str
+        Directory of the ledger.
+
+    Returns
+    -------
+    list
+        Steps that are run.
+    """
+    names = set()
+    for step in reversed(steps):
+        if step["name"] in names or not is_step_finished(
+            directory, step["name"], get_step_fingerprint(step)
+        ):
+            names.add(step["name"])
+            if step.get("depends_on") is not None:
+                names.add(step["depends_on"])
+    skipped = [step["name"] for step in steps if step["name"] not in names]
+    if skipped:
+        logging.info(f"The finished loop steps {skipped} are skipped.")
+    return [step for step in steps if step["name"] in names]
+
+
+def _run_step(step, retries):
+    r"""
+    Runs `step` in the current process and retries it if it fails.
+
+    Parameters
+    ----------
+    step: dict
+        Step as described in the module docstring.
+    retries: int
+        Number of times the step is retried.
+
+    Returns
+    -------
+    None
+    """
+    for attempt in range(retries + 1):
+        try:
+            step["function"](**step["kwargs"])
+            return
+        except Exception as error:
+            if attempt == retries:
+                raise
+            logging.warning(
+                f"The loop step {step['name']} failed with '{error}' and is retried."
+            )
+            _remove_outputs(step)
+
+
+def _remove_outputs(step):
+    r"""
+    Removes the output directories of a failed step.
+
+    Parameters
+    ----------
+    step: dict
+        Step as described in the module docstring.
+
+    Returns
+    -------
+    None
+    """
+    for directory in step.get("output_directories", []):
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+
+
+def _has_available_memory(min_available_memory):
+    r"""
+    Checks if at least `min_available_memory` MB of memory are available.
+
+    Parameters
+    ----------
+    min_available_memory: float
+        Required available memory in MB.
+
+    Returns
+    -------
+    bool
+    """
+    return psutil.virtual_memory().available >= min_available_memory * 1024 ** 2
+
+
+def run_loop_steps(
+    steps, max_workers=1, retries=0, min_available_memory=None, ledger_directory=None
+):
+    r"""
+    Runs the steps of a loop.
+
+    If `max_workers` is 1, the steps are run one after another in the given order
+    in the current process. Otherwise, they are run in a process pool. A step is
+    only started when the step it depends on has finished successfully and, as
+    long as other steps are running, when at least `min_available_memory` MB of
+    memory are available. A failed step is retried up to `retries` times after
+    its output directories have been removed. Steps that depend on a failed step
+    are not run. All other steps are run even if a step failed, the errors are
+    logged and raised at the end.
+
+    If `ledger_directory` is given, the status of the steps is recorded in its
+    ledger. Steps that have already finished with the same fingerprint are
+    skipped. The outputs of steps that failed or whose inputs changed are removed
+    before they are run again.
+
+    Parameters
+    ----------
+    steps: list
+        Steps as described in the module docstring.
+    max_workers: int or None
+        Maximum number of steps that are run at the same time. If None, the
+        number of processors of the machine is used. Default: 1.
+    retries: int
+        Number of times a failed step is retried. Default: 0.
+    min_available_memory: float or None
+        Available memory in MB that is required for starting another step while
+        other steps are running. If None, `MIN_AVAILABLE_MEMORY` is used.
+        Default: None.
+    ledger_directory: str or None
+        Directory of the ledger 'loop_ledger.json'. If None, no ledger is used.
+        Default: None.
+
+    Returns
+    -------
+    None
+    """
+    if min_available_memory == None:
+        min_available_memory = MIN_AVAILABLE_MEMORY
+    if ledger_directory is not None:
+        steps = _get_steps_to_run(steps, ledger_directory)
+    names = set()
+    for step in steps:
+        if step.get("depends_on") not in names | {None}:
+            raise ValueError(
+                f"The loop step {step['name']} depends on {step['depends_on']}, "
+                f"which is not one of the previous steps."
+            )
+        names.add(step["name"])
+
+    failed = {}
+    if max_workers == 1:
+        for step in steps:
+            if step.get("depends_on") in failed:
+                failed[step["name"]] = f"step {step['depends_on']} failed"
+                continue
+            _start_step(ledger_directory, step)
+            try:
+                _run_step(step, retries)
+            except Exception as error:
+                logging.error(
+                    f"The loop step {step['name']} failed: {error}", exc_info=error
+                )
+                failed[step["name"]] = error
+                _update_ledger(ledger_directory, step, "failed")
+            else:
+                _update_ledger(ledger_directory, step, "finished")
+    else:
+        _run_steps_in_parallel(
+            steps, failed, max_workers, retries, min_available_memory, ledger_directory
+        )
+
+    if failed:
+        raise ValueError(
+            f"The loop steps {list(failed)} failed. Please check the log for the "
+            f"errors."
+        )
+
+
+def _run_steps_in_parallel(
+    steps, failed, max_workers, retries, min_available_memory, ledger_directory
+):
+    r"""
+    Runs the steps of a loop in a process pool, see :py:func:`~.run_loop_steps`.
+
+    Parameters
+    ----------
+    steps: list
+        Steps as described in the module docstring.
+    failed: dict
+        Errors by name of the failed steps, that is filled by this function.
+    max_workers: int or None
+        Maximum number of steps that are run at the same time.
+    retries: int
+        Number of times a failed step is retried.
+    min_available_memory: float
+        Available memory in MB that is required for starting another step.
+    ledger_directory: str or None
+        Directory of the ledger.
+
+    Returns
+    -------
+    None
+    """
+    if max_workers == None:
+        max_workers = os.cpu_count()
+    pending = list(steps)
+    attempts = {step["name"]: 0 for step in steps}
+    finished = set()
+    running = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # steps depending on a failed step are not run
+            for step in list(pending):
+                if step.get("depends_on") in failed:
+                    pending.remove(step)
+                    failed[step["name"]] = f"step {step['depends_on']} failed"
+
+            # start all steps that are ready while workers and memory are free
+            for step in list(pending):
+                if len(running) >= max_workers:
+                    break
+                if step.get("depends_on") not in finished | {None}:
+                    continue
+                if running and not _has_available_memory(min_available_memory):
+                    break
+                pending.remove(step)
+                if attempts[step["name"]] == 0:
+                    _start_step(ledger_directory, step)
+                attempts[step["name"]] += 1
+                future = executor.submit(step["function"], **step["kwargs"])
+                running[future] = step
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                step = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    finished.add(step["name"])
+                    _update_ledger(ledger_directory, step, "finished")
+                elif attempts[step["name"]] <= retries:
+                    logging.warning(
+                        f"The loop step {step['name']} failed with '{error}' and "
+                        f"is retried."
+                    )
+                    _remove_outputs(step)
+                    pending.insert(0, step)
+                else:
+                    logging.error(
+                        f"The loop step {step['name']} failed: {error}", exc_info=error
+                    )
+                    failed[step["name"]] = error
+                    _update_ledger(ledger_directory, step, "failed")
@@ -25,12 +25,20 @@ from pvcompare import constants
 from pvcompare import heat_pump_and_chiller
 from pvcompare import stratified_thermal_storage
 from pvcompare import check_inputs
+from pvcompare import static_inputs
+from pvcompare import cache
+from pvcompare import pipeline
+from pvcompare import shared_weather
+from pvcompare import mvs_interface
 
 
 # Reconfiguring the logger here will also affect test running in the PyCharm IDE
 log_format = "%(asctime)s %(levelname)s %(filename)s:%(lineno)d %(message)s"
 logging.basicConfig(stream=sys.stdout, level=logging.DEBUG, format=log_format)
 
+# frozen weather data and signature of its file by weather file, see load_weather_data()
+_WEATHER = {}
+
 
 def apply_pvcompare(
     storeys,
@@ -47,6 +55,8 @@ def apply_pvcompare(
     overwrite_grid_parameters=True,
     overwrite_pv_parameters=True,
     overwrite_heat_parameters=True,
+    use_unit_demand_profiles=False,
+    max_workers=1,
 ):
     r"""
     Runs the main functionalities of pvcompare.
@@ -56,6 +66,10 @@ def apply_pvcompare(
     parameters. Additionally, COPs are calculated if a heat pump is added to the energy
     system.
 
+    The pre-processing stages are run with :py:func:`~.pipeline.run_pipeline`, so
+    that only the stages whose inputs have changed since the last run are
+    executed.
+
     Parameters
     ----------
     storeys: int
@@ -111,12 +125,21 @@ def apply_pvcompare(
         absolute and relative will be overwritten with calculated time series of fixed thermal
         losses relative and absolute.
         Default: True.
+    use_unit_demand_profiles: bool
+        If True, the demand profiles are scaled from the profiles of one
+        inhabitant, see :py:func:`~.demand.calculate_load_profiles`. This is used
+        in loops over the number of storeys. Default: False.
+    max_workers: int or None
+        Maximum number of pre-processing stages that are executed at the same time
+        in parallel threads, see :py:func:`~.pipeline.run_pipeline`. If None, the
+        number of processors of the machine is used. Default: 1.
 
     Returns
     -------
     None
         Saves calculated time series to `timeseries` folder in `user_inputs_mvs_directory` and
-        updates csv files in `csv_elements` folder.
+        updates csv files in `csv_elements` folder. The csv files are only updated
+        if all steps succeed, see :py:func:`~.check_inputs.csv_elements_workspace`.
     """
 
     if static_inputs_directory == None:
@@ -127,93 +150,225 @@ def apply_pvcompare(
         )
     if user_inputs_mvs_directory == None:
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+    if collections_mvs_inputs_directory == None:
+        collections_mvs_inputs_directory = (
+            constants.DEFAULT_COLLECTION_MVS_INPUTS_DIRECTORY
+        )
 
-    # add location and year to project data
-    (
-        latitude,
-        longitude,
-        country,
-        year,
-    ) = check_inputs.add_location_and_year_to_project_data(
-        user_inputs_mvs_directory,
-        static_inputs_directory,
-        latitude,
-        longitude,
-        country,
-        year,
-    )
-    # add grid parameters specified by country
-    if overwrite_grid_parameters == True:
-        check_inputs.add_local_grid_parameters(
+    # the files in `csv_elements` are modified in memory and saved at the end
+    with check_inputs.csv_elements_workspace(user_inputs_mvs_directory):
+        # add location and year to project data
+        (
+            latitude,
+            longitude,
+            country,
+            year,
+        ) = check_inputs.add_location_and_year_to_project_data(
+            user_inputs_mvs_directory,
+            static_inputs_directory,
+            latitude,
+            longitude,
+            country,
+            year,
+        )
+        weather = load_weather_data(
+            latitude=latitude,
+            longitude=longitude,
+            year=year,
             static_inputs_directory=static_inputs_directory,
+        )
+
+        # only the stages whose inputs have changed since the last run are executed,
+        # each stage gets its own view of the weather data
+        stages = []
+        # add grid parameters specified by country
+        if overwrite_grid_parameters == True:
+            stages.append(
+                {
+                    "name": "grid_parameters",
+                    "function": check_inputs.add_local_grid_parameters,
+                    "kwargs": dict(
+                        static_inputs_directory=static_inputs_directory,
+                        user_inputs_mvs_directory=user_inputs_mvs_directory,
+                    ),
+                    # the static inputs directory also contains generated files
+                    "input_files": [
+                        os.path.join(
+                            static_inputs_directory,
+                            static_inputs.LOCAL_GRID_PARAMETERS_FILENAME,
+                        )
+                    ],
+                }
+            )
+        # add "evaluated_period" to simulation_settings.csv
+        stages.append(
+            {
+                "name": "evaluated_period",
+                "function": check_inputs.add_evaluated_period_to_simulation_settings,
+                "kwargs": dict(
+                    time_series=shared_weather.get_weather_view(weather),
+                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                ),
+            }
+        )
+        # check energyProduction.csv file for the correct pv technology
+        stages.append(
+            {
+                "name": "energy_production",
+                "function": check_inputs.overwrite_mvs_energy_production_file,
+                "kwargs": dict(
+                    pv_setup=pv_setup,
+                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                    collections_mvs_inputs_directory=collections_mvs_inputs_directory,
+                    overwrite_pv_parameters=overwrite_pv_parameters,
+                ),
+                "input_directories": [
+                    "user_inputs_pvcompare_directory",
+                    "collections_mvs_inputs_directory",
+                ],
+            }
+        )
+        stages.append(
+            {
+                "name": "pv_components",
+                "function": pv_feedin.create_pv_components,
+                "kwargs": dict(
+                    lat=latitude,
+                    lon=longitude,
+                    weather=shared_weather.get_weather_view(weather),
+                    storeys=storeys,
+                    pv_setup=pv_setup,
+                    plot=plot,
+                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                    year=year,
+                    normalization=True,
+                ),
+                "input_directories": ["user_inputs_pvcompare_directory"],
+                "depends_on": ["energy_production"],
+            }
+        )
+        # add sector coupling in case heat pump or chiller exists in energyConversion.csv
+        # note: chiller was not tested, yet.
+        stages.append(
+            {
+                "name": "sector_coupling",
+                "function": heat_pump_and_chiller.add_sector_coupling,
+                "kwargs": dict(
+                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                    weather=shared_weather.get_weather_view(weather),
+                    lat=latitude,
+                    lon=longitude,
+                    overwrite_hp_parameters=overwrite_heat_parameters,
+                ),
+                "input_directories": ["user_inputs_pvcompare_directory"],
+            }
+        )
+        stages.append(
+            {
+                "name": "load_profiles",
+                "function": demand.calculate_load_profiles,
+                "kwargs": dict(
+                    country=country,
+                    lat=latitude,
+                    lon=longitude,
+                    storeys=storeys,
+                    year=year,
+                    static_inputs_directory=static_inputs_directory,
+                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                    weather=shared_weather.get_weather_view(weather),
+                    use_unit_demand_profiles=use_unit_demand_profiles,
+                ),
+                "input_directories": ["user_inputs_pvcompare_directory"],
+                "input_files": [
+                    os.path.join(static_inputs_directory, filename)
+                    for filename in static_inputs.DEFAULT_STATISTICS_FILENAMES
+                ],
+                "depends_on": ["sector_coupling"],
+            }
+        )
+        stages.append(
+            {
+                "name": "stratified_thermal_storage",
+                "function": stratified_thermal_storage.add_strat_tes,
+                "kwargs": dict(
+                    weather=shared_weather.get_weather_view(weather),
+                    lat=latitude,
+                    lon=longitude,
+                    user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
+                    user_inputs_mvs_directory=user_inputs_mvs_directory,
+                    overwrite_tes_parameters=overwrite_heat_parameters,
+                ),
+                "input_directories": ["user_inputs_pvcompare_directory"],
+                "depends_on": [
+                    stage["name"]
+                    for stage in stages
+                    if stage["name"] in ["grid_parameters", "sector_coupling"]
+                ],
+            }
+        )
+        pipeline.run_pipeline(
+            stages=stages,
             user_inputs_mvs_directory=user_inputs_mvs_directory,
+            max_workers=max_workers,
         )
 
-    # check if weather data already exists
-    weather_file = os.path.join(
-        static_inputs_directory, f"weatherdata_{latitude}_{longitude}_{year}.csv"
-    )
-    if os.path.isfile(weather_file):
-        weather = pd.read_csv(weather_file, index_col=0,)
-    else:
-        # if era5 import works this line can be used
-        weather = era5.load_era5_weatherdata(lat=latitude, lon=longitude, year=year)
-        weather.to_csv(weather_file)
-    # add datetimeindex
-    weather.index = pd.to_datetime(weather.index)
-
-    # check energyProduction.csv file for the correct pv technology
-    check_inputs.overwrite_mvs_energy_production_file(
-        pv_setup=pv_setup,
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
-        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-        collections_mvs_inputs_directory=collections_mvs_inputs_directory,
-        overwrite_pv_parameters=overwrite_pv_parameters,
-    )
-    pv_feedin.create_pv_components(
-        lat=latitude,
-        lon=longitude,
-        weather=weather,
-        storeys=storeys,
-        pv_setup=pv_setup,
-        plot=plot,
-        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
-        year=year,
-        normalization=True,
-    )
 
-    # add sector coupling in case heat pump or chiller exists in energyConversion.csv
-    # note: chiller was not tested, yet.
-    heat_pump_and_chiller.add_sector_coupling(
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
-        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-        weather=weather,
-        lat=latitude,
-        lon=longitude,
-        overwrite_hp_parameters=overwrite_heat_parameters,
-    )
+def load_weather_data(latitude, longitude, year, static_inputs_directory=None):
+    r"""
+    Loads the weather data of a location and year.
 
-    demand.calculate_load_profiles(
-        country=country,
-        lat=latitude,
-        lon=longitude,
-        storeys=storeys,
-        year=year,
-        static_inputs_directory=static_inputs_directory,
-        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
-        weather=weather,
-    )
+    The weather data is read from `weatherdata_{latitude}_{longitude}_{year}.csv` in
+    `static_inputs_directory`. If this file does not exist, the weather data is
+    loaded from ERA5 and saved to this file.
+
+    The weather data is frozen with :py:func:`~.shared_weather.freeze_weather` and
+    kept in memory, so that it is only read again if the file has been modified.
 
-    stratified_thermal_storage.add_strat_tes(
-        weather=weather,
-        lat=latitude,
-        lon=longitude,
-        user_inputs_pvcompare_directory=user_inputs_pvcompare_directory,
-        user_inputs_mvs_directory=user_inputs_mvs_directory,
-        overwrite_tes_parameters=overwrite_heat_parameters,
+    Parameters
+    ----------
+    latitude: float
+        Latitude of the location.
+    longitude: float
+        Longitude of the location.
+    year: int
+        Year of the weather data.
+    static_inputs_directory: str or None
+        Path to pvcompare static inputs. If None,
+        `constants.DEFAULT_STATIC_INPUTS_DIRECTORY` is used.
+        Default: None.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        View of the frozen weather data with a :pandas:`pandas.DatetimeIndex<index>`,
+        see :py:func:`~.shared_weather.get_weather_view`.
+    """
+    if static_inputs_directory == None:
+        static_inputs_directory = constants.DEFAULT_STATIC_INPUTS_DIRECTORY
+
+    # check if weather data already exists
+    weather_file = os.path.abspath(
+        os.path.join(
+            static_inputs_directory, f"weatherdata_{latitude}_{longitude}_{year}.csv"
+        )
     )
+    if not os.path.isfile(weather_file):
+        # if era5 import works this line can be used
+        weather = era5.load_era5_weatherdata(lat=latitude, lon=longitude, year=year)
+        cache.write_csv(weather, weather_file)
+    # the weather data is only read again if the file has been modified
+    stat = os.stat(weather_file)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    if weather_file not in _WEATHER or _WEATHER[weather_file][0] != signature:
+        weather = pd.read_csv(weather_file, index_col=0,)
+        # add datetimeindex
+        weather.index = pd.to_datetime(weather.index)
+        _WEATHER[weather_file] = (signature, shared_weather.freeze_weather(weather))
+    return shared_weather.get_weather_view(_WEATHER[weather_file][1])
 
 
 def apply_mvs(
@@ -221,10 +376,20 @@ def apply_mvs(
     user_inputs_mvs_directory=None,
     outputs_directory=None,
     mvs_output_directory=None,
+    in_memory=False,
+    save_png=True,
+    save_excel=True,
 ):
     r"""
     Starts the energy system optimization with MVS and stores results.
 
+    By default, MVS is started with its command line interface, that reads the
+    files of `csv_elements` and saves all results, see
+    :py:func:`multi_vector_simulator.cli.main`. If `in_memory` is True, the input
+    dictionary of MVS is created in memory and the results are returned instead,
+    see :py:func:`~.mvs_interface.run_mvs_simulation`. This avoids the file I/O
+    around the optimization, e.g. in loops.
+
     Parameters
     ----------
     scenario_name: str
@@ -243,12 +408,29 @@ def apply_mvs(
         automatically according to `outputs_directory` and `scenario_name`:
         'outputs_directory/scenario_name/mvs_output'.
         Default: None.
+    in_memory: bool
+        If True, the inputs are handed over to MVS in memory and no json files
+        are saved. Default: False.
+    save_png: bool
+        If True, the PNG plots of MVS are saved. Default: True.
+    save_excel: bool
+        If True, the results are saved to 'scalars.xlsx' and
+        'timeseries_all_busses.xlsx'. Can only be False if `in_memory` is True.
+        Default: True.
 
     Returns
     -------
+    dict or None
         Stores simulation results in directory according to `outputs_directory` and `scenario_name` in 'outputs_directory/scenario_name/mvs_outputs'.
+        If `in_memory` is True, the MVS dictionary with all inputs and results is
+        returned.
     """
 
+    if not in_memory and not save_excel:
+        raise ValueError(
+            "The Excel files of the results are always saved by the command line "
+            "interface of MVS. Please set `in_memory` to True to skip them."
+        )
     if user_inputs_mvs_directory is None:
         user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
     if outputs_directory is None:
@@ -277,10 +459,17 @@ def apply_mvs(
         user_inputs_mvs_directory, scenario_name
     )
 
+    if in_memory:
+        return mvs_interface.run_mvs_simulation(
+            user_inputs_mvs_directory=user_inputs_mvs_directory,
+            mvs_output_directory=mvs_output_directory,
+            save_png=save_png,
+            save_excel=save_excel,
+        )
     mvs.main(
         path_input_folder=user_inputs_mvs_directory,
         path_output_folder=mvs_output_directory,
         input_type="csv",
         overwrite=True,
-        save_png=True,
+        save_png=save_png,
     )
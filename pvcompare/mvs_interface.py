@@ -0,0 +1,217 @@
+"""
+This module hands the inputs of pvcompare over to MVS in memory.
+
+The command line interface of MVS (:py:func:`multi_vector_simulator.cli.main`)
+converts the files of 'mvs_inputs/csv_elements' into a json file, parses this file
+again, copies all inputs into the output directory and saves the results as Excel
+and json files and as PNG plots. In loops over many scenarios this file I/O and the
+plots take longer than the optimization itself.
+
+Here, the MVS input dictionary is created from the files of `csv_elements` without
+writing the json file. The dictionary is the same as the one that MVS parses from
+its json file. The simulation is then run with the modules of MVS and its results
+are returned as dictionary. Excel files and PNG plots are only saved on request.
+
+Functions this module contains:
+- create_mvs_input_dict
+- run_mvs_simulation
+"""
+
+import os
+import copy
+import shutil
+import json
+import logging
+
+import multi_vector_simulator.A1_csv_to_json as A1
+import multi_vector_simulator.B0_data_input_json as B0
+import multi_vector_simulator.C0_data_processing as C0
+import multi_vector_simulator.D0_modelling_and_optimization as D0
+import multi_vector_simulator.E0_evaluation as E0
+import multi_vector_simulator.F0_output as F0
+import multi_vector_simulator.F1_plotting as F1
+from multi_vector_simulator.utils import compare_input_parameters_with_reference
+from multi_vector_simulator.utils.constants import (
+    REQUIRED_CSV_FILES,
+    SIMULATION_SETTINGS,
+    ECONOMIC_DATA,
+    PROJECT_DATA,
+    ENERGY_BUSSES,
+    ENERGY_CONSUMPTION,
+    ENERGY_CONVERSION,
+    ENERGY_PRODUCTION,
+    ENERGY_PROVIDERS,
+    FIX_COST,
+    INPUTS_COPY,
+    PATHS_TO_PLOTS,
+    DICT_PLOTS,
+    PATH_INPUT_FOLDER,
+    PATH_OUTPUT_FOLDER,
+    PATH_OUTPUT_FOLDER_INPUTS,
+)
+from multi_vector_simulator.utils.constants_json_strings import (
+    LABEL,
+    TIME_INDEX,
+    DEMANDS,
+    RESOURCES,
+)
+
+from pvcompare import constants
+
+
+def create_mvs_input_dict(user_inputs_mvs_directory=None, mvs_output_directory=None):
+    r"""
+    Creates the MVS input dictionary from the files of `csv_elements` in memory.
+
+    The files are parsed as in :py:func:`multi_vector_simulator.A1_csv_to_json.create_input_json`
+    and the dictionary is converted as in
+    :py:func:`multi_vector_simulator.B0_data_input_json.load_json`, but the json
+    file 'mvs_csv_config.json' is neither written nor read.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+    mvs_output_directory: str or None
+        Path to the output directory of the simulation, which is added to the
+        simulation settings. If None, the default output folder of MVS is kept.
+        Default: None.
+
+    Returns
+    -------
+    dict
+        MVS input dictionary with time index, default values and paths of the
+        input and output directory.
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+    csv_elements_directory = os.path.join(user_inputs_mvs_directory, "csv_elements")
+
+    missing_csv_files = [
+        filename
+        for filename in REQUIRED_CSV_FILES
+        if not os.path.isfile(os.path.join(csv_elements_directory, f"{filename}.csv"))
+    ]
+    if missing_csv_files:
+        raise FileNotFoundError(
+            f"Required input files {missing_csv_files} are missing! Please add them "
+            f"into {csv_elements_directory}."
+        )
+    input_json = {}
+    for filename in REQUIRED_CSV_FILES:
+        single_dict = A1.create_json_from_csv(csv_elements_directory, filename)
+        if filename in [PROJECT_DATA, ECONOMIC_DATA, SIMULATION_SETTINGS]:
+            single_dict[filename][LABEL] = filename
+        elif filename in [
+            ENERGY_BUSSES,
+            ENERGY_CONSUMPTION,
+            ENERGY_CONVERSION,
+            ENERGY_PRODUCTION,
+            ENERGY_PROVIDERS,
+            FIX_COST,
+        ]:
+            for key, item in single_dict[filename].items():
+                item[LABEL] = key
+        input_json.update(single_dict)
+
+    # the round trip through a json string in memory results in the same types
+    # as the json file of MVS
+    dict_values = json.loads(json.dumps(input_json, skipkeys=True, sort_keys=True))
+    dict_values[SIMULATION_SETTINGS] = B0.convert_from_json_to_special_types(
+        dict_values[SIMULATION_SETTINGS]
+    )
+    B0.retrieve_date_time_info(dict_values[SIMULATION_SETTINGS])
+    dict_values = B0.convert_from_json_to_special_types(
+        dict_values, time_index=dict_values[SIMULATION_SETTINGS][TIME_INDEX]
+    )
+
+    dict_values[SIMULATION_SETTINGS][PATH_INPUT_FOLDER] = user_inputs_mvs_directory
+    if mvs_output_directory is not None:
+        dict_values[SIMULATION_SETTINGS][PATH_OUTPUT_FOLDER] = mvs_output_directory
+        dict_values[SIMULATION_SETTINGS][PATH_OUTPUT_FOLDER_INPUTS] = os.path.join(
+            mvs_output_directory, INPUTS_COPY
+        )
+    if PATHS_TO_PLOTS not in dict_values:
+        dict_values.update(copy.deepcopy(DICT_PLOTS))
+    compare_input_parameters_with_reference(
+        dict_values, flag_missing=True, set_default=True
+    )
+    return dict_values
+
+
+def run_mvs_simulation(
+    user_inputs_mvs_directory, mvs_output_directory, save_png=False, save_excel=False
+):
+    r"""
+    Runs the MVS simulation with the input dictionary created in memory.
+
+    The inputs are not converted into a json file and no json files of the results
+    are saved. Only the files of `csv_elements` are copied into the inputs folder
+    of `mvs_output_directory`, as the plots of pvcompare read the PV systems
+    from 'energyProduction.csv', but not the time series of the inputs.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+    mvs_output_directory: str
+        Path to output directory where the Excel files and PNG plots are saved.
+        It is created if it does not exist.
+    save_png: bool
+        If True, the PNG plots of MVS and the graph of the energy system are
+        saved. Default: False.
+    save_excel: bool
+        If True, the results are saved to 'scalars.xlsx' and
+        'timeseries_all_busses.xlsx' as by MVS. Default: False.
+
+    Returns
+    -------
+    dict
+        MVS dictionary with all inputs and results of the simulation.
+    """
+    dict_values = create_mvs_input_dict(
+        user_inputs_mvs_directory=user_inputs_mvs_directory,
+        mvs_output_directory=mvs_output_directory,
+    )
+    os.makedirs(mvs_output_directory, exist_ok=True)
+    csv_elements_copy = os.path.join(
+        dict_values[SIMULATION_SETTINGS][PATH_OUTPUT_FOLDER_INPUTS], "csv_elements"
+    )
+    if os.path.isdir(csv_elements_copy):
+        shutil.rmtree(csv_elements_copy)
+    shutil.copytree(
+        os.path.join(user_inputs_mvs_directory, "csv_elements"),
+        csv_elements_copy,
+        ignore=shutil.ignore_patterns(".*"),
+    )
+
+    logging.debug("Accessing script: C0_data_processing")
+    C0.all(dict_values)
+    logging.debug("Accessing script: D0_modelling_and_optimization")
+    results_meta, results_main = D0.run_oemof(
+        dict_values, save_energy_system_graph=save_png
+    )
+    logging.debug("Accessing script: E0_evaluation")
+    E0.evaluate_dict(dict_values, results_main, results_meta)
+
+    if save_excel:
+        F0.store_timeseries_all_busses_to_excel(dict_values)
+        F0.store_scalars_to_excel(dict_values)
+    if save_png:
+        # same plots as in F0.evaluate_dict()
+        for data_type in [DEMANDS, RESOURCES]:
+            F1.plot_timeseries(
+                dict_values, data_type=data_type, file_path=mvs_output_directory
+            )
+            F1.plot_timeseries(
+                dict_values,
+                data_type=data_type,
+                max_days=14,
+                file_path=mvs_output_directory,
+            )
+        F1.plot_instant_power(dict_values, file_path=mvs_output_directory)
+        F1.plot_optimized_capacities(dict_values, file_path=mvs_output_directory)
+        F1.plot_piecharts_of_costs(dict_values, file_path=mvs_output_directory)
+    return dict_values
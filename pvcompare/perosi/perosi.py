@@ -8,6 +8,7 @@ import decimal
 import pvlib
 import pvcompare.perosi.pvlib_smarts as smarts
 import pvcompare.perosi.era5 as era5
+from pvcompare import shared_weather
 
 
 # Reconfiguring the logger here will also affect test running in the PyCharm IDE
@@ -68,6 +69,8 @@ def calculate_smarts_parameters(
         atmos_data = era5.load_era5_weatherdata(lat, lon, year, variable="perosi")
     #    delta = pd.to_timedelta(30, unit="m")
     #    atmos_data.index = atmos_data.index + delta
+    # columns are added to a view, so that `atmos_data` is not modified
+    atmos_data = shared_weather.get_weather_view(atmos_data)
     atmos_data.index = pd.to_datetime(atmos_data.index)
     atmos_data["davt"] = atmos_data["temp_air"].resample("D").mean()
     atmos_data = atmos_data.fillna(method="ffill")
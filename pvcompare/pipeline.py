@@ -0,0 +1,622 @@
+"""
+This module runs the pre-processing stages of :py:func:`~pvcompare.main.apply_pvcompare`
+as a pipeline that only re-executes the stages whose inputs have changed.
+
+A stage is described by a dict with the keys
+
+- "name": unique name of the stage,
+- "function": function that runs the stage,
+- "kwargs": keyword arguments of "function",
+- "input_directories": names of the keyword arguments that are input
+  directories, whose files are part of the fingerprint of the stage instead of
+  their path (optional),
+- "input_files": paths of further files that the stage reads, whose contents
+  are part of the fingerprint of the stage, e.g. single files of the static
+  inputs directory, that also contains generated files (optional) and
+- "depends_on": names of the stages that have to be finished first (optional).
+
+The inputs of a stage are its keyword arguments, e.g. parameters and the weather
+data, the files of its input directories and the files of 'mvs_inputs/csv_elements'
+that it reads, as well as its input files. The outputs of a stage are the modified files of `csv_elements` and
+the time series that these files refer to. Stages are expected to overwrite
+parameters, so that executing a stage again on its own outputs does not change
+them.
+
+The fingerprint of a stage also contains the source code of the module of its
+function, so that a stage is executed again after its code has been changed.
+Changes in other modules that are called by the function are not detected; delete
+the manifest to execute all stages again.
+
+The inputs and outputs of each stage are recorded in the manifest
+'pipeline_manifest.json' of the MVS inputs directory. A stage whose inputs are
+unchanged and whose time series have not been modified since is not executed
+again, instead its recorded modifications of `csv_elements` are applied. As the
+manifest is copied into scenario workspaces (see
+:py:mod:`~pvcompare.scenario_workspace`), a loop step that changes one MVS
+parameter only executes the stages that read this parameter.
+
+Stages that do not depend on each other can be executed in parallel threads, see
+:py:func:`~.run_pipeline`.
+
+Functions this module contains:
+- run_pipeline
+"""
+
+import io
+import os
+import json
+import inspect
+import hashlib
+import logging
+import concurrent.futures
+import pandas as pd
+
+import pvcompare
+from pvcompare import constants
+from pvcompare import check_inputs
+from pvcompare import cache
+
+# name of the manifest of the stages in the MVS inputs directory
+MANIFEST_FILENAME = "pipeline_manifest.json"
+
+
+def _get_code_fingerprint(function):
+    r"""
+    Returns the fingerprint of the code of `function`.
+
+    The code is the source code of the module `function` is defined in, so that
+    the helper functions of the module are included. If the source code is not
+    available, the bytecode of `function` is used.
+
+    Parameters
+    ----------
+    function: callable
+        Function of a stage.
+
+    Returns
+    -------
+    str
+        Fingerprint of the code, see :py:func:`~.cache.get_fingerprint`.
+    """
+    try:
+        source = inspect.getsource(inspect.getmodule(function))
+    except (OSError, TypeError):
+        code = getattr(function, "__code__", None)
+        if code is None:
+            return cache.get_fingerprint(repr(function))
+        return cache.get_fingerprint(code.co_code, repr(code.co_consts))
+    return cache.get_fingerprint(source)
+
+
+def _get_file_fingerprint(filename):
+    r"""
+    Returns the fingerprint of the content of the file `filename`.
+
+    Parameters
+    ----------
+    filename: str
+        Path to an input file of a stage.
+
+    Returns
+    -------
+    str or None
+        Hexadecimal SHA-256 hash of the content of the file or None if it does
+        not exist.
+    """
+    if not os.path.isfile(filename):
+        return None
+    with open(filename, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _get_stage_fingerprint(stage, directory_fingerprints):
+    r"""
+    Returns the fingerprint of the keyword arguments and input files of `stage`.
+
+    Parameters
+    ----------
+    stage: dict
+        Stage as described in the module docstring.
+    directory_fingerprints: dict
+        Fingerprints by input directory and input file, that are reused and
+        completed by this function.
+
+    Returns
+    -------
+    str
+        Fingerprint of the stage, see :py:func:`~.cache.get_fingerprint`.
+    """
+    input_directories = stage.get("input_directories", [])
+    parameters = {}
+    for name, value in stage["kwargs"].items():
+        if name == "user_inputs_mvs_directory":
+            # the files of `csv_elements` are recorded separately
+            continue
+        if name in input_directories:
+            directory = os.path.abspath(value)
+            if directory not in directory_fingerprints:
+                directory_fingerprints[directory] = cache.get_directory_fingerprint(
+                    directory
+                )
+            value = directory_fingerprints[directory]
+        parameters[name] = value
+    input_files = []
+    for filename in stage.get("input_files", []):
+        filename = os.path.abspath(filename)
+        if filename not in directory_fingerprints:
+            directory_fingerprints[filename] = _get_file_fingerprint(filename)
+        input_files.append((filename, directory_fingerprints[filename]))
+    function = stage["function"]
+    return cache.get_fingerprint(
+        pvcompare.__version__,
+        function.__module__ + "." + function.__qualname__,
+        _get_code_fingerprint(function),
+        parameters,
+        input_files,
+    )
+
+
+def _get_mvs_file_fingerprint(user_inputs_mvs_directory, mvs_filename):
+    r"""
+    Returns the fingerprint of the content of a file of `csv_elements`.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+    mvs_filename: str
+        Name of the mvs-csv file.
+
+    Returns
+    -------
+    str or None
+        Fingerprint of the content of the file or None if it does not exist.
+    """
+    content, na_rep = check_inputs.get_mvs_file_content(
+        user_inputs_mvs_directory, mvs_filename
+    )
+    if content is None:
+        return None
+    return cache.get_fingerprint(content)
+
+
+def _get_time_series_signature(user_inputs_mvs_directory, filename):
+    r"""
+    Returns the size and modification time of a time series of MVS.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+    filename: str
+        Name of the file in 'mvs_inputs/time_series'.
+
+    Returns
+    -------
+    list or None
+        Size and modification time in ns or None if the file does not exist.
+    """
+    file_path = os.path.join(user_inputs_mvs_directory, "time_series", filename)
+    if not os.path.isfile(file_path):
+        return None
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _is_stage_up_to_date(entry, fingerprint, user_inputs_mvs_directory, same_stages):
+    r"""
+    Checks if the recorded `entry` of a stage is valid for the current inputs.
+
+    Parameters
+    ----------
+    entry: dict or None
+        Entry of the stage in the manifest.
+    fingerprint: str
+        Fingerprint of the stage, see :py:func:`~._get_stage_fingerprint`.
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+    same_stages: bool
+        True, if the pipeline consists of the same stages as in the run of the
+        manifest.
+
+    Returns
+    -------
+    bool
+        True, if the stage was executed with the same fingerprint, each of its
+        files of `csv_elements` is in the state before the stage (or at the end
+        of the pipeline, if `same_stages` is True) and its time series have not
+        been modified since.
+    """
+    if not isinstance(entry, dict) or entry.get("fingerprint") != fingerprint:
+        return False
+    final = entry.get("final", {}) if same_stages else {}
+    for mvs_filename, file_fingerprint in entry.get("inputs", {}).items():
+        current = _get_mvs_file_fingerprint(user_inputs_mvs_directory, mvs_filename)
+        if current != file_fingerprint and (
+            mvs_filename not in final or current != final[mvs_filename]
+        ):
+            return False
+    for filename, signature in entry.get("time_series", {}).items():
+        if _get_time_series_signature(user_inputs_mvs_directory, filename) != signature:
+            return False
+    return True
+
+
+def _get_time_series_filenames(user_inputs_mvs_directory, contents):
+    r"""
+    Returns the names of the time series of MVS that are referred to in `contents`.
+
+    Parameters
+    ----------
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+    contents: list
+        Contents of files of `csv_elements`.
+
+    Returns
+    -------
+    list
+        Names of the files in 'mvs_inputs/time_series' that occur in `contents`.
+    """
+    timeseries_directory = os.path.join(user_inputs_mvs_directory, "time_series")
+    if not os.path.isdir(timeseries_directory):
+        return []
+    return sorted(
+        filename
+        for filename in os.listdir(timeseries_directory)
+        if not filename.startswith(".")
+        and any(filename in content for content in contents)
+    )
+
+
+def _run_stage(stage, user_inputs_mvs_directory):
+    r"""
+    Executes `stage` and records the files of `csv_elements` that it reads and modifies.
+
+    Parameters
+    ----------
+    stage: dict
+        Stage as described in the module docstring.
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+
+    Returns
+    -------
+    dict
+        Entry of the stage in the manifest with the fingerprints of its files of
+        `csv_elements` before its execution and its modifications of these files.
+    contents: list
+        Contents of the files of `csv_elements` that were accessed by the stage
+        after its execution.
+    """
+    csv_elements_directory = os.path.join(user_inputs_mvs_directory, "csv_elements")
+    before = {
+        mvs_filename: check_inputs.get_mvs_file_content(
+            user_inputs_mvs_directory, mvs_filename
+        )[0]
+        for mvs_filename in os.listdir(csv_elements_directory)
+        if mvs_filename.endswith(".csv")
+    }
+    with check_inputs.record_mvs_files(user_inputs_mvs_directory) as mvs_filenames:
+        stage["function"](**stage["kwargs"])
+
+    inputs = {}
+    results = {}
+    contents = []
+    for mvs_filename in sorted(mvs_filenames):
+        content, na_rep = check_inputs.get_mvs_file_content(
+            user_inputs_mvs_directory, mvs_filename
+        )
+        inputs[mvs_filename] = (
+            cache.get_fingerprint(before[mvs_filename])
+            if before.get(mvs_filename) is not None
+            else None
+        )
+        if content != before.get(mvs_filename):
+            results[mvs_filename] = {"content": content, "na_rep": na_rep}
+        contents.append(content)
+    return {"inputs": inputs, "results": results}, contents
+
+
+def _apply_results(entry, user_inputs_mvs_directory):
+    r"""
+    Applies the recorded modifications of `csv_elements` of a stage that is not executed.
+
+    Parameters
+    ----------
+    entry: dict
+        Entry of the stage in the manifest.
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+
+    Returns
+    -------
+    None
+    """
+    for mvs_filename, result in entry.get("results", {}).items():
+        check_inputs.write_mvs_file(
+            pd.read_csv(io.StringIO(result["content"]), index_col=0),
+            user_inputs_mvs_directory,
+            mvs_filename,
+            na_rep=result["na_rep"],
+        )
+
+
+def _reuse_stage(
+    stage, manifest, same_stages, directory_fingerprints, user_inputs_mvs_directory,
+):
+    r"""
+    Applies the recorded modifications of `stage` if its inputs are unchanged.
+
+    Parameters
+    ----------
+    stage: dict
+        Stage as described in the module docstring.
+    manifest: dict
+        Manifest of the last run.
+    same_stages: bool
+        True, if the pipeline consists of the same stages as in the last run.
+    directory_fingerprints: dict
+        Fingerprints by input directory and input file, see
+        :py:func:`~._get_stage_fingerprint`.
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+
+    Returns
+    -------
+    fingerprint: str
+        Fingerprint of the stage.
+    dict or None
+        Entry of the stage in the manifest, if its recorded modifications have
+        been applied. None, if the stage has to be executed.
+    """
+    fingerprint = _get_stage_fingerprint(stage, directory_fingerprints)
+    entry = manifest.get("entries", {}).get(stage["name"])
+    if not _is_stage_up_to_date(
+        entry, fingerprint, user_inputs_mvs_directory, same_stages
+    ):
+        return fingerprint, None
+    _apply_results(entry, user_inputs_mvs_directory)
+    return fingerprint, entry
+
+
+def _check_independent_stages(stages, entries):
+    r"""
+    Checks that stages that may run at the same time access different files.
+
+    Parameters
+    ----------
+    stages: list
+        Stages as described in the module docstring.
+    entries: dict
+        Entries of the stages in the manifest by name of the stage.
+
+    Returns
+    -------
+    None
+    """
+    ancestors = {}
+    for stage in stages:
+        ancestors[stage["name"]] = set()
+        for name in stage.get("depends_on", []):
+            ancestors[stage["name"]] |= {name} | ancestors[name]
+    names = [stage["name"] for stage in stages]
+    for i, name in enumerate(names):
+        for other in names[:i]:
+            if other in ancestors[name]:
+                continue
+            mvs_filenames = set(entries[name]["inputs"]) & set(entries[other]["inputs"])
+            if mvs_filenames:
+                raise ValueError(
+                    f"The stages {other} and {name} both access the files "
+                    f"{sorted(mvs_filenames)} of csv_elements, but {name} does not "
+                    f"depend on {other}. Please add the dependency, so that the "
+                    f"stages are not executed at the same time."
+                )
+
+
+def run_pipeline(stages, user_inputs_mvs_directory=None, max_workers=1):
+    r"""
+    Runs the stages of a pipeline.
+
+    A stage is executed if it has not been executed before with the same inputs
+    or if one of its time series has been modified since. Otherwise, its recorded
+    modifications of the files of `csv_elements` are applied. Stages depending on
+    an executed stage are only executed again if their inputs have changed. The
+    files of `csv_elements` are modified within a
+    :py:func:`~.check_inputs.csv_elements_workspace`, the manifest is only
+    updated if all stages succeed.
+
+    If `max_workers` is 1, the stages are run one after another in the given
+    order. Otherwise, a stage is executed in a thread pool as soon as the stages
+    it depends on have finished. As all stages modify the same workspace, stages
+    that do not depend on each other must not access the same files of
+    `csv_elements`, which is checked after all stages have finished. The
+    modifications of the files of `csv_elements` are then the same as in the given
+    order.
+
+    Parameters
+    ----------
+    stages: list
+        Stages as described in the module docstring.
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+    max_workers: int or None
+        Maximum number of stages that are executed at the same time. If None,
+        the number of processors of the machine is used. Default: 1.
+
+    Returns
+    -------
+    list
+        Names of the stages that have been executed.
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+    names = []
+    for stage in stages:
+        for name in stage.get("depends_on", []):
+            if name not in names:
+                raise ValueError(
+                    f"The stage {stage['name']} depends on {name}, which is not "
+                    f"one of the previous stages."
+                )
+        names.append(stage["name"])
+
+    manifest = cache.load_manifest(user_inputs_mvs_directory, MANIFEST_FILENAME)
+    # the files of `csv_elements` at the end of the last run are valid inputs of
+    # a stage, as its recorded modifications and those of the following stages
+    # restore this state
+    same_stages = manifest.get("stages") == names
+    directory_fingerprints = {}
+    entries = {}
+    contents = {}
+    with check_inputs.csv_elements_workspace(user_inputs_mvs_directory):
+        if max_workers == 1:
+            for stage in stages:
+                fingerprint, entry = _reuse_stage(
+                    stage,
+                    manifest,
+                    same_stages,
+                    directory_fingerprints,
+                    user_inputs_mvs_directory,
+                )
+                if entry is None:
+                    entry, contents[stage["name"]] = _run_stage(
+                        stage, user_inputs_mvs_directory
+                    )
+                    entry["fingerprint"] = fingerprint
+                entries[stage["name"]] = entry
+        else:
+            _run_stages_in_parallel(
+                stages,
+                manifest,
+                same_stages,
+                directory_fingerprints,
+                user_inputs_mvs_directory,
+                max_workers,
+                entries,
+                contents,
+            )
+            _check_independent_stages(stages, entries)
+
+        for entry in entries.values():
+            entry["final"] = {
+                mvs_filename: _get_mvs_file_fingerprint(
+                    user_inputs_mvs_directory, mvs_filename
+                )
+                for mvs_filename in entry["inputs"]
+            }
+
+    # the time series are recorded after all stages, as a stage may refer to the
+    # time series of a later stage
+    for name, entry in entries.items():
+        if name in contents:
+            filenames = _get_time_series_filenames(
+                user_inputs_mvs_directory, contents[name]
+            )
+        else:
+            filenames = entry.get("time_series", {})
+        entry["time_series"] = {
+            filename: _get_time_series_signature(user_inputs_mvs_directory, filename)
+            for filename in filenames
+        }
+    cache.replace_files(
+        {
+            os.path.join(user_inputs_mvs_directory, MANIFEST_FILENAME): json.dumps(
+                {"stages": names, "entries": entries}, indent=4, sort_keys=True
+            )
+        }
+    )
+    executed = [name for name in names if name in contents]
+    skipped = [name for name in names if name not in contents]
+    if skipped:
+        logging.info(f"The unchanged stages {skipped} have not been executed again.")
+    return executed
+
+
+def _run_stages_in_parallel(
+    stages,
+    manifest,
+    same_stages,
+    directory_fingerprints,
+    user_inputs_mvs_directory,
+    max_workers,
+    entries,
+    contents,
+):
+    r"""
+    Runs the stages of a pipeline in a thread pool, see :py:func:`~.run_pipeline`.
+
+    Parameters
+    ----------
+    stages: list
+        Stages as described in the module docstring.
+    manifest: dict
+        Manifest of the last run.
+    same_stages: bool
+        True, if the pipeline consists of the same stages as in the last run.
+    directory_fingerprints: dict
+        Fingerprints by input directory and input file, see
+        :py:func:`~._get_stage_fingerprint`.
+    user_inputs_mvs_directory: str
+        Path to MVS specific input directory.
+    max_workers: int or None
+        Maximum number of stages that are executed at the same time.
+    entries: dict
+        Entries of the stages in the manifest by name, that is filled by this
+        function.
+    contents: dict
+        Contents of the accessed files of `csv_elements` by name of the executed
+        stages, that is filled by this function.
+
+    Returns
+    -------
+    None
+    """
+    if max_workers == None:
+        max_workers = os.cpu_count()
+    # all files are loaded before the threads are started
+    for mvs_filename in os.listdir(
+        os.path.join(user_inputs_mvs_directory, "csv_elements")
+    ):
+        if mvs_filename.endswith(".csv"):
+            check_inputs.read_mvs_file(user_inputs_mvs_directory, mvs_filename)
+
+    pending = list(stages)
+    running = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # start all stages whose dependencies have finished
+            for stage in list(pending):
+                if len(running) >= max_workers:
+                    break
+                if not set(stage.get("depends_on", [])) <= set(entries):
+                    continue
+                pending.remove(stage)
+                fingerprint, entry = _reuse_stage(
+                    stage,
+                    manifest,
+                    same_stages,
+                    directory_fingerprints,
+                    user_inputs_mvs_directory,
+                )
+                if entry is None:
+                    future = executor.submit(
+                        _run_stage, stage, user_inputs_mvs_directory
+                    )
+                    running[future] = (stage, fingerprint)
+                else:
+                    entries[stage["name"]] = entry
+            if not running:
+                continue
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                entry, contents[stage["name"]] = future.result()
+                entry["fingerprint"] = fingerprint
+                entries[stage["name"]] = entry
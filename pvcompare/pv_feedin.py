@@ -29,6 +29,7 @@ except ImportError:
 import pvcompare.cpv.inputs
 import pvcompare.perosi.perosi
 from pvcompare import area_potential
+from pvcompare import cache
 from pvcompare import check_inputs
 from pvcompare import constants
 
@@ -201,7 +202,7 @@ def create_pv_components(
 
             # save time series into mvs_inputs
             time_series.fillna(0, inplace=True)
-            time_series.to_csv(output_csv, header=["kW"], index=False)
+            cache.write_csv(time_series, output_csv, header=["kW"], index=False)
             logging.info(
                 "%s" % row["technology"] + " time series is saved as csv "
                 "into output directory"
@@ -213,11 +214,6 @@ def create_pv_components(
                 "already exists and is therefore not calculated again."
             )
 
-        # add "evaluated_period" to simulation_settings.csv
-        check_inputs.add_evaluated_period_to_simulation_settings(
-            time_series=time_series, user_inputs_mvs_directory=user_inputs_mvs_directory
-        )
-
         if plot == True:
             plt.plot(
                 time_series,
@@ -0,0 +1,118 @@
+"""
+This module creates scenario workspaces, i.e. lightweight copies of the input
+directories of pvcompare and MVS, in which one step of a loop can modify its inputs
+without affecting the other steps.
+
+The time series of MVS are hard-linked into the workspace instead of being copied.
+As all time series are written with :py:func:`~pvcompare.cache.write_csv`, that
+replaces a file instead of overwriting it, a time series that is generated anew in
+a workspace does not change the file in the original directory. All other files
+are small and are copied.
+
+Functions this module contains:
+- create_scenario_workspace
+"""
+
+import os
+import shutil
+import logging
+
+from pvcompare import constants
+from pvcompare import check_inputs
+
+# directories of the MVS inputs whose files are hard-linked into a workspace
+LINKED_DIRECTORIES = ["time_series"]
+
+
+def _link_or_copy(source, destination):
+    r"""
+    Hard-links `source` to `destination` or copies it if hard links are not possible.
+
+    Parameters
+    ----------
+    source: str
+        Path of the file.
+    destination: str
+        Path of the link.
+
+    Returns
+    -------
+    str
+        `destination`.
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        # e.g. across file systems or on file systems without hard links
+        shutil.copy2(source, destination)
+    return destination
+
+
+def create_scenario_workspace(
+    workspace_directory,
+    user_inputs_mvs_directory=None,
+    user_inputs_pvcompare_directory=None,
+):
+    r"""
+    Creates a scenario workspace from the inputs of pvcompare and MVS.
+
+    The MVS inputs are copied to 'workspace_directory/mvs_inputs' and the pvcompare
+    inputs to 'workspace_directory/pvcompare_inputs'. The files of the directories
+    `LINKED_DIRECTORIES` of the MVS inputs are hard-linked. The inputs are locked
+    with :py:func:`~.check_inputs.lock_csv_elements` while they are copied.
+
+    Parameters
+    ----------
+    workspace_directory: str
+        Directory of the workspace. It must not exist yet.
+    user_inputs_mvs_directory: str or None
+        Path to MVS specific input directory that is copied. If None,
+        `constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY` is used.
+        Default: None.
+    user_inputs_pvcompare_directory: str or None
+        Path to pvcompare specific input directory that is copied. If None,
+        `constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY` is used.
+        Default: None.
+
+    Returns
+    -------
+    user_inputs_mvs_directory: str
+        Path to the MVS inputs of the workspace.
+    user_inputs_pvcompare_directory: str
+        Path to the pvcompare inputs of the workspace.
+    """
+    if user_inputs_mvs_directory == None:
+        user_inputs_mvs_directory = constants.DEFAULT_USER_INPUTS_MVS_DIRECTORY
+    if user_inputs_pvcompare_directory == None:
+        user_inputs_pvcompare_directory = (
+            constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY
+        )
+    if os.path.exists(workspace_directory):
+        raise NameError(
+            f"The workspace directory {workspace_directory} already exists. "
+            f"Please delete the existing folder or choose another directory."
+        )
+
+    workspace_mvs_directory = os.path.join(workspace_directory, "mvs_inputs")
+    workspace_pvcompare_directory = os.path.join(
+        workspace_directory, "pvcompare_inputs"
+    )
+    with check_inputs.lock_csv_elements(user_inputs_mvs_directory):
+        shutil.copytree(
+            user_inputs_mvs_directory,
+            workspace_mvs_directory,
+            ignore=shutil.ignore_patterns(
+                check_inputs.LOCK_FILENAME, *LINKED_DIRECTORIES
+            ),
+        )
+        for directory in LINKED_DIRECTORIES:
+            if os.path.isdir(os.path.join(user_inputs_mvs_directory, directory)):
+                shutil.copytree(
+                    os.path.join(user_inputs_mvs_directory, directory),
+                    os.path.join(workspace_mvs_directory, directory),
+                    copy_function=_link_or_copy,
+                )
+    shutil.copytree(user_inputs_pvcompare_directory, workspace_pvcompare_directory)
+    logging.info(f"The scenario workspace {workspace_directory} has been created.")
+
+    return workspace_mvs_directory, workspace_pvcompare_directory
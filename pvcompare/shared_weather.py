@@ -0,0 +1,62 @@
+"""
+This module provides the weather data of a simulation as one shared, immutable
+data frame.
+
+The weather data is frozen once after loading: all columns are converted to
+float64 and stored in one column-major numpy array that is not writeable. Each
+stage of :py:func:`~pvcompare.main.apply_pvcompare` receives a view of the frozen
+weather data, that shares this array without copying it. A stage can add columns
+to or change the index of its view without affecting the other stages, and
+values of the shared array cannot be overwritten, so that the stages can also use
+the weather data in parallel threads.
+
+Functions this module contains:
+- freeze_weather
+- get_weather_view
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def freeze_weather(weather):
+    r"""
+    Returns an immutable copy of `weather`.
+
+    Parameters
+    ----------
+    weather: :pandas:`pandas.DataFrame<frame>`
+        Weather data with numeric columns.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Weather data with the same index and columns as `weather`, whose values
+        are stored in one read-only float64 array with contiguous columns.
+    """
+    values = np.array(weather.to_numpy(dtype=np.float64), order="F")
+    values.flags.writeable = False
+    return pd.DataFrame(
+        values, index=weather.index.copy(), columns=weather.columns.copy(), copy=False
+    )
+
+
+def get_weather_view(weather):
+    r"""
+    Returns a view of `weather` that shares its values.
+
+    Columns that are added to the view and changes of its index do not affect
+    `weather`. If `weather` is frozen with :py:func:`~.freeze_weather`, the values
+    of the view cannot be overwritten in place.
+
+    Parameters
+    ----------
+    weather: :pandas:`pandas.DataFrame<frame>`
+        Weather data.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        View of `weather`.
+    """
+    return weather.copy(deep=False)
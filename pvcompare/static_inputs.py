@@ -0,0 +1,354 @@
+"""
+This module compiles the statistical static inputs of pvcompare into one table.
+
+The national consumption statistics (Excel files) and the population statistics
+(csv file) in the static inputs directory are converted once into a table that is
+indexed by country and year and holds one column per source file. The compiled
+table is saved to 'compiled_statistics.csv' in the static inputs directory and
+kept in memory, so that no Excel file has to be parsed again when looping over
+simulations. The table is compiled anew as soon as one of its source files is
+modified.
+
+Functions this module contains:
+- compile_statistics
+- load_statistics
+- get_statistic
+- get_countries_and_years
+- load_local_grid_parameters
+- clear_cache
+"""
+
+import os
+import logging
+import pandas as pd
+
+from pvcompare import constants
+from pvcompare import cache
+
+# name of the file the compiled statistics are saved to
+COMPILED_STATISTICS_FILENAME = "compiled_statistics.csv"
+
+# source files of the statistics that are compiled by default
+DEFAULT_STATISTICS_FILENAMES = [
+    "electricity_consumption_residential.xlsx",
+    "electricity_consumption_SH_residential.xlsx",
+    "electricity_consumption_WH_residential.xlsx",
+    "electricity_consumption_cooking_residential.xlsx",
+    "total_consumption_residential.xlsx",
+    "total_consumption_SH_residential.xlsx",
+    "total_consumption_WH_residential.xlsx",
+    "total_consumption_cooking_residential.xlsx",
+    "EUROSTAT_population.csv",
+]
+
+# name of the file of the local grid parameters
+LOCAL_GRID_PARAMETERS_FILENAME = "local_grid_parameters.xlsx"
+
+# compiled statistics and grid parameters by static inputs directory
+_STATISTICS = {}
+_GRID_PARAMETERS = {}
+
+
+def _read_statistics_file(filename):
+    r"""
+    Reads one statistics file into a series indexed by country and year.
+
+    Parameters
+    ----------
+    filename: str
+        Path to an Excel file in the format of the Odyssee statistics or to a
+        csv file in the format of the Eurostat population statistics.
+
+    Returns
+    -------
+    :pandas:`pandas.Series<series>`
+        Values of the statistic with a multi index of country and year.
+    """
+    if filename.endswith(".csv"):
+        statistic = pd.read_csv(filename, index_col=0, sep=",")
+    else:
+        statistic = pd.read_excel(filename, header=1, index_col=0)
+
+    # only keep the columns of years and the rows of countries
+    year_columns = [column for column in statistic.columns if str(column).isdigit()]
+    statistic = statistic[year_columns]
+    statistic.columns = [int(column) for column in year_columns]
+    statistic = statistic[statistic.index.notnull()]
+    statistic = statistic.apply(pd.to_numeric, errors="coerce")
+
+    statistic = statistic.stack()
+    statistic.index.names = ["country", "year"]
+    return statistic
+
+
+def compile_statistics(static_inputs_directory=None, filenames=None):
+    r"""
+    Compiles statistics files into a table indexed by country and year.
+
+    The compiled table is saved to 'compiled_statistics.csv' in
+    `static_inputs_directory`, if the directory is writable.
+
+    Parameters
+    ----------
+    static_inputs_directory: str or None
+        Path to pvcompare static inputs. If None,
+        `constants.DEFAULT_STATIC_INPUTS_DIRECTORY` is used.
+        Default: None.
+    filenames: list or None
+        Names of the statistics files in `static_inputs_directory` that are
+        compiled. If None, `DEFAULT_STATISTICS_FILENAMES` are compiled.
+        Default: None.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Compiled statistics with a multi index of country and year and the names
+        of the source files as columns.
+    """
+    if static_inputs_directory is None:
+        static_inputs_directory = constants.DEFAULT_STATIC_INPUTS_DIRECTORY
+    if filenames is None:
+        filenames = DEFAULT_STATISTICS_FILENAMES
+
+    statistics = pd.concat(
+        [
+            _read_statistics_file(os.path.join(static_inputs_directory, filename))
+            for filename in filenames
+        ],
+        axis=1,
+        keys=filenames,
+    )
+    statistics.sort_index(inplace=True)
+
+    compiled_file = os.path.join(static_inputs_directory, COMPILED_STATISTICS_FILENAME)
+    try:
+        cache.write_csv(statistics, compiled_file)
+        logging.info(
+            f"The statistics of the static inputs are compiled to {compiled_file}."
+        )
+    except OSError as error:
+        # saving is optional, e.g. in a read-only installation
+        logging.debug(
+            f"The compiled statistics could not be saved to {compiled_file}: {error}"
+        )
+    return statistics
+
+
+def _get_modification_times(static_inputs_directory, filenames):
+    r"""
+    Returns the modification times of the source files of statistics.
+
+    Parameters
+    ----------
+    static_inputs_directory: str
+        Path to pvcompare static inputs.
+    filenames: list
+        Names of the statistics files in `static_inputs_directory`.
+
+    Returns
+    -------
+    dict
+        Modification time by name of the file, None if the file does not exist.
+    """
+    modification_times = {}
+    for filename in filenames:
+        source = os.path.join(static_inputs_directory, filename)
+        modification_times[filename] = (
+            os.path.getmtime(source) if os.path.isfile(source) else None
+        )
+    return modification_times
+
+
+def load_statistics(static_inputs_directory=None, filenames=None):
+    r"""
+    Loads the compiled statistics of the static inputs.
+
+    The statistics are kept in memory for each `static_inputs_directory`, as long
+    as none of their source files is modified. Otherwise, they are loaded from
+    'compiled_statistics.csv'. The statistics are compiled with
+    :py:func:`~.compile_statistics` if this file does not exist, misses one of
+    `filenames` or is older than one of its source files.
+
+    Parameters
+    ----------
+    static_inputs_directory: str or None
+        Path to pvcompare static inputs. If None,
+        `constants.DEFAULT_STATIC_INPUTS_DIRECTORY` is used.
+        Default: None.
+    filenames: list or None
+        Names of the statistics files that have to be contained in the
+        statistics. If None, `DEFAULT_STATISTICS_FILENAMES` are used.
+        Default: None.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Compiled statistics with a multi index of country and year and the names
+        of the source files as columns.
+    """
+    if static_inputs_directory is None:
+        static_inputs_directory = constants.DEFAULT_STATIC_INPUTS_DIRECTORY
+    if filenames is None:
+        filenames = DEFAULT_STATISTICS_FILENAMES
+    key = os.path.abspath(static_inputs_directory)
+
+    if key in _STATISTICS:
+        modification_times, statistics = _STATISTICS[key]
+        current_modification_times = _get_modification_times(
+            static_inputs_directory, statistics.columns
+        )
+        is_up_to_date = modification_times == current_modification_times
+        if is_up_to_date and all(f in statistics.columns for f in filenames):
+            return statistics
+        # keep the files of the table in memory in the compiled statistics
+        filenames = list(
+            dict.fromkeys(
+                list(filenames)
+                + [
+                    f
+                    for f, modified in current_modification_times.items()
+                    if modified is not None
+                ]
+            )
+        )
+
+    compiled_file = os.path.join(static_inputs_directory, COMPILED_STATISTICS_FILENAME)
+    if os.path.isfile(compiled_file):
+        statistics = pd.read_csv(
+            compiled_file, index_col=[0, 1], float_precision="round_trip"
+        )
+        sources = [
+            os.path.join(static_inputs_directory, filename)
+            for filename in statistics.columns
+        ]
+        is_up_to_date = all(
+            os.path.isfile(source)
+            and os.path.getmtime(source) <= os.path.getmtime(compiled_file)
+            for source in sources
+        )
+        if is_up_to_date and all(f in statistics.columns for f in filenames):
+            _STATISTICS[key] = (
+                _get_modification_times(static_inputs_directory, statistics.columns),
+                statistics,
+            )
+            return statistics
+        # keep the files of the outdated table in the compiled statistics
+        filenames = list(
+            dict.fromkeys(
+                list(filenames)
+                + [f for f, s in zip(statistics.columns, sources) if os.path.isfile(s)]
+            )
+        )
+
+    modification_times = _get_modification_times(static_inputs_directory, filenames)
+    statistics = compile_statistics(
+        static_inputs_directory=static_inputs_directory, filenames=filenames
+    )
+    _STATISTICS[key] = (modification_times, statistics)
+    return statistics
+
+
+def get_statistic(country, year, filename, static_inputs_directory=None):
+    r"""
+    Returns the value of a statistic for `country` and `year`.
+
+    Parameters
+    ----------
+    country: str
+        The country's name has to be in English and with capital first letter.
+    year: int
+        Year of the statistic.
+    filename: str
+        Name of the source file of the statistic, e.g.
+        'electricity_consumption_residential.xlsx'.
+    static_inputs_directory: str or None
+        Path to pvcompare static inputs. If None,
+        `constants.DEFAULT_STATIC_INPUTS_DIRECTORY` is used.
+        Default: None.
+
+    Returns
+    -------
+    float
+        Value of the statistic.
+    """
+    statistics = load_statistics(
+        static_inputs_directory=static_inputs_directory,
+        filenames=list(dict.fromkeys(DEFAULT_STATISTICS_FILENAMES + [filename])),
+    )
+    return statistics.at[(country, int(year)), filename]
+
+
+def get_countries_and_years(filename, static_inputs_directory=None):
+    r"""
+    Returns the countries and years for which a statistic is available.
+
+    Parameters
+    ----------
+    filename: str
+        Name of the source file of the statistic.
+    static_inputs_directory: str or None
+        Path to pvcompare static inputs. If None,
+        `constants.DEFAULT_STATIC_INPUTS_DIRECTORY` is used.
+        Default: None.
+
+    Returns
+    -------
+    countries: set
+        Countries with at least one value of the statistic.
+    years: set
+        Years with at least one value of the statistic.
+    """
+    statistics = load_statistics(
+        static_inputs_directory=static_inputs_directory,
+        filenames=list(dict.fromkeys(DEFAULT_STATISTICS_FILENAMES + [filename])),
+    )
+    statistic = statistics[filename].dropna()
+    countries = set(statistic.index.get_level_values("country"))
+    years = set(statistic.index.get_level_values("year"))
+    return countries, years
+
+
+def load_local_grid_parameters(static_inputs_directory=None):
+    r"""
+    Loads 'local_grid_parameters.xlsx' from `static_inputs_directory`.
+
+    The grid parameters are read only once for each `static_inputs_directory` and
+    kept in memory afterwards.
+
+    Parameters
+    ----------
+    static_inputs_directory: str or None
+        Path to pvcompare static inputs. If None,
+        `constants.DEFAULT_STATIC_INPUTS_DIRECTORY` is used.
+        Default: None.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<frame>`
+        Grid parameters with countries as index and parameters as columns.
+    """
+    if static_inputs_directory is None:
+        static_inputs_directory = constants.DEFAULT_STATIC_INPUTS_DIRECTORY
+    grid_file_path = os.path.join(
+        static_inputs_directory, LOCAL_GRID_PARAMETERS_FILENAME
+    )
+    key = os.path.abspath(grid_file_path)
+
+    modified = os.path.getmtime(grid_file_path)
+    if key not in _GRID_PARAMETERS or _GRID_PARAMETERS[key][0] != modified:
+        grid_parameters = pd.read_excel(grid_file_path, index_col=0, header=0)
+        _GRID_PARAMETERS[key] = (modified, grid_parameters)
+    # return a copy so that callers cannot alter the cached parameters
+    return _GRID_PARAMETERS[key][1].copy()
+
+
+def clear_cache():
+    r"""
+    Removes the statistics and grid parameters kept in memory.
+
+    Returns
+    -------
+    None
+    """
+    _STATISTICS.clear()
+    _GRID_PARAMETERS.clear()
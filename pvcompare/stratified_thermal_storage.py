@@ -9,15 +9,25 @@ scalar numeric.
 """
 
 import pandas as pd
+import numpy as np
 import math
 import os
+import json
 import logging
-import maya
 import oemof.thermal.stratified_thermal_storage as strat_tes
 
 # internal imports
 from pvcompare import constants
 from pvcompare import check_inputs
+from pvcompare import time_index
+from pvcompare import cache
+
+# relative tolerance within which a time series of losses is regarded as constant
+CONSTANT_LOSSES_TOLERANCE = 1e-9
+
+# name of the file in the MVS inputs directory that records the time series
+# references of losses that were written as scalar into storage_xx.csv
+LOSS_REFERENCES_FILENAME = "strat_tes_loss_references.json"
 
 
 def calc_strat_tes_param(
@@ -139,6 +149,156 @@ def calc_strat_tes_param(
     )
 
 
+def calc_strat_tes_param_batch(
+    weather,
+    diameter=None,
+    height=None,
+    temp_h=None,
+    temp_c=None,
+    s_iso=None,
+    lamb_iso=None,
+    temperature_col="temp_air",
+    user_inputs_pvcompare_directory=None,
+):
+    r"""
+    Does the precalculations of many variants of the stratified thermal storage.
+
+    The parameters of :py:func:`~.calc_strat_tes_param` are calculated for all
+    variants at once with the functions of oemof.thermal, that are broadcast over
+    the variants and the time steps of the ambient temperature. This way, the
+    losses of many storage designs can be compared without running
+    :py:func:`~.add_strat_tes` for each of them.
+
+    Parameters
+    ----------
+    weather : :pandas:`pandas.DataFrame<frame>`
+        Contains weather data time series. Required: ambient temperature in
+        column `temperature_col`.
+    diameter : float, list, numpy.ndarray or None
+        Diameters of the storage variants in m. If None, the value of
+        `stratified_thermal_storage.csv` is used. Default: None.
+    height : float, list, numpy.ndarray or None
+        Heights of the storage variants in m. If None, the value of
+        `stratified_thermal_storage.csv` is used. Default: None.
+    temp_h : float, list, numpy.ndarray or None
+        Temperatures of the hot storage medium in °C. If None, the value of
+        `stratified_thermal_storage.csv` is used. Default: None.
+    temp_c : float, list, numpy.ndarray or None
+        Temperatures of the cold storage medium in °C. If None, the value of
+        `stratified_thermal_storage.csv` is used. Default: None.
+    s_iso : float, list, numpy.ndarray or None
+        Thicknesses of the isolation layer in mm. If None, the value of
+        `stratified_thermal_storage.csv` is used. Default: None.
+    lamb_iso : float, list, numpy.ndarray or None
+        Thermal conductivities of the isolation layer in W/(m*K). If None, the
+        value of `stratified_thermal_storage.csv` is used. Default: None.
+    temperature_col : str
+        Name of column in `weather` containing ambient temperature.
+        Default: "temp_air".
+    user_inputs_pvcompare_directory: str or None
+        Directory of the user inputs. If None,
+        `constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY` is used as user_inputs_pvcompare_directory.
+        Default: None.
+
+    Returns
+    -------
+    nominal_storage_capacity : numpy.ndarray
+        Maximum amount of stored thermal energy of each variant [kWh]. Shape:
+        (number of variants,).
+
+    loss_rate : numpy.ndarray
+        The relative loss of the storage capacity between two consecutive
+        timesteps of each variant [-]. Shape: (number of variants,).
+
+    fixed_losses_relative : numpy.ndarray
+        Losses independent of state of charge between two consecutive
+        timesteps relative to nominal storage capacity [-]. Shape: (number of
+        variants, number of time steps of `weather`).
+
+    fixed_losses_absolute : numpy.ndarray
+        Losses independent of state of charge and independent of
+        nominal storage capacity between two consecutive timesteps [MWh]. Shape:
+        (number of variants, number of time steps of `weather`).
+
+    Notes
+    -----
+    All parameters that are passed as list or array have to be of the same
+    length, which is the number of variants. Scalars are used for all variants.
+    """
+    if user_inputs_pvcompare_directory == None:
+        user_inputs_pvcompare_directory = (
+            constants.DEFAULT_USER_INPUTS_PVCOMPARE_DIRECTORY
+        )
+
+    input_data = pd.read_csv(
+        os.path.join(user_inputs_pvcompare_directory, "stratified_thermal_storage.csv"),
+        header=0,
+        index_col=0,
+    )["var_value"]
+    variants = {
+        "diameter": diameter,
+        "height": height,
+        "temp_h": temp_h,
+        "temp_c": temp_c,
+        "s_iso": s_iso,
+        "lamb_iso": lamb_iso,
+    }
+    for name, value in variants.items():
+        if value is None:
+            value = input_data[name]
+        variants[name] = np.asarray(value, dtype=float)
+    # bring all parameters to the shape (number of variants, 1) so that they are
+    # broadcast against the ambient temperature of shape (number of time steps,)
+    variants = dict(
+        zip(
+            variants.keys(),
+            (
+                np.reshape(value, (-1, 1))
+                for value in np.broadcast_arrays(*variants.values())
+            ),
+        )
+    )
+    ambient_temperature = weather[temperature_col].values
+
+    u_value = strat_tes.calculate_storage_u_value(
+        variants["s_iso"],
+        variants["lamb_iso"],
+        input_data["alpha_inside"],
+        input_data["alpha_outside"],
+    )
+
+    volume, surface = strat_tes.calculate_storage_dimensions(
+        variants["height"], variants["diameter"]
+    )
+
+    nominal_storage_capacity = (
+        strat_tes.calculate_capacities(volume, variants["temp_h"], variants["temp_c"])
+        * 1000
+    )
+    nominal_storage_capacity = np.where(
+        np.isnan(nominal_storage_capacity), 0, nominal_storage_capacity
+    )
+
+    (
+        loss_rate,
+        fixed_losses_relative,
+        fixed_losses_absolute,
+    ) = strat_tes.calculate_losses(
+        u_value,
+        variants["diameter"],
+        variants["temp_h"],
+        variants["temp_c"],
+        ambient_temperature,
+    )
+
+    return (
+        nominal_storage_capacity[:, 0],
+        loss_rate[:, 0],
+        fixed_losses_relative,
+        fixed_losses_absolute,
+    )
+
+
 def save_time_dependent_values(
     losses, value_name, unit, filename, time_series_directory
 ):
@@ -172,14 +332,42 @@ def save_time_dependent_values(
         value.name = unit
 
         # Save value to csv
-        value.to_csv(
-            os.path.join(time_series_directory, filename), index=False, header=True
+        cache.write_csv(
+            value,
+            os.path.join(time_series_directory, filename),
+            index=False,
+            header=True,
         )
     logging.info(
         f"The time dependent {value_name} of a stratified thermal storage is saved under {time_series_directory}."
     )
 
 
+def get_constant_value(values, tolerance=CONSTANT_LOSSES_TOLERANCE):
+    r"""
+    Returns the value of a time series that is constant within `tolerance`.
+
+    Parameters
+    ----------
+    values : :pandas:`pandas.Series<series>` or numpy.ndarray
+        Time series, e.g. fixed thermal losses.
+    tolerance : float
+        Relative tolerance within which all values have to equal the first value.
+        Default: `CONSTANT_LOSSES_TOLERANCE`.
+
+    Returns
+    -------
+    float or None
+        First value of `values` if the time series is constant, otherwise None.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0 or not np.all(np.isfinite(values)):
+        return None
+    if np.allclose(values, values.flat[0], rtol=tolerance, atol=0):
+        return float(values.flat[0])
+    return None
+
+
 def add_strat_tes(
     weather,
     lat,
@@ -217,6 +405,13 @@ def add_strat_tes(
 
     Notes
     -----
+    Fixed thermal losses that are constant within `CONSTANT_LOSSES_TOLERANCE`,
+    e.g. due to a constant ambient temperature, are written as scalar into
+    `storage_xx.csv` instead of being saved as time series. The time series
+    reference they replace is recorded in `LOSS_REFERENCES_FILENAME` and restored
+    in later runs, so that the losses are calculated again, unless the scalar has
+    been changed by the user.
+
     You can include a stratified thermal storage in the model using two ways:
 
     1. With storage component with `inflow_direction` and `outflow_direction` to the heat bus
@@ -250,31 +445,23 @@ def add_strat_tes(
     # Read files
     # *********************************************************************************************
     # 1. Read energyStorage.csv
-    energy_storage = pd.read_csv(
-        os.path.join(user_inputs_mvs_directory, "csv_elements", "energyStorage.csv"),
-        header=0,
-        index_col=0,
+    energy_storage = check_inputs.read_mvs_file(
+        user_inputs_mvs_directory, "energyStorage.csv"
     )
 
     # 2. Read energyBusses.csv
-    energy_busses = pd.read_csv(
-        os.path.join(user_inputs_mvs_directory, "csv_elements", "energyBusses.csv"),
-        header=0,
-        index_col=0,
+    energy_busses = check_inputs.read_mvs_file(
+        user_inputs_mvs_directory, "energyBusses.csv"
     )
 
     # 3. Read energyConversion.csv
-    energy_conversion = pd.read_csv(
-        os.path.join(user_inputs_mvs_directory, "csv_elements", "energyConversion.csv"),
-        header=0,
-        index_col=0,
+    energy_conversion = check_inputs.read_mvs_file(
+        user_inputs_mvs_directory, "energyConversion.csv"
     )
 
     # 4. Read energyProviders.csv
-    energy_providers = pd.read_csv(
-        os.path.join(user_inputs_mvs_directory, "csv_elements", "energyProviders.csv"),
-        header=0,
-        index_col=0,
+    energy_providers = check_inputs.read_mvs_file(
+        user_inputs_mvs_directory, "energyProviders.csv"
     )
 
     # 5. Read stratified_thermal_storage.csv
@@ -293,7 +480,7 @@ def add_strat_tes(
         hp_input_data = pd.read_csv(hp_file_path, header=0, index_col=0,)
 
     # Create add on to filename (year, lat, lon, temp_high)
-    year = maya.parse(weather.index[int(len(weather) / 2)]).datetime().year
+    year = time_index.get_year(weather.index)
     if os.path.isfile(storage_file_path):
         add_on = f"_{year}_{lat}_{lon}_{temp_high}"
 
@@ -374,11 +561,7 @@ def add_strat_tes(
             user_inputs_mvs_directory=user_inputs_mvs_directory,
         )
         # Replace old storage_xx.csv with new one that contains calculated values
-        storage_xx = pd.read_csv(
-            os.path.join(user_inputs_mvs_directory, "csv_elements", storage_csv),
-            header=0,
-            index_col=0,
-        )
+        storage_xx = check_inputs.read_mvs_file(user_inputs_mvs_directory, storage_csv)
 
         # *********************************************************************************************
         # Check if time dependent data exists. Else save above calculated time series
@@ -396,11 +579,29 @@ def add_strat_tes(
         # Values from precalculation
         parameter = [fixed_losses_relative, fixed_losses_absolute]
 
+        # time series references of constant losses written as scalar by earlier runs
+        loss_references = cache.load_manifest(
+            user_inputs_mvs_directory, LOSS_REFERENCES_FILENAME
+        )
+        storage_references = dict(loss_references.get(storage_csv, {}))
+        references_changed = False
+
         for time_value in time_dependent_value:
             time_value_index = time_dependent_value.index(time_value)
             value_name_underscore = value_name[time_value_index].replace(" ", "_")
             for stratified_thermal_storage in stratified_thermal_storages:
                 value = storage_xx["storage capacity"][time_value]
+                reference = storage_references.pop(time_value, None)
+                if isinstance(reference, dict):
+                    try:
+                        collapsed = float(value) == reference.get("value")
+                    except ValueError:
+                        collapsed = False
+                    if collapsed:
+                        # restore the time series reference of constant losses
+                        value = reference["reference"]
+                        storage_xx["storage capacity"][time_value] = value
+                    references_changed = True
                 try:
                     float(value)
                     logging.info(
@@ -415,7 +616,6 @@ def add_strat_tes(
                     )
 
                     if not os.path.isfile(filename_csv) or overwrite_tes_parameters:
-                        year = weather.index[int(len(weather) / 2)].year
                         result_filename = os.path.join(
                             user_inputs_mvs_directory,
                             "time_series",
@@ -426,26 +626,46 @@ def add_strat_tes(
                                 f"File containing {value_name} is missing: {filename_csv} \nCalculated times series of {value_name} are used instead."
                             )
                         file_exists = False
-                        # write new filename into storage_xx
-                        storage_xx["storage capacity"][time_value] = storage_xx[
-                            "storage capacity"
-                        ][time_value].replace(
-                            filename_csv_excl_path,
-                            f"{value_name_underscore}_{year}_{lat}_{lon}_{temp_high}.csv",
-                        )
+                        constant_value = get_constant_value(parameter[time_value_index])
+                        if constant_value is not None:
+                            # write constant losses as scalar into storage_xx and
+                            # record the time series reference they replace
+                            storage_xx["storage capacity"][time_value] = constant_value
+                            storage_references[time_value] = {
+                                "reference": value,
+                                "value": constant_value,
+                            }
+                            references_changed = True
+                            logging.info(
+                                f"The {value_name[time_value_index]} of the stratified thermal storage are constant "
+                                f"and written as scalar {constant_value} into '{storage_csv}'."
+                            )
+                        else:
+                            # write new filename into storage_xx
+                            storage_xx["storage capacity"][time_value] = storage_xx[
+                                "storage capacity"
+                            ][time_value].replace(
+                                filename_csv_excl_path,
+                                f"{value_name_underscore}_{year}_{lat}_{lon}_{temp_high}.csv",
+                            )
+                    else:
+                        constant_value = None
 
                     if file_exists == False:
                         # update storage_xx.csv
-                        storage_xx.to_csv(
-                            os.path.join(
-                                user_inputs_mvs_directory,
-                                "csv_elements",
-                                f"{storage_csv}",
-                            ),
+                        check_inputs.write_mvs_file(
+                            storage_xx,
+                            user_inputs_mvs_directory,
+                            storage_csv,
                             na_rep="NaN",
                         )
-                        # Write results of time dependent values if non existent
-                        if not os.path.isfile(result_filename):
+                        # Write results of time dependent values if non existent or
+                        # if they are recalculated, as the name of the file does not
+                        # contain all parameters of the storage
+                        if constant_value is None and (
+                            overwrite_tes_parameters
+                            or not os.path.isfile(result_filename)
+                        ):
                             save_time_dependent_values(
                                 parameter[time_value_index],
                                 value_name_underscore,
@@ -454,6 +674,29 @@ def add_strat_tes(
                                 time_series_directory,
                             )
 
+        if references_changed:
+            # a restored reference may not have been written above
+            check_inputs.write_mvs_file(
+                storage_xx, user_inputs_mvs_directory, storage_csv, na_rep="NaN",
+            )
+            if storage_references:
+                loss_references[storage_csv] = storage_references
+            else:
+                loss_references.pop(storage_csv, None)
+            references_file = os.path.join(
+                user_inputs_mvs_directory, LOSS_REFERENCES_FILENAME
+            )
+            if loss_references:
+                cache.replace_files(
+                    {
+                        references_file: json.dumps(
+                            loss_references, indent=4, sort_keys=True
+                        )
+                    }
+                )
+            elif os.path.isfile(references_file):
+                os.remove(references_file)
+
 
 def run_stratified_thermal_storage():
     """
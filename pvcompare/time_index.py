@@ -0,0 +1,52 @@
+"""
+This module derives calendar information from the time index of time series.
+
+Functions this module contains:
+- get_year
+- get_evaluated_period
+"""
+
+import pandas as pd
+
+
+def get_year(time_index):
+    r"""
+    Returns the year of the time series with the index `time_index`.
+
+    The year of the timestamp in the middle of the index is returned, so that
+    a time series of one year is assigned to this year even if it starts or ends
+    with a timestamp of the previous or following year. Timezone aware
+    timestamps are converted to UTC first.
+
+    Parameters
+    ----------
+    time_index: :pandas:`pandas.DatetimeIndex<index>` or list
+        Time index of the time series, e.g. `weather.index`. Timestamps that are
+        not of type :pandas:`pandas.Timestamp<timestamp>` are converted.
+
+    Returns
+    -------
+    int
+        Year of the time series.
+    """
+    timestamp = pd.Timestamp(time_index[int(len(time_index) / 2)])
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC")
+    return timestamp.year
+
+
+def get_evaluated_period(time_index):
+    r"""
+    Returns the number of days of the hourly time series with the index `time_index`.
+
+    Parameters
+    ----------
+    time_index: :pandas:`pandas.DatetimeIndex<index>` or list
+        Hourly time index of the time series.
+
+    Returns
+    -------
+    float
+        Number of days covered by `time_index`.
+    """
+    return len(time_index) / 24
@@ -33,13 +33,12 @@ setup(
     python_requires=">=3.5, <4",
     install_requires=[
         "pvlib",
-        "demandlib",
+        "demandlib < 0.3",
         "feedinlib == v0.1.0rc2",
         "numpy >= 1.12.0,  < 1.17",
         "pandas >= 0.18.1, < 0.25",
         "oemof.thermal >= 0.0.3",
         "scipy",
-        "maya~=0.6.1",
         "workalendar < 7.0.0",
         "multi_vector_simulator==0.5.5",
         "cpvlib @ git+https://github.com/isi-ies-group/cpvlib.git@2020-11#egg=cpvlib-0",
@@ -53,5 +52,6 @@ setup(
     extras_require={
         "dev": ["pytest==5.3.5", "black==19.10b0", "coverage", "coveralls",],
         "docs": ["sphinx_rtd_theme", "Sphinx>=1.4.3"],
+        "parquet": ["pyarrow"],
     },
 )
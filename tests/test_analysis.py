@@ -9,8 +9,22 @@ https://docs.python.org/3/library/unittest.html are also good support.
 """
 
 import os
-from pvcompare.analysis import loop_mvs
+import mock
+import pandas as pd
+from pvcompare import analysis
+from pvcompare.analysis import (
+    loop_mvs,
+    loop_pvcompare,
+    single_loop_mvs,
+    get_loop_excel_files,
+    get_workspace_directory,
+    create_loop_output_structure,
+)
 from pvcompare import constants
+from pvcompare import main
+from pvcompare import check_inputs
+from pvcompare import loop_results
+from pvcompare.scenario_workspace import create_scenario_workspace
 import glob
 import shutil
 
@@ -28,3 +42,198 @@ class TestPlotProfiles:
             self.mvs_output_directory, "/timeseries/"
         )
         self.storeys = 5
+
+    def test_get_loop_excel_files(self):
+        loop_output_directory = os.path.join(
+            self.outputs_directory, self.scenario_name, "loop_outputs_storeys"
+        )
+        excel_files = get_loop_excel_files(loop_output_directory)
+        assert list(excel_files) == [
+            ("2011", "3"),
+            ("2011", "4"),
+            ("2015", "3"),
+            ("2015", "4"),
+        ]
+        filepath_s, filepath_t = excel_files[("2015", "3")]
+        assert os.path.basename(filepath_s) == "scalars_2015_3.xlsx"
+        assert os.path.basename(filepath_t) == "timeseries_all_busses__2015_3.xlsx"
+
+    def test_get_loop_excel_files_of_loop_mvs_and_locations(self):
+        loop_output_directory = os.path.join(
+            self.outputs_directory, "loop_outputs_excel_files"
+        )
+        for filename in [
+            os.path.join("scalars", "scalars_2014_0100.xlsx"),
+            os.path.join("timeseries", "timeseries_all_busses_2014_0100.xlsx"),
+            os.path.join("scalars", "scalars_2014_52.5_13.4.xlsx"),
+            os.path.join("timeseries", "timeseries_all_busses__2014_52.5_13.4.xlsx"),
+            os.path.join("scalars", "scalars_2014_1100.xlsx"),
+        ]:
+            os.makedirs(
+                os.path.dirname(os.path.join(loop_output_directory, filename)),
+                exist_ok=True,
+            )
+            open(os.path.join(loop_output_directory, filename), "w").close()
+        excel_files = get_loop_excel_files(loop_output_directory)
+        shutil.rmtree(loop_output_directory)
+        assert os.path.basename(excel_files[("2014", "0100")][1]) == (
+            "timeseries_all_busses_2014_0100.xlsx"
+        )
+        assert os.path.basename(excel_files[("2014", "52.5_13.4")][1]) == (
+            "timeseries_all_busses__2014_52.5_13.4.xlsx"
+        )
+        assert excel_files[("2014", "1100")][1] is None
+
+
+class TestSingleLoopMvs:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.scenario_name = "Test_Scenario_loop_mvs"
+        self.outputs_directory = constants.TEST_OUTPUTS_DIRECTORY
+        self.user_inputs_mvs_directory = constants.TEST_USER_INPUTS_MVS
+        self.variable_name = "energy_price"
+        self.year = 2014
+
+    def teardown_method(self):
+        shutil.rmtree(os.path.join(self.outputs_directory, self.scenario_name))
+
+    def read_csv_elements(self):
+        csv_directory = os.path.join(self.user_inputs_mvs_directory, "csv_elements")
+        contents = {}
+        for filename in sorted(os.listdir(csv_directory)):
+            with open(os.path.join(csv_directory, filename), "rb") as file:
+                contents[filename] = file.read()
+        return contents
+
+    def test_single_loop_mvs_in_workspaces(self):
+        user_csv_elements = self.read_csv_elements()
+        loop_output_directory = create_loop_output_structure(
+            self.outputs_directory, self.scenario_name, self.variable_name
+        )
+        energy_prices = []
+
+        def apply_mvs(
+            scenario_name, mvs_output_directory, user_inputs_mvs_directory, **kwargs
+        ):
+            # the simulation is replaced by saving the variable as results
+            energy_providers = pd.read_csv(
+                os.path.join(
+                    user_inputs_mvs_directory, "csv_elements", "energyProviders.csv"
+                ),
+                index_col=0,
+            )
+            energy_price = float(
+                energy_providers.at["energy_price", "Electricity grid"]
+            )
+            energy_prices.append((user_inputs_mvs_directory, energy_price))
+            os.makedirs(mvs_output_directory)
+            for filename in ["scalars.xlsx", "timeseries_all_busses.xlsx"]:
+                pd.DataFrame({"energy_price": [energy_price]}).to_excel(
+                    os.path.join(mvs_output_directory, filename)
+                )
+            return {}
+
+        workspace_directories = []
+        with mock.patch.object(main, "apply_mvs", side_effect=apply_mvs):
+            with mock.patch.object(loop_results, "is_available", return_value=False):
+                for value in [1, 2]:
+                    workspace_directory = get_workspace_directory(
+                        self.outputs_directory,
+                        self.scenario_name,
+                        self.variable_name,
+                        self.year,
+                        value,
+                    )
+                    workspace_directories.append(workspace_directory)
+                    create_scenario_workspace(
+                        workspace_directory=workspace_directory,
+                        user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+                        user_inputs_pvcompare_directory=constants.TEST_USER_INPUTS_PVCOMPARE,
+                    )
+                    single_loop_mvs(
+                        scenario_name=self.scenario_name,
+                        workspace_directory=workspace_directory,
+                        variable_name=self.variable_name,
+                        variable_column="Electricity grid",
+                        csv_file_variable="energyProviders.csv",
+                        value=value,
+                        year=self.year,
+                        step=str(value),
+                        outputs_directory=self.outputs_directory,
+                        loop_output_directory=loop_output_directory,
+                    )
+
+        # each step has set its variable in its own workspace
+        assert energy_prices == [
+            (os.path.join(workspace_directories[0], "mvs_inputs"), 1.0),
+            (os.path.join(workspace_directories[1], "mvs_inputs"), 2.0),
+        ]
+        for workspace_directory in workspace_directories:
+            assert not os.path.exists(workspace_directory)
+        # the inputs of the user are not changed
+        assert self.read_csv_elements() == user_csv_elements
+        # the results are copied into the loop output directory
+        for value in [1, 2]:
+            for filename in [
+                os.path.join("scalars", f"scalars_{self.year}_{value}.xlsx"),
+                os.path.join(
+                    "timeseries", f"timeseries_all_busses_{self.year}_{value}.xlsx"
+                ),
+            ]:
+                results = pd.read_excel(os.path.join(loop_output_directory, filename))
+                assert results.at[0, "energy_price"] == value
+
+
+class TestLoopPvcompareResume:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.scenario_name = "Test_Scenario_resume"
+        self.outputs_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "loop_resume"
+        )
+        self.user_inputs_mvs_directory = os.path.join(
+            self.outputs_directory, "mvs_inputs"
+        )
+
+    def setup_method(self):
+        shutil.copytree(constants.TEST_USER_INPUTS_MVS, self.user_inputs_mvs_directory)
+
+    def teardown_method(self):
+        shutil.rmtree(self.outputs_directory)
+
+    def run_loop(self):
+        with mock.patch.object(analysis, "single_loop_pvcompare") as single_loop:
+            with mock.patch.object(analysis, "postprocessing_kpi"):
+                loop_pvcompare(
+                    scenario_name=self.scenario_name,
+                    latitude=40.3,
+                    longitude=5.4,
+                    years=[2014],
+                    storeys=5,
+                    country="Spain",
+                    loop_type="storeys",
+                    loop_dict={"start": 5, "stop": 5, "step": 1},
+                    user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+                    outputs_directory=self.outputs_directory,
+                    user_inputs_pvcompare_directory=constants.TEST_USER_INPUTS_PVCOMPARE,
+                    resume=True,
+                )
+        return single_loop.call_count
+
+    def test_loop_pvcompare_resume_with_changed_mvs_inputs(self):
+        assert self.run_loop() == 1
+        # the finished step is skipped
+        assert self.run_loop() == 0
+        # the step is run again with a changed parameter of MVS
+        check_inputs.add_parameter_to_mvs_file(
+            self.user_inputs_mvs_directory,
+            "energyProviders.csv",
+            "energy_price",
+            "Electricity grid",
+            0.5,
+            warning=False,
+        )
+        assert self.run_loop() == 1
+        assert self.run_loop() == 0
@@ -0,0 +1,83 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import shutil
+import pandas as pd
+import pvcompare.constants as constants
+
+from pvcompare.cache import (
+    MANIFEST_FILENAME,
+    get_fingerprint,
+    get_directory_fingerprint,
+    load_manifest,
+    is_up_to_date,
+    update_manifest,
+    write_csv,
+)
+
+
+class TestCache:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.directory = os.path.join(constants.TEST_OUTPUTS_DIRECTORY, "cache")
+        self.filename = "time_series.csv"
+        self.series = pd.Series([1.0, 2.0, 3.0], name="temp_air")
+
+    def setup_method(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.series.to_csv(os.path.join(self.directory, self.filename))
+
+    def teardown_method(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_fingerprint_depends_on_content(self):
+        fingerprint = get_fingerprint("heat", 2015, self.series)
+        assert fingerprint == get_fingerprint("heat", 2015, self.series.copy())
+        assert fingerprint != get_fingerprint("heat", 2015, self.series * 2)
+        assert fingerprint != get_fingerprint("heat", 2016, self.series)
+
+    def test_is_up_to_date_after_update_manifest(self):
+        fingerprint = get_fingerprint(self.series)
+        assert is_up_to_date(self.directory, self.filename, fingerprint) is False
+        update_manifest(self.directory, self.filename, fingerprint)
+        assert os.path.isfile(os.path.join(self.directory, MANIFEST_FILENAME))
+        assert is_up_to_date(self.directory, self.filename, fingerprint) is True
+        assert is_up_to_date(self.directory, self.filename, "other") is False
+
+    def test_is_up_to_date_false_if_file_modified(self):
+        fingerprint = get_fingerprint(self.series)
+        update_manifest(self.directory, self.filename, fingerprint)
+        (self.series * 2).to_csv(os.path.join(self.directory, self.filename))
+        assert is_up_to_date(self.directory, self.filename, fingerprint) is False
+
+    def test_load_manifest_of_corrupted_file(self):
+        with open(os.path.join(self.directory, MANIFEST_FILENAME), "w") as file:
+            file.write("{")
+        assert load_manifest(self.directory) == {}
+
+    def test_write_csv_replaces_file(self):
+        filename = os.path.join(self.directory, self.filename)
+        os.chmod(filename, 0o644)
+        write_csv(self.series * 2, filename, index=False)
+        assert pd.read_csv(filename)["temp_air"].tolist() == [2.0, 4.0, 6.0]
+        assert os.stat(filename).st_mode & 0o777 == 0o644
+        assert os.listdir(self.directory) == [self.filename]
+
+    def test_get_directory_fingerprint_ignores_generated_files(self):
+        fingerprint = get_directory_fingerprint(self.directory)
+        update_manifest(self.directory, self.filename, get_fingerprint(self.series))
+        assert get_directory_fingerprint(self.directory) != fingerprint
+        fingerprint = get_directory_fingerprint(self.directory)
+        (self.series * 2).to_csv(os.path.join(self.directory, self.filename))
+        assert get_directory_fingerprint(self.directory) == fingerprint
+        (self.series * 2).to_csv(os.path.join(self.directory, "input.csv"))
+        assert get_directory_fingerprint(self.directory) != fingerprint
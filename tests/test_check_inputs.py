@@ -10,7 +10,9 @@ https://docs.python.org/3/library/unittest.html are also good support.
 
 import pandas as pd
 import os
+import time
 import pytest
+import threading
 import pvcompare.constants as constants
 
 from pvcompare.check_inputs import (
@@ -23,6 +25,12 @@ from pvcompare.check_inputs import (
     add_file_name_to_energy_consumption_file,
     add_evaluated_period_to_simulation_settings,
     add_parameters_to_storage_xx_file,
+    add_parameters_to_mvs_file,
+    csv_elements_workspace,
+    lock_csv_elements,
+    read_mvs_file,
+    write_mvs_file,
+    LOCK_FILENAME,
 )
 
 
@@ -321,6 +329,25 @@ class TestDemandProfiles:
             == len(ts.index) / 24
         )
 
+    def test_add_parameters_to_mvs_file(self):
+        filename = os.path.join(
+            self.user_inputs_mvs_directory, "csv_elements", "energyProviders.csv"
+        )
+        original_file = pd.read_csv(filename, index_col=0, header=0)
+        add_parameters_to_mvs_file(
+            user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+            mvs_filename="energyProviders.csv",
+            parameters={
+                ("energy_price", "Electricity grid"): 0.5,
+                ("feedin_tariff", "Electricity grid"): 0.1,
+            },
+            warning=False,
+        )
+        file = pd.read_csv(filename, index_col=0, header=0)
+        assert float(file.at["energy_price", "Electricity grid"]) == 0.5
+        assert float(file.at["feedin_tariff", "Electricity grid"]) == 0.1
+        original_file.to_csv(filename)
+
     def test_add_parameters_to_storage_xx_file(self):
         """
         These tests check whether
@@ -379,3 +406,84 @@ class TestDemandProfiles:
         assert installed_cap == 20
 
         storage_xx_original.to_csv(storage_xx_file_path, na_rep="NaN")
+
+    def test_csv_elements_workspace_saves_files_at_exit(self):
+        filename = os.path.join(
+            self.user_inputs_mvs_directory, "csv_elements", "energyConsumption.csv"
+        )
+        original_file = pd.read_csv(filename, index_col=0, header=0)
+        with csv_elements_workspace(self.user_inputs_mvs_directory):
+            add_file_name_to_energy_consumption_file(
+                column="Electricity demand",
+                ts_filename="test_workspace.csv",
+                user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+            )
+            # the modification is only visible within the workspace
+            file = pd.read_csv(filename, index_col=0, header=0)
+            assert file.at["file_name", "Electricity demand"] != "test_workspace.csv"
+            workspace_file = read_mvs_file(
+                self.user_inputs_mvs_directory, "energyConsumption.csv"
+            )
+            assert (
+                workspace_file.at["file_name", "Electricity demand"]
+                == "test_workspace.csv"
+            )
+        file = pd.read_csv(filename, index_col=0, header=0)
+        assert file.at["file_name", "Electricity demand"] == "test_workspace.csv"
+        original_file.to_csv(filename)
+
+    def test_csv_elements_workspace_discards_modifications_on_error(self):
+        filename = os.path.join(
+            self.user_inputs_mvs_directory, "csv_elements", "energyConsumption.csv"
+        )
+        original_file = pd.read_csv(filename, index_col=0, header=0)
+        with pytest.raises(ValueError):
+            with csv_elements_workspace(self.user_inputs_mvs_directory):
+                add_file_name_to_energy_consumption_file(
+                    column="Electricity demand",
+                    ts_filename="test_workspace.csv",
+                    user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+                )
+                raise ValueError("error within workspace")
+        file = pd.read_csv(filename, index_col=0, header=0)
+        pd.testing.assert_frame_equal(file, original_file)
+        assert not any(
+            name.endswith(".csv") and name.startswith(".")
+            for name in os.listdir(os.path.dirname(filename))
+        )
+
+    def test_write_mvs_file_replaces_file(self):
+        filename = os.path.join(
+            self.user_inputs_mvs_directory, "csv_elements", "energyConsumption.csv"
+        )
+        original_file = pd.read_csv(filename, index_col=0, header=0)
+        file = original_file.copy()
+        file.at["file_name", "Electricity demand"] = "test_write.csv"
+        write_mvs_file(file, self.user_inputs_mvs_directory, "energyConsumption.csv")
+        written_file = pd.read_csv(filename, index_col=0, header=0)
+        assert written_file.at["file_name", "Electricity demand"] == "test_write.csv"
+        assert not any(
+            name.endswith(".csv") and name.startswith(".")
+            for name in os.listdir(os.path.dirname(filename))
+        )
+        original_file.to_csv(filename)
+
+    def test_lock_csv_elements_blocks_other_threads(self):
+        events = []
+
+        def acquire_lock():
+            with lock_csv_elements(self.user_inputs_mvs_directory):
+                events.append("thread")
+
+        with lock_csv_elements(self.user_inputs_mvs_directory):
+            # nested locks of the same thread do not block
+            with lock_csv_elements(self.user_inputs_mvs_directory):
+                thread = threading.Thread(target=acquire_lock)
+                thread.start()
+                time.sleep(0.2)
+                events.append("main")
+        thread.join()
+        assert events == ["main", "thread"]
+        lock_file = os.path.join(self.user_inputs_mvs_directory, LOCK_FILENAME)
+        assert os.path.isfile(lock_file)
+        os.remove(lock_file)
@@ -10,14 +10,21 @@ https://docs.python.org/3/library/unittest.html are also good support.
 
 import pandas as pd
 import os
+import shutil
+import pytest
 import numpy as np
+import mock
 import pvcompare.constants as constants
+import pvcompare.demand as demand
 
 from pvcompare.demand import (
     calculate_power_demand,
     shift_working_hours,
     get_workalendar_class,
+    get_workalendar_registry,
+    get_holidays,
     calculate_heat_demand,
+    calculate_demand_batch,
     adjust_heat_demand,
 )
 
@@ -198,6 +205,191 @@ class TestDemandProfiles:
             )
         )
 
+    def test_calculate_heat_demand_reuses_profile(self):
+
+        kwargs = dict(
+            country=self.country,
+            lat=self.lat,
+            lon=self.lon,
+            storeys=self.storeys,
+            year=self.year,
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            static_inputs_directory=self.static_inputs_directory,
+            weather=self.weather,
+            user_inputs_mvs_directory=self.test_mvs_directory,
+            column="Heat demand",
+        )
+        filename = os.path.join(
+            self.test_mvs_directory,
+            "time_series",
+            f"heat_load_{self.year}_{self.lat}_{self.lon}_{self.storeys}.csv",
+        )
+        a = calculate_heat_demand(**kwargs)
+        modified = os.path.getmtime(filename)
+        # profile is reused from memory and the file is not written again
+        b = calculate_heat_demand(**kwargs)
+        assert os.path.getmtime(filename) == modified
+        pd.testing.assert_frame_equal(a, b)
+        # profile is reused from the saved file
+        demand._DEMAND_PROFILES.clear()
+        c = calculate_heat_demand(**kwargs)
+        pd.testing.assert_frame_equal(a, c)
+
+    def test_demand_profiles_in_memory_are_limited(self):
+        demand._DEMAND_PROFILES.clear()
+        for i in range(demand.MAX_DEMAND_PROFILES + 2):
+            demand._keep_demand_profile(str(i), pd.DataFrame({"kWh": [i]}))
+        # the profile that was used last is kept
+        assert demand._get_demand_profile("2") is not None
+        demand._keep_demand_profile("new", pd.DataFrame({"kWh": [0]}))
+
+        assert len(demand._DEMAND_PROFILES) == demand.MAX_DEMAND_PROFILES
+        assert demand._get_demand_profile("0") is None
+        assert demand._get_demand_profile("2") is not None
+        assert demand._get_demand_profile("3") is None
+        demand._DEMAND_PROFILES.clear()
+
+    def test_calculate_heat_demand_with_unit_demand_profiles(self):
+
+        kwargs = dict(
+            country=self.country,
+            lat=self.lat,
+            lon=self.lon,
+            year=self.year,
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            static_inputs_directory=self.static_inputs_directory,
+            weather=self.weather,
+            user_inputs_mvs_directory=self.test_mvs_directory,
+            column="Heat demand",
+        )
+        a = calculate_heat_demand(storeys=self.storeys, **kwargs)
+        demand._DEMAND_PROFILES.clear()
+        with mock.patch.object(
+            demand.bdew, "HeatBuilding", wraps=demand.bdew.HeatBuilding
+        ) as heat_building:
+            profiles = [
+                calculate_heat_demand(
+                    storeys=storeys, use_unit_demand_profiles=True, **kwargs
+                )
+                for storeys in [self.storeys, self.storeys + 1, self.storeys + 2]
+            ]
+            number_of_calls = heat_building.call_count
+        # demandlib is only called for the profile of one inhabitant
+        assert number_of_calls == 1
+        np.testing.assert_allclose(profiles[0]["kWh"], a["kWh"], rtol=1e-12)
+        np.testing.assert_allclose(
+            profiles[2]["kWh"] / (self.storeys + 2),
+            profiles[0]["kWh"] / self.storeys,
+            rtol=1e-12,
+        )
+        for storeys in [self.storeys + 1, self.storeys + 2]:
+            os.remove(
+                os.path.join(
+                    self.test_mvs_directory,
+                    "time_series",
+                    f"heat_load_{self.year}_{self.lat}_{self.lon}_{storeys}.csv",
+                )
+            )
+
+    @pytest.mark.parametrize(
+        "demandlib_version", [demand.BDEW_HEAT_PROFILE_DEMANDLIB_VERSION, "0.0.0"]
+    )
+    def test_get_normalized_heat_profiles_equals_two_evaluations(
+        self, demandlib_version
+    ):
+
+        index = pd.date_range("2015-01-01", periods=96, freq="H")
+        temperature = pd.Series(np.linspace(-5, 20, 96), index=index)
+        kwargs = dict(
+            holidays=get_holidays(country=self.country, year=self.year),
+            temperature=temperature,
+            shlp_type="MFH",
+            building_class=2,
+            wind_class=0,
+            annual_heat_demand=1,
+            name="MFH",
+        )
+        with mock.patch.object(demand.demandlib, "__version__", demandlib_version):
+            space_heating, heat_with_ww = demand._get_normalized_heat_profiles(
+                building=demand.bdew.HeatBuilding(index, ww_incl=True, **kwargs)
+            )
+
+        pd.testing.assert_series_equal(
+            space_heating,
+            demand.bdew.HeatBuilding(
+                index, ww_incl=False, **kwargs
+            ).get_normalized_bdew_profile(),
+        )
+        pd.testing.assert_series_equal(
+            heat_with_ww,
+            demand.bdew.HeatBuilding(
+                index, ww_incl=True, **kwargs
+            ).get_normalized_bdew_profile(),
+        )
+
+    def test_calculate_demand_batch_heat(self):
+
+        buildings = pd.DataFrame(
+            {
+                "country": [self.country, self.country],
+                "storeys": [self.storeys, 2],
+                "population per storey": [1, 1],
+                "number of houses": [1, 3],
+            }
+        )
+        profiles = calculate_demand_batch(
+            buildings=buildings,
+            year=self.year,
+            energy_vector="Heat",
+            weather=self.weather,
+            static_inputs_directory=self.static_inputs_directory,
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+        )
+
+        assert profiles.shape == (2, len(self.weather))
+        np.testing.assert_allclose(
+            profiles[0] / self.storeys, profiles[1] / 6, rtol=1e-12
+        )
+
+    def test_calculate_demand_batch_equals_single_building(self):
+
+        profiles = calculate_demand_batch(
+            buildings=pd.DataFrame(
+                {"country": [self.country], "storeys": [self.storeys]}
+            ),
+            year=self.year,
+            energy_vector="Heat",
+            weather=self.weather,
+            static_inputs_directory=self.static_inputs_directory,
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+        )
+        a = calculate_heat_demand(
+            country=self.country,
+            lat=self.lat,
+            lon=self.lon,
+            storeys=self.storeys,
+            year=self.year,
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            static_inputs_directory=self.static_inputs_directory,
+            weather=self.weather,
+            user_inputs_mvs_directory=self.test_mvs_directory,
+            column="Heat demand",
+            use_unit_demand_profiles=True,
+        )
+
+        np.testing.assert_array_equal(profiles[0], a["kWh"].values)
+
+    def test_calculate_demand_batch_without_weather(self):
+
+        with pytest.raises(ValueError):
+            calculate_demand_batch(
+                buildings=pd.DataFrame({"country": [self.country], "storeys": [1]}),
+                year=self.year,
+                energy_vector="Heat",
+                static_inputs_directory=self.static_inputs_directory,
+                user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            )
+
     def test_adjust_heat_demand(self):
 
         result = adjust_heat_demand(
@@ -220,3 +412,60 @@ class TestDemandProfiles:
         cal = get_workalendar_class(self.country)
 
         assert cal.__class__.__name__ == "France"
+
+    def test_get_workalendar_registry(self):
+
+        registry = get_workalendar_registry()
+
+        assert registry[self.country].__name__ == "France"
+
+    def test_get_workalendar_registry_replaces_registry_of_other_version(self):
+        static_inputs_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "workalendar_registry"
+        )
+        os.makedirs(static_inputs_directory, exist_ok=True)
+        registry_file = os.path.join(
+            static_inputs_directory, demand.WORKALENDAR_REGISTRY_FILENAME
+        )
+        pd.DataFrame(
+            [["France", "workalendar.europe", "France", "0.0.0"]],
+            columns=["country", "module", "class_name", "workalendar_version"],
+        ).to_csv(registry_file, index=False)
+        demand._WORKALENDAR_REGISTRY.clear()
+
+        registry = get_workalendar_registry(
+            static_inputs_directory=static_inputs_directory
+        )
+        persisted = pd.read_csv(registry_file, dtype=str)
+        shutil.rmtree(static_inputs_directory)
+
+        assert registry[self.country].__name__ == "France"
+        assert len(persisted) == len(registry)
+        assert "0.0.0" not in persisted["workalendar_version"].values
+
+    def test_get_workalendar_registry_in_read_only_directory(self):
+        static_inputs_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "workalendar_registry_read_only"
+        )
+        os.makedirs(static_inputs_directory, exist_ok=True)
+        demand._WORKALENDAR_REGISTRY.clear()
+        with mock.patch.object(
+            demand.cache, "write_csv", side_effect=PermissionError
+        ) as write_csv:
+            registry = get_workalendar_registry(
+                static_inputs_directory=static_inputs_directory
+            )
+        shutil.rmtree(static_inputs_directory)
+
+        assert write_csv.called
+        assert registry[self.country].__name__ == "France"
+
+    def test_get_holidays_returns_copy_of_cache(self):
+
+        holidays = get_holidays(country=self.country, year=self.year)
+        number_of_holidays = len(holidays)
+        holidays.clear()
+
+        assert len(get_holidays(country=self.country, year=self.year)) == (
+            number_of_holidays
+        )
@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import os
 from pandas.util.testing import assert_series_equal
+import oemof.thermal.compression_heatpumps_and_chillers as cmpr_hp_chiller
 
 from pvcompare import heat_pump_and_chiller as hc
 import pvcompare.constants as constants
@@ -119,6 +120,76 @@ class TestCalculateCopsAndEers:
             )
         )
 
+    def test_calculate_cops_and_eers_reuses_saved_file(self, add_icing_to_csv):
+        kwargs = dict(
+            weather=self.weather,
+            lat=self.lat,
+            lon=self.lon,
+            temperature_col="temp_air",
+            mode="heat_pump",
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            user_inputs_mvs_directory=self.mvs_inputs_directory,
+        )
+        filename = os.path.join(
+            self.mvs_inputs_directory,
+            "time_series",
+            "cops_heat_pump_2017_53.2_13.2_50.0.csv",
+        )
+        cops = hc.calculate_cops_and_eers(**kwargs)
+        modified = os.path.getmtime(filename)
+        # COPs are reused as long as the parameters do not change
+        assert_series_equal(hc.calculate_cops_and_eers(**kwargs), cops)
+        assert os.path.getmtime(filename) == modified
+        # COPs are calculated again after the icing factor has changed
+        parameters_file = os.path.join(
+            self.user_inputs_pvcompare_directory, "heat_pumps_and_chillers.csv"
+        )
+        parameters = pd.read_csv(parameters_file, header=0, index_col=0)
+        parameters.at["heat_pump", "factor_icing"] = 0.5
+        parameters.to_csv(parameters_file)
+        cops_icing = hc.calculate_cops_and_eers(**kwargs)
+        assert cops_icing.iloc[4] < cops.iloc[4]
+        assert_series_equal(
+            pd.read_csv(filename)["no_unit"], cops_icing.reset_index(drop=True)
+        )
+
+    def test_calculate_cops_sweep_equals_single_calculation(self):
+        cops = hc.calculate_cops_sweep(
+            weather=self.weather,
+            lat=self.lat,
+            lon=self.lon,
+            temperatures_high=[40, 50, 60],
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            user_inputs_mvs_directory=self.mvs_inputs_directory,
+        )
+        assert list(cops.columns) == [40.0, 50.0, 60.0]
+        assert (cops[40.0] > cops[50.0]).all() and (cops[50.0] > cops[60.0]).all()
+        filenames = [
+            os.path.join(
+                self.mvs_inputs_directory,
+                "time_series",
+                f"cops_heat_pump_2017_53.2_13.2_{temperature}.csv",
+            )
+            for temperature in cops.columns
+        ]
+        modified = os.path.getmtime(filenames[1])
+        # temp_high of heat_pumps_and_chillers.csv is 50 °C
+        cops_single = hc.calculate_cops_and_eers(
+            weather=self.weather,
+            lat=self.lat,
+            lon=self.lon,
+            temperature_col="temp_air",
+            mode="heat_pump",
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            user_inputs_mvs_directory=self.mvs_inputs_directory,
+        )
+        assert os.path.getmtime(filenames[1]) == modified
+        assert_series_equal(cops_single, cops[50.0], check_names=False)
+        for filename in filenames:
+            assert os.path.isfile(filename)
+        for filename in [filenames[0], filenames[2]]:
+            os.remove(filename)
+
     def teardown_method(self):
         # delete file
         filename = os.path.join(
@@ -883,6 +954,96 @@ class TestCalculateCopsAndEers:
             os.remove(filename)
 
 
+class TestCalculateCopsArray:
+    @classmethod
+    def setup_class(self):
+        # one year of hourly temperatures between -15 °C and 35 °C
+        hours = np.arange(8760)
+        self.temperature = (
+            10
+            + 15 * np.sin(2 * np.pi * hours / 8760)
+            + 5 * np.sin(2 * np.pi * hours / 24)
+        )
+
+    def test_calculate_cops_array_equals_oemof_thermal_heat_pump(self):
+        cops_oemof = cmpr_hp_chiller.calc_cops(
+            mode="heat_pump",
+            temp_high=[55.0],
+            temp_low=self.temperature.tolist(),
+            quality_grade=0.4,
+        )
+        cops = hc.calculate_cops_array(
+            mode="heat_pump",
+            temp_high=55.0,
+            temp_low=self.temperature,
+            quality_grade=0.4,
+        )
+        np.testing.assert_array_equal(cops, cops_oemof)
+
+    def test_calculate_cops_array_equals_oemof_thermal_icing(self):
+        temperature = self.temperature[:8760]
+        cops_oemof = cmpr_hp_chiller.calc_cops(
+            mode="heat_pump",
+            temp_high=[45.0],
+            temp_low=temperature.tolist(),
+            quality_grade=0.4,
+            temp_threshold_icing=2,
+            factor_icing=0.8,
+        )
+        cops = hc.calculate_cops_array(
+            mode="heat_pump",
+            temp_high=45.0,
+            temp_low=temperature,
+            quality_grade=0.4,
+            temp_threshold_icing=2,
+            factor_icing=0.8,
+        )
+        np.testing.assert_array_equal(cops, cops_oemof)
+
+    def test_calculate_cops_array_equals_oemof_thermal_chiller(self):
+        eers_oemof = cmpr_hp_chiller.calc_cops(
+            mode="chiller",
+            temp_high=self.temperature.tolist(),
+            temp_low=[15.0],
+            quality_grade=0.3,
+        )
+        eers = hc.calculate_cops_array(
+            mode="chiller",
+            temp_high=self.temperature,
+            temp_low=15.0,
+            quality_grade=0.3,
+        )
+        np.testing.assert_array_equal(eers, eers_oemof)
+
+    def test_calculate_cops_array_two_dimensional(self):
+        temp_high = np.array([[40.0], [60.0]])
+        cops = hc.calculate_cops_array(
+            mode="heat_pump",
+            temp_high=temp_high,
+            temp_low=self.temperature[:24],
+            quality_grade=0.4,
+        )
+        assert cops.shape == (2, 24)
+        np.testing.assert_array_equal(
+            cops[1],
+            hc.calculate_cops_array(
+                mode="heat_pump",
+                temp_high=60.0,
+                temp_low=self.temperature[:24],
+                quality_grade=0.4,
+            ),
+        )
+
+    def test_calculate_cops_array_different_lengths(self):
+        with pytest.raises(IndexError):
+            hc.calculate_cops_array(
+                mode="heat_pump",
+                temp_high=[40.0, 50.0],
+                temp_low=[1.0, 2.0, 3.0],
+                quality_grade=0.4,
+            )
+
+
 class TestAddSectorCoupling:
     @classmethod
     def setup_class(self):
@@ -1006,6 +1167,46 @@ class TestAddSectorCoupling:
 
         original_data_conversion.to_csv(self.filename_conversion, na_rep="NaN")
 
+    def test_add_sector_coupling_heat_pump_file_name_of_utc_year(
+        self, select_conv_tech
+    ):
+        select_conv_tech(columns="heat_pump_file_non_existent")
+
+        original_data_conversion = pd.read_csv(
+            self.filename_conversion, header=0, index_col=0
+        )
+        # the middle timestamp is in 2016 in local time, but in 2015 in UTC
+        weather = pd.DataFrame(
+            [10.0, 5.0, 0.0, -3.0, 27.0],
+            columns=["temp_air"],
+            index=pd.date_range(
+                "2015-12-31 22:00", periods=5, freq="H", tz="Europe/Berlin"
+            ),
+        )
+
+        hc.add_sector_coupling(
+            weather=weather,
+            lat=self.lat,
+            lon=self.lon,
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            user_inputs_mvs_directory=self.mvs_inputs_directory,
+            overwrite_hp_parameters=True,
+        )
+        filename = os.path.join(
+            self.mvs_inputs_directory,
+            "time_series",
+            "cops_heat_pump_2015_53.2_13.2_50.0.csv",
+        )
+        assert os.path.exists(filename) == True
+        df = pd.read_csv(self.filename_conversion, header=0, index_col=0)
+        assert (
+            "cops_heat_pump_2015_53.2_13.2_50.0.csv"
+            in df.loc["efficiency"].heat_pump_file_non_existent
+        ) == True
+
+        original_data_conversion.to_csv(self.filename_conversion, na_rep="NaN")
+        os.remove(filename)
+
     def test_add_sector_coupling_heat_pump_constant_efficiency(self, select_conv_tech):
         select_conv_tech(columns="heat_pump_constant_eff")
 
@@ -0,0 +1,109 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import shutil
+import pytest
+import numpy as np
+import pandas as pd
+import pvcompare.constants as constants
+
+pytest.importorskip("pyarrow")
+
+from pvcompare.loop_results import (
+    store_step_results,
+    store_step_scalars,
+    get_steps,
+    load_scalars,
+    load_timeseries,
+)
+
+
+class TestLoopResults:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.loop_output_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "loop_results"
+        )
+        index = pd.date_range("2017-01-01", periods=3, freq="H")
+        self.dict_values = {
+            "economic_data": {"currency": "EUR"},
+            "kpi": {
+                "scalar_matrix": pd.DataFrame(
+                    {
+                        "label": ["PV si", "Electricity demand"],
+                        "unit": ["kWp", "kW"],
+                        "optimizedAddCap": [10.0, 0.0],
+                    }
+                ),
+                "scalars": {"costs_total": 100.0, "Degree of NZE": 0.5},
+            },
+            "optimizedFlows": {
+                "Electricity bus": pd.DataFrame(
+                    {"PV si": [1.0, 2.0, 3.0], "Electricity demand": [-1.0] * 3},
+                    index=index,
+                ),
+                "Heat bus": pd.DataFrame({"Heat pump": [4.0, 5.0, 6.0]}, index=index),
+            },
+        }
+
+    def setup_method(self):
+        for year, step in [(2017, "3"), (2017, "4")]:
+            store_step_results(
+                self.loop_output_directory,
+                "Test_Scenario",
+                year,
+                step,
+                self.dict_values,
+            )
+
+    def teardown_method(self):
+        shutil.rmtree(self.loop_output_directory)
+
+    def test_get_steps(self):
+        assert get_steps(self.loop_output_directory) == [
+            ("Test_Scenario", 2017, "3"),
+            ("Test_Scenario", 2017, "4"),
+        ]
+
+    def test_load_scalars(self):
+        scalars = load_scalars(self.loop_output_directory, "scalars")
+        assert list(scalars.columns) == ["0", "unit"]
+        assert scalars.at[("Test_Scenario", 2017, "4", "costs_total"), "0"] == 100.0
+        assert scalars.at[("Test_Scenario", 2017, "4", "costs_total"), "unit"] == "EUR"
+        scalar_matrix = load_scalars(
+            self.loop_output_directory, "scalar_matrix", year=2017, step="3"
+        )
+        assert list(scalar_matrix["label"]) == ["PV si", "Electricity demand"]
+        assert list(scalar_matrix["optimizedAddCap"]) == [10.0, 0.0]
+
+    def test_load_timeseries(self):
+        timeseries = load_timeseries(self.loop_output_directory, "Heat bus")
+        assert list(timeseries.columns) == ["Heat pump"]
+        assert len(timeseries) == 6
+        assert np.array_equal(
+            timeseries.loc[("Test_Scenario", 2017, "3"), "Heat pump"].values,
+            [4.0, 5.0, 6.0],
+        )
+
+    def test_store_step_scalars_replaces_sheets(self):
+        store_step_scalars(
+            self.loop_output_directory,
+            "Test_Scenario",
+            2017,
+            "3",
+            {"scalars1": pd.DataFrame({"0": [0.7]}, index=["Degree of NZE"])},
+        )
+        scalars = load_scalars(
+            self.loop_output_directory, "scalars1", year=2017, step="3"
+        )
+        assert scalars.at[("Test_Scenario", 2017, "3", "Degree of NZE"), "0"] == 0.7
+        assert len(load_scalars(self.loop_output_directory, "scalars")) == 4
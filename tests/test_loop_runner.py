@@ -0,0 +1,111 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import shutil
+import pytest
+import pvcompare.constants as constants
+
+from pvcompare.loop_runner import run_loop_steps, load_ledger, is_step_finished
+
+
+def write_step(directory, name, fail_first=False):
+    """Writes the file `name` to `directory`, fails the first time if `fail_first`"""
+    step_directory = os.path.join(directory, name)
+    if fail_first and not os.path.isfile(step_directory + ".failed"):
+        os.mkdir(step_directory)
+        open(step_directory + ".failed", "w").close()
+        raise ValueError("first attempt fails")
+    os.mkdir(step_directory)
+
+
+def fail_step(directory, name):
+    """Raises an error"""
+    raise ValueError(f"step {name} fails")
+
+
+class TestLoopRunner:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.directory = os.path.join(constants.TEST_OUTPUTS_DIRECTORY, "loop_runner")
+
+    def setup_method(self):
+        os.makedirs(self.directory)
+
+    def teardown_method(self):
+        shutil.rmtree(self.directory)
+
+    def get_step(self, name, function=write_step, depends_on=None, **kwargs):
+        return {
+            "name": name,
+            "function": function,
+            "kwargs": dict(directory=self.directory, name=name, **kwargs),
+            "depends_on": depends_on,
+            "output_directories": [os.path.join(self.directory, name)],
+        }
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_run_loop_steps(self, max_workers):
+        steps = [
+            self.get_step("a"),
+            self.get_step("b", depends_on="a"),
+            self.get_step("c"),
+        ]
+        run_loop_steps(steps, max_workers=max_workers)
+        assert sorted(os.listdir(self.directory)) == ["a", "b", "c"]
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_run_loop_steps_retries_failed_step(self, max_workers):
+        steps = [self.get_step("a", fail_first=True)]
+        run_loop_steps(steps, max_workers=max_workers, retries=1)
+        assert os.path.isdir(os.path.join(self.directory, "a"))
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_run_loop_steps_skips_steps_of_failed_step(self, max_workers):
+        steps = [
+            self.get_step("a", function=fail_step),
+            self.get_step("b", depends_on="a"),
+            self.get_step("c"),
+        ]
+        with pytest.raises(ValueError, match="'a', 'b'"):
+            run_loop_steps(steps, max_workers=max_workers)
+        assert os.listdir(self.directory) == ["c"]
+
+    def test_run_loop_steps_unknown_dependency(self):
+        with pytest.raises(ValueError):
+            run_loop_steps([self.get_step("b", depends_on="a")])
+
+    def test_run_loop_steps_with_ledger_skips_finished_steps(self):
+        ledger_directory = os.path.join(self.directory, "ledger")
+        os.mkdir(ledger_directory)
+        steps = [self.get_step("a"), self.get_step("b", function=fail_step)]
+        with pytest.raises(ValueError):
+            run_loop_steps(steps, ledger_directory=ledger_directory)
+        ledger = load_ledger(ledger_directory)
+        assert ledger["a"]["status"] == "finished"
+        assert ledger["b"]["status"] == "failed"
+
+        # "a" would fail as its directory exists, "b" is run again
+        steps = [self.get_step("a"), self.get_step("b")]
+        run_loop_steps(steps, ledger_directory=ledger_directory)
+        assert is_step_finished(
+            ledger_directory, "b", load_ledger(ledger_directory)["b"]["fingerprint"]
+        )
+
+    def test_run_loop_steps_with_ledger_repeats_changed_step(self):
+        ledger_directory = os.path.join(self.directory, "ledger")
+        os.mkdir(ledger_directory)
+        step = self.get_step("a")
+        run_loop_steps([step], ledger_directory=ledger_directory)
+        step["fingerprint"] = "changed inputs"
+        # the outputs of the previous run are removed before the step is repeated
+        run_loop_steps([step], ledger_directory=ledger_directory)
+        assert load_ledger(ledger_directory)["a"]["fingerprint"] == "changed inputs"
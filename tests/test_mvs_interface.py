@@ -0,0 +1,80 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import shutil
+import pytest
+import pvcompare.constants as constants
+import multi_vector_simulator.A1_csv_to_json as A1
+import multi_vector_simulator.B0_data_input_json as B0
+import multi_vector_simulator.F0_output as F0
+
+from pvcompare import main
+from pvcompare.scenario_workspace import create_scenario_workspace
+from pvcompare.mvs_interface import create_mvs_input_dict
+
+
+class TestMvsInterface:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.workspace_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "mvs_interface"
+        )
+        self.mvs_output_directory = os.path.join(
+            self.workspace_directory, "mvs_outputs"
+        )
+
+    def setup_method(self):
+        self.user_inputs_mvs_directory, _ = create_scenario_workspace(
+            workspace_directory=self.workspace_directory,
+            user_inputs_mvs_directory=constants.TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+            user_inputs_pvcompare_directory=constants.TEST_USER_INPUTS_PVCOMPARE,
+        )
+
+    def teardown_method(self):
+        shutil.rmtree(self.workspace_directory)
+
+    def test_create_mvs_input_dict_equals_json_of_mvs(self):
+        json_file = A1.create_input_json(
+            input_directory=os.path.join(self.user_inputs_mvs_directory, "csv_elements")
+        )
+        expected = B0.load_json(
+            json_file,
+            path_input_folder=self.user_inputs_mvs_directory,
+            path_output_folder=self.mvs_output_directory,
+            set_default_values=True,
+        )
+        os.remove(json_file)
+        dict_values = create_mvs_input_dict(
+            user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+            mvs_output_directory=self.mvs_output_directory,
+        )
+        assert F0.store_as_json(dict_values) == F0.store_as_json(expected)
+
+    def test_create_mvs_input_dict_with_missing_file(self):
+        os.remove(
+            os.path.join(
+                self.user_inputs_mvs_directory, "csv_elements", "energyBusses.csv"
+            )
+        )
+        with pytest.raises(FileNotFoundError):
+            create_mvs_input_dict(
+                user_inputs_mvs_directory=self.user_inputs_mvs_directory
+            )
+
+    def test_apply_mvs_without_excel_requires_in_memory(self):
+        with pytest.raises(ValueError):
+            main.apply_mvs(
+                scenario_name="Test_Scenario",
+                user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+                outputs_directory=self.workspace_directory,
+                save_excel=False,
+            )
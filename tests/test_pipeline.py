@@ -0,0 +1,274 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import shutil
+import importlib.util
+import pytest
+import pvcompare.constants as constants
+
+from pvcompare import check_inputs
+from pvcompare import static_inputs
+from pvcompare import demand
+from pvcompare.scenario_workspace import create_scenario_workspace
+from pvcompare.pipeline import MANIFEST_FILENAME, run_pipeline
+
+
+def set_country(user_inputs_mvs_directory, country):
+    check_inputs.add_parameter_to_mvs_file(
+        user_inputs_mvs_directory,
+        "project_data.csv",
+        "country",
+        "project_data",
+        country,
+        warning=False,
+    )
+
+
+def set_project_name(user_inputs_mvs_directory):
+    country = check_inputs.load_parameter_from_mvs_file(
+        user_inputs_mvs_directory, "project_data.csv", "country", "project_data"
+    )
+    check_inputs.add_parameter_to_mvs_file(
+        user_inputs_mvs_directory,
+        "project_data.csv",
+        "project_name",
+        "project_data",
+        f"Project in {country}",
+        warning=False,
+    )
+
+
+def generate_static_files(static_inputs_directory, user_inputs_mvs_directory):
+    # the static inputs directory also contains generated files
+    static_inputs.clear_cache()
+    static_inputs.load_statistics(static_inputs_directory=static_inputs_directory)
+    demand.get_workalendar_registry(static_inputs_directory=static_inputs_directory)
+    with open(
+        os.path.join(static_inputs_directory, "weatherdata_0.0_0.0_2017.csv"), "w"
+    ) as file:
+        file.write("time,temp_air\n")
+
+
+STAGE_MODULE = """
+from pvcompare import check_inputs
+
+
+def set_timestep(user_inputs_mvs_directory):
+    check_inputs.add_parameter_to_mvs_file(
+        user_inputs_mvs_directory,
+        "simulation_settings.csv",
+        "timestep",
+        "simulation_settings",
+        {timestep},
+        warning=False,
+    )
+"""
+
+
+def import_stage_module(filename, timestep):
+    with open(filename, "w") as file:
+        file.write(STAGE_MODULE.format(timestep=timestep))
+    spec = importlib.util.spec_from_file_location("stage_module", filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestPipeline:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.workspace_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "pipeline"
+        )
+
+    def setup_method(self):
+        self.user_inputs_mvs_directory, _ = create_scenario_workspace(
+            workspace_directory=self.workspace_directory,
+            user_inputs_mvs_directory=constants.TEST_USER_INPUTS_MVS,
+            user_inputs_pvcompare_directory=constants.TEST_USER_INPUTS_PVCOMPARE,
+        )
+        self.project_data = os.path.join(
+            self.user_inputs_mvs_directory, "csv_elements", "project_data.csv"
+        )
+        with open(self.project_data, "r") as file:
+            self.original_project_data = file.read()
+
+    def teardown_method(self):
+        shutil.rmtree(self.workspace_directory)
+
+    def get_stages(self, country):
+        return [
+            {
+                "name": "country",
+                "function": set_country,
+                "kwargs": dict(
+                    user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+                    country=country,
+                ),
+            },
+            {
+                "name": "project_name",
+                "function": set_project_name,
+                "kwargs": dict(
+                    user_inputs_mvs_directory=self.user_inputs_mvs_directory
+                ),
+                "depends_on": ["country"],
+            },
+        ]
+
+    def load_project_name(self):
+        return check_inputs.load_parameter_from_mvs_file(
+            self.user_inputs_mvs_directory,
+            "project_data.csv",
+            "project_name",
+            "project_data",
+        )
+
+    def test_run_pipeline_skips_unchanged_stages(self):
+        stages = self.get_stages("Spain")
+        assert run_pipeline(stages, self.user_inputs_mvs_directory) == [
+            "country",
+            "project_name",
+        ]
+        assert os.path.isfile(
+            os.path.join(self.user_inputs_mvs_directory, MANIFEST_FILENAME)
+        )
+        # the recorded modifications are applied to the unchanged inputs
+        with open(self.project_data, "w") as file:
+            file.write(self.original_project_data)
+        assert run_pipeline(stages, self.user_inputs_mvs_directory) == []
+        assert self.load_project_name() == "Project in Spain"
+
+    def test_run_pipeline_executes_stages_with_changed_inputs(self):
+        run_pipeline(self.get_stages("Spain"), self.user_inputs_mvs_directory)
+        check_inputs.add_parameter_to_mvs_file(
+            self.user_inputs_mvs_directory,
+            "energyBusses.csv",
+            "energyVector",
+            "Heat bus",
+            "Electricity",
+            warning=False,
+        )
+        assert (
+            run_pipeline(self.get_stages("Spain"), self.user_inputs_mvs_directory) == []
+        )
+        assert run_pipeline(
+            self.get_stages("France"), self.user_inputs_mvs_directory
+        ) == ["country", "project_name"]
+        assert self.load_project_name() == "Project in France"
+
+    def test_run_pipeline_executes_stages_with_changed_code(self):
+        filename = os.path.join(self.workspace_directory, "stage_module.py")
+        for timestep, executed_stages in [
+            (60, ["timestep"]),
+            (60, []),
+            (30, ["timestep"]),
+        ]:
+            module = import_stage_module(filename, timestep)
+            stages = [
+                {
+                    "name": "timestep",
+                    "function": module.set_timestep,
+                    "kwargs": dict(
+                        user_inputs_mvs_directory=self.user_inputs_mvs_directory
+                    ),
+                }
+            ]
+            assert (
+                run_pipeline(stages, self.user_inputs_mvs_directory) == executed_stages
+            )
+            assert check_inputs.load_parameter_from_mvs_file(
+                self.user_inputs_mvs_directory,
+                "simulation_settings.csv",
+                "timestep",
+                "simulation_settings",
+            ) == str(timestep)
+
+    def test_run_pipeline_skips_stages_with_unchanged_static_inputs(self):
+        static_inputs_directory = os.path.join(
+            self.workspace_directory, "static_inputs"
+        )
+        shutil.copytree(constants.TEST_STATIC_INPUTS, static_inputs_directory)
+        kwargs = dict(
+            static_inputs_directory=static_inputs_directory,
+            user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+        )
+        stages = [
+            {
+                "name": "grid_parameters",
+                "function": check_inputs.add_local_grid_parameters,
+                "kwargs": kwargs,
+                "input_files": [
+                    os.path.join(
+                        static_inputs_directory,
+                        static_inputs.LOCAL_GRID_PARAMETERS_FILENAME,
+                    )
+                ],
+            },
+            {
+                "name": "static_files",
+                "function": generate_static_files,
+                "kwargs": kwargs,
+                "input_files": [
+                    os.path.join(static_inputs_directory, filename)
+                    for filename in static_inputs.DEFAULT_STATISTICS_FILENAMES
+                ],
+            },
+        ]
+        assert run_pipeline(stages, self.user_inputs_mvs_directory) == [
+            "grid_parameters",
+            "static_files",
+        ]
+        assert run_pipeline(stages, self.user_inputs_mvs_directory) == []
+        # a changed input file executes its stage again
+        with open(
+            os.path.join(static_inputs_directory, "EUROSTAT_population.csv"), "a"
+        ) as file:
+            file.write("\n")
+        assert run_pipeline(stages, self.user_inputs_mvs_directory) == ["static_files"]
+        static_inputs.clear_cache()
+
+    def test_run_pipeline_with_unknown_dependency(self):
+        stages = self.get_stages("Spain")[1:]
+        with pytest.raises(ValueError):
+            run_pipeline(stages, self.user_inputs_mvs_directory)
+
+    def test_run_pipeline_in_parallel(self):
+        stages = self.get_stages("Spain") + [
+            {
+                "name": "evaluated_period",
+                "function": check_inputs.add_parameter_to_mvs_file,
+                "kwargs": dict(
+                    user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+                    mvs_filename="simulation_settings.csv",
+                    mvs_row="evaluated_period",
+                    mvs_column="simulation_settings",
+                    pvcompare_parameter=7,
+                    warning=False,
+                ),
+            }
+        ]
+        assert run_pipeline(stages, self.user_inputs_mvs_directory, max_workers=2) == [
+            "country",
+            "project_name",
+            "evaluated_period",
+        ]
+        assert self.load_project_name() == "Project in Spain"
+        assert run_pipeline(stages, self.user_inputs_mvs_directory, max_workers=2) == []
+
+    def test_run_pipeline_in_parallel_with_missing_dependency(self):
+        stages = self.get_stages("Spain")
+        del stages[1]["depends_on"]
+        with pytest.raises(ValueError):
+            run_pipeline(stages, self.user_inputs_mvs_directory, max_workers=2)
+        with open(self.project_data, "r") as file:
+            assert file.read() == self.original_project_data
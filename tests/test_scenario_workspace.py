@@ -0,0 +1,82 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import shutil
+import pytest
+import pandas as pd
+import pvcompare.constants as constants
+
+from pvcompare import cache
+from pvcompare.scenario_workspace import create_scenario_workspace
+
+
+class TestScenarioWorkspace:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.user_inputs_mvs_directory = constants.TEST_USER_INPUTS_MVS
+        self.user_inputs_pvcompare_directory = constants.TEST_USER_INPUTS_PVCOMPARE
+        self.workspace_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "workspace"
+        )
+        self.time_series = "si_180_38_2014_52.52437_13.41053.csv"
+
+    def setup_method(self):
+        (
+            self.workspace_mvs_directory,
+            self.workspace_pvcompare_directory,
+        ) = create_scenario_workspace(
+            workspace_directory=self.workspace_directory,
+            user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+            user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+        )
+
+    def teardown_method(self):
+        shutil.rmtree(self.workspace_directory)
+
+    def test_create_scenario_workspace_links_time_series(self):
+        assert os.path.samefile(
+            os.path.join(
+                self.user_inputs_mvs_directory, "time_series", self.time_series
+            ),
+            os.path.join(self.workspace_mvs_directory, "time_series", self.time_series),
+        )
+        assert not os.path.samefile(
+            os.path.join(
+                self.user_inputs_mvs_directory, "csv_elements", "energyBusses.csv"
+            ),
+            os.path.join(
+                self.workspace_mvs_directory, "csv_elements", "energyBusses.csv"
+            ),
+        )
+        assert os.path.isfile(
+            os.path.join(self.workspace_pvcompare_directory, "pv_setup.csv")
+        )
+
+    def test_write_csv_in_scenario_workspace_keeps_original(self):
+        original_file = os.path.join(
+            self.user_inputs_mvs_directory, "time_series", self.time_series
+        )
+        original = pd.read_csv(original_file)
+        cache.write_csv(
+            original * 2,
+            os.path.join(self.workspace_mvs_directory, "time_series", self.time_series),
+            index=False,
+        )
+        pd.testing.assert_frame_equal(pd.read_csv(original_file), original)
+
+    def test_create_scenario_workspace_existing_directory(self):
+        with pytest.raises(NameError):
+            create_scenario_workspace(
+                workspace_directory=self.workspace_directory,
+                user_inputs_mvs_directory=self.user_inputs_mvs_directory,
+                user_inputs_pvcompare_directory=self.user_inputs_pvcompare_directory,
+            )
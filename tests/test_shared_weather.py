@@ -0,0 +1,47 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import pytest
+import numpy as np
+import pandas as pd
+import pvcompare.constants as constants
+
+from pvcompare.shared_weather import freeze_weather, get_weather_view
+
+
+class TestSharedWeather:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.weather = pd.read_csv(
+            os.path.join(
+                constants.TEST_STATIC_INPUTS, "weatherdata_53.2_13.2_2017.csv"
+            ),
+            index_col=0,
+        )
+        self.weather.index = pd.to_datetime(self.weather.index)
+        self.frozen = freeze_weather(self.weather)
+
+    def test_freeze_weather_is_read_only(self):
+        pd.testing.assert_frame_equal(
+            self.frozen, self.weather.astype(np.float64), check_freq=False
+        )
+        assert self.frozen["ghi"].values.flags.writeable is False
+        with pytest.raises(ValueError):
+            self.frozen["ghi"].values[0] = 1.0
+
+    def test_get_weather_view_shares_values(self):
+        view = get_weather_view(self.frozen)
+        assert np.shares_memory(view["ghi"].values, self.frozen["ghi"].values)
+        view["am"] = 1.0
+        view.index = view.index.tz_convert("Europe/Berlin")
+        assert "am" not in self.frozen.columns
+        assert str(self.frozen.index.tz) == "UTC"
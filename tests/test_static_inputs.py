@@ -0,0 +1,134 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import os
+import mock
+import shutil
+import pandas as pd
+import pvcompare.constants as constants
+
+from pvcompare import static_inputs
+from pvcompare.static_inputs import (
+    COMPILED_STATISTICS_FILENAME,
+    load_statistics,
+    get_statistic,
+    get_countries_and_years,
+    load_local_grid_parameters,
+    clear_cache,
+)
+
+
+class TestStaticInputs:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.static_inputs_directory = constants.TEST_STATIC_INPUTS
+        self.compiled_file = os.path.join(
+            self.static_inputs_directory, COMPILED_STATISTICS_FILENAME
+        )
+        clear_cache()
+
+    def teardown_method(self):
+        clear_cache()
+        if os.path.isfile(self.compiled_file):
+            os.remove(self.compiled_file)
+
+    def test_get_statistic_equals_excel_value(self):
+        filename = "electricity_consumption_residential.xlsx"
+        excel = pd.read_excel(
+            os.path.join(self.static_inputs_directory, filename), header=1, index_col=0,
+        )
+        value = get_statistic(
+            country="France",
+            year=2015,
+            filename=filename,
+            static_inputs_directory=self.static_inputs_directory,
+        )
+        assert value == excel.at["France", 2015]
+
+    def test_get_statistic_equals_population(self):
+        population = pd.read_csv(
+            os.path.join(self.static_inputs_directory, "EUROSTAT_population.csv"),
+            index_col=0,
+        )
+        value = get_statistic(
+            country="France",
+            year=2015,
+            filename="EUROSTAT_population.csv",
+            static_inputs_directory=self.static_inputs_directory,
+        )
+        assert value == population.at["France", "2015"]
+
+    def test_load_statistics_from_compiled_file(self):
+        statistics = load_statistics(
+            static_inputs_directory=self.static_inputs_directory
+        )
+        assert os.path.isfile(self.compiled_file)
+        clear_cache()
+        loaded_statistics = load_statistics(
+            static_inputs_directory=self.static_inputs_directory
+        )
+        pd.testing.assert_frame_equal(statistics, loaded_statistics)
+
+    def test_load_statistics_recompiles_modified_source_in_memory(self):
+        static_inputs_directory = os.path.join(
+            constants.TEST_OUTPUTS_DIRECTORY, "static_inputs"
+        )
+        shutil.copytree(self.static_inputs_directory, static_inputs_directory)
+        load_statistics(static_inputs_directory=static_inputs_directory)
+        population_file = os.path.join(
+            static_inputs_directory, "EUROSTAT_population.csv"
+        )
+        population = pd.read_csv(population_file, index_col=0)
+        population.at["France", "2015"] = 1
+        population.to_csv(population_file)
+        # the source file is newer than the statistics in memory
+        modified = os.path.getmtime(population_file) + 10
+        os.utime(population_file, (modified, modified))
+        value = get_statistic(
+            country="France",
+            year=2015,
+            filename="EUROSTAT_population.csv",
+            static_inputs_directory=static_inputs_directory,
+        )
+        shutil.rmtree(static_inputs_directory)
+        assert value == 1
+
+    def test_load_statistics_in_read_only_directory(self):
+        with mock.patch.object(
+            static_inputs.cache, "write_csv", side_effect=PermissionError
+        ) as write_csv:
+            statistics = load_statistics(
+                static_inputs_directory=self.static_inputs_directory
+            )
+        assert write_csv.called
+        assert not os.path.isfile(self.compiled_file)
+        assert "EUROSTAT_population.csv" in statistics.columns
+
+    def test_get_countries_and_years(self):
+        countries, years = get_countries_and_years(
+            filename="EUROSTAT_population.csv",
+            static_inputs_directory=self.static_inputs_directory,
+        )
+        assert "France" in countries
+        assert 2015 in years
+        assert 2001 not in years
+
+    def test_load_local_grid_parameters_returns_copy(self):
+        grid_parameters = load_local_grid_parameters(
+            static_inputs_directory=self.static_inputs_directory
+        )
+        grid_parameters.iloc[0, 0] = None
+        assert (
+            load_local_grid_parameters(
+                static_inputs_directory=self.static_inputs_directory
+            ).iloc[0, 0]
+            is not None
+        )
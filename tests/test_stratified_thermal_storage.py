@@ -515,6 +515,43 @@ class TestCalcStratTesParam:
 
         original_storage_xx_data.to_csv(self.filename_storage_xx, na_rep="NaN")
 
+    def test_calc_strat_tes_param_batch_equals_single_calculation(self):
+        (
+            nominal_storage_capacity,
+            loss_rate,
+            fixed_losses_relative,
+            fixed_losses_absolute,
+        ) = sts.calc_strat_tes_param(
+            weather=self.weather,
+            temperature_col="temp_air",
+            user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+            user_inputs_mvs_directory=TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+        )
+        (
+            nominal_storage_capacities,
+            loss_rates,
+            fixed_losses_relative_batch,
+            fixed_losses_absolute_batch,
+        ) = sts.calc_strat_tes_param_batch(
+            weather=self.weather,
+            diameter=[0.79, 1.0, 1.0],
+            height=[np.nan, 2, 2],
+            s_iso=[100, 100, 200],
+            temperature_col="temp_air",
+            user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+        )
+        assert fixed_losses_relative_batch.shape == (3, len(self.weather))
+        assert fixed_losses_absolute_batch.shape == (3, len(self.weather))
+        # the first variant equals the parameters of stratified_thermal_storage.csv
+        assert nominal_storage_capacities[0] == nominal_storage_capacity
+        assert loss_rates[0] == loss_rate
+        assert np.array_equal(fixed_losses_relative_batch[0], fixed_losses_relative)
+        assert np.array_equal(fixed_losses_absolute_batch[0], fixed_losses_absolute)
+        # thicker insulation reduces the losses
+        assert nominal_storage_capacities[1] == nominal_storage_capacities[2]
+        assert loss_rates[2] < loss_rates[1]
+        assert (fixed_losses_absolute_batch[2] < fixed_losses_absolute_batch[1]).all()
+
     def test_add_strat_tes_calculate_losses_saved_file(self):
         original_storage_xx_data = pd.read_csv(
             self.filename_storage_xx, header=0, index_col=0
@@ -566,6 +603,12 @@ class TestCalcStratTesParam:
 
         original_storage_xx_data.to_csv(self.filename_storage_xx, na_rep="NaN")
 
+    def test_get_constant_value(self):
+        assert sts.get_constant_value(self.losses["no_unit"]) is None
+        assert sts.get_constant_value([0.0016] * 6) == 0.0016
+        assert sts.get_constant_value([0.0016, 0.0016 * (1 + 1e-12)]) == 0.0016
+        assert sts.get_constant_value([0.0016, np.nan]) is None
+
     def teardown_method(self):
         # delete file
         filename = os.path.join(
@@ -716,6 +759,175 @@ class TestAddStratTes:
             if os.path.exists(file):
                 os.remove(file)
 
+    def test_add_sector_coupling_strat_tes_constant_losses_as_scalar(
+        self, select_conv_tech
+    ):
+        original_storage_xx_data = pd.read_csv(
+            self.filename_storage_xx, header=0, index_col=0
+        )
+        filename_references = os.path.join(
+            TEST_USER_INPUTS_MVS_SECTOR_COUPLING, sts.LOSS_REFERENCES_FILENAME
+        )
+        reference = original_storage_xx_data.at[
+            "fixed_thermal_losses_absolute", "storage capacity"
+        ]
+
+        select_conv_tech(columns="storage capacity")
+        for temperature in [20.0, 5.0]:
+            weather = pd.DataFrame(
+                [temperature] * 6, columns=["temp_air"], index=self.date_range_2017,
+            )
+            sts.add_strat_tes(
+                weather=weather,
+                lat=self.lat,
+                lon=self.lon,
+                user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+                user_inputs_mvs_directory=TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+                overwrite_tes_parameters=False,
+            )
+            fixed_losses_absolute = sts.calc_strat_tes_param(
+                weather=weather,
+                user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+                user_inputs_mvs_directory=TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+            )[3]
+            # constant losses of the current weather written into storage_TES.csv
+            df = pd.read_csv(self.filename_storage_xx, header=0, index_col=0)
+            assert (
+                float(df.at["fixed_thermal_losses_absolute", "storage capacity"])
+                == fixed_losses_absolute.iloc[0]
+            )
+            # no time series saved
+            assert (
+                os.path.exists(
+                    os.path.join(
+                        TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+                        "time_series",
+                        "fixed_thermal_losses_absolute_2017_53.2_13.2_40.0.csv",
+                    )
+                )
+                == False
+            )
+            # the time series reference is recorded
+            references = sts.cache.load_manifest(
+                TEST_USER_INPUTS_MVS_SECTOR_COUPLING, sts.LOSS_REFERENCES_FILENAME
+            )
+            assert (
+                references["storage_TES.csv"]["fixed_thermal_losses_absolute"][
+                    "reference"
+                ]
+                == reference
+            )
+
+        # the reference is restored for temperature dependent losses
+        sts.add_strat_tes(
+            weather=self.weather_2017,
+            lat=self.lat,
+            lon=self.lon,
+            user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+            user_inputs_mvs_directory=TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+            overwrite_tes_parameters=False,
+        )
+        df = pd.read_csv(self.filename_storage_xx, header=0, index_col=0)
+        assert (
+            "fixed_thermal_losses_absolute_2017_53.2_13.2_40.0.csv"
+            in df.loc["fixed_thermal_losses_absolute"].item()
+        )
+        assert os.path.exists(filename_references) == False
+
+        original_storage_xx_data.to_csv(self.filename_storage_xx, na_rep="NaN")
+        for value_name in ["relative", "absolute"]:
+            filename = os.path.join(
+                TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+                "time_series",
+                f"fixed_thermal_losses_{value_name}_2017_53.2_13.2_40.0.csv",
+            )
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_add_sector_coupling_strat_tes_changed_scalar_losses_are_kept(
+        self, select_conv_tech
+    ):
+        original_storage_xx_data = pd.read_csv(
+            self.filename_storage_xx, header=0, index_col=0
+        )
+        weather = pd.DataFrame(
+            [20.0] * 6, columns=["temp_air"], index=self.date_range_2017,
+        )
+
+        select_conv_tech(columns="storage capacity")
+        sts.add_strat_tes(
+            weather=weather,
+            lat=self.lat,
+            lon=self.lon,
+            user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+            user_inputs_mvs_directory=TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+            overwrite_tes_parameters=False,
+        )
+        # scalar losses changed by the user
+        df = pd.read_csv(self.filename_storage_xx, header=0, index_col=0)
+        df.at["fixed_thermal_losses_absolute", "storage capacity"] = 0.5
+        df.to_csv(self.filename_storage_xx, na_rep="NaN")
+        sts.add_strat_tes(
+            weather=self.weather_2017,
+            lat=self.lat,
+            lon=self.lon,
+            user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+            user_inputs_mvs_directory=TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+            overwrite_tes_parameters=False,
+        )
+        df = pd.read_csv(self.filename_storage_xx, header=0, index_col=0)
+        assert float(df.at["fixed_thermal_losses_absolute", "storage capacity"]) == 0.5
+
+        original_storage_xx_data.to_csv(self.filename_storage_xx, na_rep="NaN")
+        for filename in [
+            os.path.join(
+                TEST_USER_INPUTS_MVS_SECTOR_COUPLING, sts.LOSS_REFERENCES_FILENAME
+            ),
+            os.path.join(
+                TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+                "time_series",
+                "fixed_thermal_losses_relative_2017_53.2_13.2_40.0.csv",
+            ),
+        ]:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_add_sector_coupling_strat_tes_file_name_of_utc_year(
+        self, select_conv_tech
+    ):
+        original_storage_xx_data = pd.read_csv(
+            self.filename_storage_xx, header=0, index_col=0
+        )
+        # the middle timestamp is in 2016 in local time, but in 2015 in UTC
+        weather = pd.DataFrame(
+            [11.85, 6.85, 2.0, 0.0, -3.0, 27.0],
+            columns=["temp_air"],
+            index=pd.date_range(
+                "2015-12-31 21:00", periods=6, freq="H", tz="Europe/Berlin"
+            ),
+        )
+
+        select_conv_tech(columns="storage capacity")
+        sts.add_strat_tes(
+            weather=weather,
+            lat=self.lat,
+            lon=self.lon,
+            user_inputs_pvcompare_directory=TEST_USER_INPUTS_PVCOMPARE,
+            user_inputs_mvs_directory=TEST_USER_INPUTS_MVS_SECTOR_COUPLING,
+            overwrite_tes_parameters=True,
+        )
+        df = pd.read_csv(self.filename_storage_xx, header=0, index_col=0)
+        for value_name in ["relative", "absolute"]:
+            filename = f"fixed_thermal_losses_{value_name}_2015_53.2_13.2_40.0.csv"
+            assert filename in df.loc[f"fixed_thermal_losses_{value_name}"].item()
+            filename = os.path.join(
+                TEST_USER_INPUTS_MVS_SECTOR_COUPLING, "time_series", filename
+            )
+            assert os.path.exists(filename) == True
+            os.remove(filename)
+
+        original_storage_xx_data.to_csv(self.filename_storage_xx, na_rep="NaN")
+
     def test_add_sector_coupling_strat_tes_file_non_existent(self, select_conv_tech):
 
         original_storage_xx_data = pd.read_csv(
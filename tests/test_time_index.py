@@ -0,0 +1,37 @@
+"""
+run these tests with `pytest tests/name_of_test_module.py` or `pytest tests`
+or simply `pytest` pytest will look for all files starting with "test_" and run
+all functions within this file starting with "test_". For basic example of
+tests you can look at our workshop
+https://github.com/rl-institut/workshop/tree/master/test-driven-development.
+Otherwise https://docs.pytest.org/en/latest/ and
+https://docs.python.org/3/library/unittest.html are also good support.
+"""
+
+import pandas as pd
+
+from pvcompare.time_index import get_year, get_evaluated_period
+
+
+class TestTimeIndex:
+    @classmethod
+    def setup_class(self):
+        """Setup variables for all tests in this class"""
+        self.index = pd.date_range(
+            "2017-12-31 23:00", periods=8760, freq="H", tz="Europe/Berlin"
+        )
+
+    def test_get_year_of_middle_timestamp(self):
+        assert get_year(self.index) == 2018
+
+    def test_get_year_of_strings(self):
+        assert get_year(["2014-01-01 13:00:00+00:00", "2014-01-01 14:00:00+00:00"]) == (
+            2014
+        )
+
+    def test_get_year_converts_to_utc(self):
+        index = pd.DatetimeIndex(["2015-01-01 00:30"]).tz_localize("Europe/Berlin")
+        assert get_year(index) == 2014
+
+    def test_get_evaluated_period(self):
+        assert get_evaluated_period(self.index) == 365